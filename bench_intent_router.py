@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark du routeur d'intentions de J.A.R.V.I.S.
+Compare l'automate compilé au balayage linéaire des phrases
+"""
+
+import sys
+import time
+import random
+import string
+
+from modules.intent_router import IntentRouter
+
+# Phrases réelles de J.A.R.V.I.S.
+BASE_PHRASES = [
+    "jarvis", "j.a.r.v.i.s", "t'es là", "prêt pour mes commandes",
+    "silence", "c'est beau", "tais-toi", "stop",
+    "change de voix", "voix windows", "utilise chatgpt",
+    "analyse l'écran", "analyse mon tour",
+    "active le module f-18", "module dcs"
+]
+
+# Commandes de test (mélange de commandes routées et générales)
+COMMANDS = [
+    "analyse l'écran s'il te plaît",
+    "quelle est la météo aujourd'hui à paris",
+    "explique-moi le fonctionnement du radar en mode tws",
+    "utilise chatgpt pour résumer ce document",
+    "analyse mon tour et donne-moi des conseils sur les pneus",
+    "peux-tu me rappeler la procédure de démarrage complète de l'avion"
+]
+
+PHRASE_COUNTS = [10, 100, 1000]
+ITERATIONS = 2000
+
+def generate_phrases(count, seed=42):
+    """Générer un jeu de phrases (réelles puis synthétiques)"""
+    rng = random.Random(seed)
+    phrases = BASE_PHRASES[:count]
+    
+    while len(phrases) < count:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                 for _ in range(rng.randint(2, 3))]
+        phrases.append(" ".join(words))
+    
+    return phrases
+
+def build_router(phrases, phrases_per_intent=5):
+    """Construire un routeur avec des intentions de quelques phrases"""
+    router = IntentRouter()
+    for start in range(0, len(phrases), phrases_per_intent):
+        chunk = phrases[start:start + phrases_per_intent]
+        router.register(f"intent_{start}", chunk, lambda command: None)
+    router.compile()
+    return router
+
+def linear_route(intents, command):
+    """Routage naïf: une recherche de sous-chaîne par phrase"""
+    command_lower = command.lower()
+    for name, phrases in intents:
+        if any(phrase in command_lower for phrase in phrases):
+            return name
+    return None
+
+def time_per_call(func, commands, iterations):
+    """Temps moyen par appel en microsecondes"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for command in commands:
+            func(command)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(commands)) * 1_000_000
+
+def main():
+    """Fonction principale"""
+    print("JARVIS - BENCHMARK ROUTEUR D'INTENTIONS")
+    print("=" * 60)
+    print(f"{'Phrases':>8} | {'États':>7} | {'Automate (µs)':>14} | {'Linéaire (µs)':>14}")
+    print("-" * 60)
+    
+    for count in PHRASE_COUNTS:
+        phrases = generate_phrases(count)
+        router = build_router(phrases)
+        linear_intents = [(intent["name"], intent["phrases"]) for intent in router.intents]
+        
+        # Vérifier que les deux routages sont équivalents
+        for command in COMMANDS:
+            routed = router.route(command)
+            expected = linear_route(linear_intents, command)
+            assert (routed["name"] if routed else None) == expected, command
+        
+        automaton_us = time_per_call(router.route, COMMANDS, ITERATIONS)
+        linear_us = time_per_call(lambda command: linear_route(linear_intents, command), COMMANDS, ITERATIONS)
+        
+        print(f"{count:>8} | {len(router.transitions):>7} | {automaton_us:>14.2f} | {linear_us:>14.2f}")
+    
+    print("=" * 60)
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banc de mesure LLM de bout en bout pour J.A.R.V.I.S.
+Fait passer un corpus fixe de demandes (avec et sans contexte) par OllamaClient
+sur une matrice modèles x num_ctx x num_predict x streaming, et mesure premier
+token, latence totale, débits d'évaluation du prompt et de génération et
+mémoire résidente maximale. Résultats en JSON et tableau comparatif
+"""
+
+import io
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import threading
+import itertools
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+from modules.ollama_client import OllamaClient
+from modules.context_tools import ContextTools
+
+# Corpus fixe de demandes (style J.A.R.V.I.S.), contexte construit au lancement
+CORPUS = [
+    {"id": "salutation", "prompt": "Bonjour Jarvis, comment vas-tu ?", "context": None},
+    {"id": "definition", "prompt": "Qu'est-ce que le sous-virage en course automobile ?", "context": None},
+    {"id": "explication", "prompt": "Explique-moi simplement comment fonctionne un radar Doppler à impulsions.",
+     "context": None},
+    {"id": "conseil_code", "prompt": "Donne-moi trois conseils pour rendre un script Python plus rapide.",
+     "context": None},
+    {"id": "telemetrie", "prompt": "Que penses-tu de ma vitesse dans ce virage ?",
+     "context": {"telemetry": {"speed": 187, "gear": 4, "rpm": 7200}}},
+    {"id": "ecran", "prompt": "Résume ce qui est affiché à l'écran.",
+     "context": {"screen_data": "Fenêtre DCS World - Liste de contrôle démarrage APU, batterie ON, "
+                                "générateurs gauche et droit ON, moteur droit en cours de démarrage"}},
+    {"id": "procedure_dcs", "prompt": "Quelle est la prochaine étape de la procédure de démarrage ?",
+     "context": {"dcs_active": True,
+                 "screen_data": "Cockpit F/A-18C - APU prêt, moteur droit à 60%, démarrage moteur gauche"}},
+    {"id": "strategie", "prompt": "Compare une stratégie à un arrêt et à deux arrêts pour une course de 45 minutes.",
+     "context": {"telemetry": {"speed": 203, "fuel": 38.5, "tyre_wear": 0.22}}}
+]
+
+# Processus du serveur Ollama (mémoire des modèles)
+OLLAMA_PROCESS_NAMES = ("ollama", "ollama.exe", "ollama_llama_server", "ollama_llama_server.exe")
+
+class MemorySampler:
+    """Échantillonnage de la mémoire résidente (client et serveur Ollama) pendant une mesure"""
+    
+    def __init__(self, interval=0.05):
+        """Initialisation de l'échantillonneur (intervalle en secondes)"""
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_client = 0
+        self.peak_server = 0
+        self.running = False
+        self.thread = None
+    
+    def server_rss(self):
+        """Mémoire résidente cumulée des processus Ollama"""
+        total = 0
+        for process in psutil.process_iter(["name", "memory_info"]):
+            try:
+                if (process.info["name"] or "").lower() in OLLAMA_PROCESS_NAMES and process.info["memory_info"]:
+                    total += process.info["memory_info"].rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total
+    
+    def sample(self):
+        """Relever la mémoire actuelle"""
+        self.peak_client = max(self.peak_client, self.process.memory_info().rss)
+        self.peak_server = max(self.peak_server, self.server_rss())
+    
+    def loop(self):
+        """Boucle d'échantillonnage"""
+        while self.running:
+            self.sample()
+            time.sleep(self.interval)
+    
+    def __enter__(self):
+        """Démarrer l'échantillonnage"""
+        self.peak_client = self.peak_server = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.loop, daemon=True, name="bench-rss")
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        """Arrêter l'échantillonnage (dernier relevé inclus)"""
+        self.running = False
+        self.thread.join()
+        self.sample()
+
+def build_context(entry):
+    """Contexte au format du ContextStore (données fraîches)"""
+    if entry["context"] is None:
+        return None
+    context = dict(entry["context"])
+    context["updated_at"] = {field: time.time() for field in ("screen_data", "telemetry") if field in context}
+    return context
+
+def percentile(values, ratio):
+    """Percentile simple d'une liste de valeurs"""
+    ordered = sorted(value for value in values if value is not None)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] if ordered else None
+
+def mean(values):
+    """Moyenne des valeurs connues"""
+    known = [value for value in values if value is not None]
+    return sum(known) / len(known) if known else None
+
+def rate(count, duration_ms):
+    """Débit en tokens/s (None si inconnu)"""
+    if not count or not duration_ms:
+        return None
+    return count / (duration_ms / 1000)
+
+def run_streaming(client, entry):
+    """Une demande en streaming (chemin réel de J.A.R.V.I.S.)"""
+    "".join(client.stream_response(entry["prompt"], build_context(entry)))
+    metrics = client.stream_metrics[-1]
+    return {
+        "ttft_ms": metrics["ttft_ms"],
+        "total_ms": metrics["total_ms"],
+        "prompt_tokens_estimate": metrics["prompt_tokens_estimate"],
+        "prompt_eval_count": metrics["prompt_eval_count"],
+        "prompt_eval_ms": metrics["prompt_eval_ms"],
+        "eval_count": metrics["eval_count"],
+        "eval_tokens_per_s": metrics["tokens_per_s"],
+        "tool_calls": metrics["tool_calls"],
+        "load_ms": metrics["load_ms"],
+        "error": metrics["error"]
+    }
+
+def run_blocking(client, entry):
+    """Une demande sans streaming (réponse complète en un seul objet)"""
+    payload = client.build_chat_payload(entry["prompt"], build_context(entry), stream=False)
+    start = time.perf_counter()
+    try:
+        response = client.session.post(f"{client.base_url}/api/chat", json=payload, timeout=300)
+        total_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            return {"ttft_ms": None, "total_ms": round(total_ms, 1), "error": f"HTTP {response.status_code}"}
+        result = response.json()
+    except Exception as e:
+        return {"ttft_ms": None, "total_ms": None, "error": str(e)}
+    
+    eval_ms = result.get("eval_duration", 0) / 1e6
+    eval_rate = rate(result.get("eval_count"), eval_ms)
+    return {
+        # Sans streaming, le premier mot arrive avec la réponse complète
+        "ttft_ms": round(total_ms, 1),
+        "total_ms": round(total_ms, 1),
+        "prompt_eval_count": result.get("prompt_eval_count"),
+        "prompt_eval_ms": round(result.get("prompt_eval_duration", 0) / 1e6, 1),
+        "eval_count": result.get("eval_count"),
+        "eval_tokens_per_s": round(eval_rate, 1) if eval_rate else None,
+        "load_ms": round(result.get("load_duration", 0) / 1e6, 1),
+        "error": None
+    }
+
+def run_combination(url, model, num_ctx, num_predict, stream, corpus, repeat, warmup, verbose, tools=False):
+    """Mesurer une combinaison de la matrice (tools: contexte fourni par appels d'outils)"""
+    config = {"ollama": {"url": url, "model": model, "context_length": num_ctx,
+                         "num_predict": num_predict, "keep_alive": "10m",
+                         # Options fixes de la matrice: pas de réglage automatique
+                         "tuning": {"enabled": False},
+                         "tools": {"enabled": tools}}}
+    output = sys.stdout if verbose else io.StringIO()
+    
+    with redirect_stdout(output):
+        client = OllamaClient(config)
+        client.tools = ContextTools(is_fresh=client.is_context_fresh)
+        if not client.model_available:
+            return None
+        client.preload_model(background=False)
+        
+        # Tours de chauffe (modèle chargé, caches établis) non comptés
+        for entry in corpus[:warmup]:
+            client.clear_history()
+            run_streaming(client, entry)
+        
+        runs = []
+        with MemorySampler() as memory:
+            for iteration in range(repeat):
+                for entry in corpus:
+                    # Chaque demande est indépendante (pas d'historique accumulé)
+                    client.clear_history()
+                    result = run_streaming(client, entry) if stream else run_blocking(client, entry)
+                    prompt_rate = rate(result.get("prompt_eval_count"), result.get("prompt_eval_ms"))
+                    result["prompt_eval_tokens_per_s"] = round(prompt_rate, 1) if prompt_rate else None
+                    result.update({"prompt_id": entry["id"], "iteration": iteration,
+                                   "with_context": entry["context"] is not None})
+                    runs.append(result)
+        
+        client.session.close()
+    
+    ok = [run for run in runs if not run["error"]]
+    return {
+        "model": model,
+        "num_ctx": num_ctx,
+        "num_predict": num_predict,
+        "stream": stream,
+        "tools": tools,
+        "requests": len(runs),
+        "errors": len(runs) - len(ok),
+        "ttft_p50_ms": percentile([run["ttft_ms"] for run in ok], 0.5),
+        "ttft_p95_ms": percentile([run["ttft_ms"] for run in ok], 0.95),
+        "total_p50_ms": percentile([run["total_ms"] for run in ok], 0.5),
+        "total_p95_ms": percentile([run["total_ms"] for run in ok], 0.95),
+        "prompt_eval_tokens_per_s": mean([run["prompt_eval_tokens_per_s"] for run in ok]),
+        "prompt_tokens_mean": mean([run.get("prompt_eval_count") for run in ok]),
+        "eval_tokens_per_s": mean([run["eval_tokens_per_s"] for run in ok]),
+        "peak_rss_client_mb": round(memory.peak_client / 1024 ** 2, 1),
+        "peak_rss_server_mb": round(memory.peak_server / 1024 ** 2, 1) if memory.peak_server else None,
+        "runs": runs
+    }
+
+def check_tool_rounds(model, max_rounds, verbose):
+    """Vérifier la limite de tours d'outils contre un modèle simulé qui en redemande toujours
+    
+    Returns:
+        list: Écarts constatés (vide si la limite est respectée)
+    """
+    from fake_ollama import FakeOllamaServer
+    fake = FakeOllamaServer(port=0, models=[model], ttft=0.01, tokens_per_s=2000, seed=0, tool_calls=-1).start()
+    config = {"ollama": {"url": fake.url, "model": model, "tuning": {"enabled": False},
+                         "tools": {"enabled": True, "max_rounds": max_rounds}}}
+    output = sys.stdout if verbose else io.StringIO()
+    entry = next(entry for entry in CORPUS if entry["id"] == "telemetrie")
+    
+    try:
+        with redirect_stdout(output):
+            client = OllamaClient(config)
+            client.tools = ContextTools(is_fresh=client.is_context_fresh)
+            response = "".join(client.stream_response(entry["prompt"], build_context(entry)))
+            metrics = client.stream_metrics[-1]
+            client.session.close()
+        requests = fake.get_status()["requests"]
+    finally:
+        fake.stop()
+    
+    problems = []
+    # max_rounds tours avec outils, puis un dernier tour sans outils pour obliger le modèle à répondre
+    if requests.get("chat with tools", 0) != max_rounds:
+        problems.append(f"{requests.get('chat with tools', 0)} requête(s) avec outils au lieu de {max_rounds}")
+    if requests.get("chat without tools", 0) != 1:
+        problems.append(f"{requests.get('chat without tools', 0)} requête(s) finale(s) sans outils au lieu de 1")
+    if len(metrics["tool_calls"]) != max_rounds:
+        problems.append(f"{len(metrics['tool_calls'])} appel(s) d'outil exécuté(s) au lieu de {max_rounds}")
+    if not response.strip() or metrics["error"]:
+        problems.append(f"pas de réponse finale ({metrics['error'] or 'réponse vide'})")
+    return problems
+
+def format_value(value, digits=0):
+    """Valeur de tableau ("-" si inconnue)"""
+    return "-" if value is None else f"{value:.{digits}f}"
+
+def print_table(results):
+    """Tableau comparatif compact"""
+    header = (f"{'Modèle':<20} | {'ctx':>5} | {'pred':>4} | {'flux':>4} | {'TTFT p50':>8} | {'Total p50':>9} | "
+              f"{'p95':>7} | {'prompt tok':>10} | {'prompt t/s':>10} | {'gen t/s':>7} | {'RSS Mo':>7} | {'err':>3}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        rss = result["peak_rss_server_mb"] or result["peak_rss_client_mb"]
+        print(f"{result['model'][:20]:<20} | {result['num_ctx']:>5} | {result['num_predict']:>4} | "
+              f"{'oui' if result['stream'] else 'non':>4} | {format_value(result['ttft_p50_ms']):>8} | "
+              f"{format_value(result['total_p50_ms']):>9} | {format_value(result['total_p95_ms']):>7} | "
+              f"{format_value(result['prompt_tokens_mean']):>10} | {format_value(result['prompt_eval_tokens_per_s']):>10} | {format_value(result['eval_tokens_per_s'], 1):>7} | "
+              f"{format_value(rss):>7} | {result['errors']:>3}")
+
+def combination_key(result):
+    """Identifiant d'une combinaison de la matrice"""
+    return (result["model"], result["num_ctx"], result["num_predict"], result["stream"])
+
+def compare_baseline(results, baseline_path, tolerance):
+    """Signaler les combinaisons plus lentes que la référence au-delà de la tolérance"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {combination_key(result): result for result in json.load(f)["results"]}
+    
+    regressions = []
+    for result in results:
+        reference = baseline.get(combination_key(result))
+        if not reference:
+            continue
+        for metric in ("ttft_p50_ms", "total_p50_ms"):
+            before, after = reference.get(metric), result.get(metric)
+            if before and after and after > before * (1 + tolerance):
+                regressions.append(f"{result['model']} ctx={result['num_ctx']} pred={result['num_predict']} "
+                                   f"flux={result['stream']}: {metric} {before:.0f} -> {after:.0f} ms "
+                                   f"(+{(after / before - 1):.0%})")
+    return regressions
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Banc de mesure LLM de bout en bout (OllamaClient)")
+    parser.add_argument("--url", help="Adresse d'Ollama (config/config.json par défaut)")
+    parser.add_argument("--models", nargs="+", help="Modèles à comparer (modèle configuré par défaut)")
+    parser.add_argument("--num-ctx", nargs="+", type=int, default=[2048], help="Tailles de contexte")
+    parser.add_argument("--num-predict", nargs="+", type=int, default=[300], help="Tokens générés maximum")
+    parser.add_argument("--stream", nargs="+", choices=["on", "off"], default=["on", "off"], help="Modes de réponse")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Passes sur le corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="Demandes de chauffe non comptées")
+    parser.add_argument("--no-context", action="store_true", help="Ignorer le contexte du corpus")
+    parser.add_argument("--tools", action="store_true", help="Mode outils: contexte lu à la demande du modèle")
+    parser.add_argument("--fake", action="store_true", help="Utiliser le serveur Ollama simulé (sans GPU)")
+    parser.add_argument("--check-tools", type=int, nargs="?", const=2, metavar="MAX_ROUNDS",
+                        help="Vérifier la limite de tours d'outils sur le serveur simulé puis quitter")
+    parser.add_argument("-o", "--output", help="Fichier JSON de résultats (logs/bench/ par défaut)")
+    parser.add_argument("--baseline", help="Résultats de référence pour détecter les régressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Dégradation tolérée (0.15 = 15%%)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Afficher la sortie du client")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+    
+    config_path = Path("config/config.json")
+    config = json.loads(config_path.read_text(encoding="utf-8")) if config_path.exists() else {"ollama": {}}
+    url = args.url or config["ollama"].get("url", "http://localhost:11434")
+    models = args.models or [config["ollama"].get("model", "llama3.2:3b")]
+    
+    if args.check_tools is not None:
+        problems = check_tool_rounds(models[0], args.check_tools, args.verbose)
+        for problem in problems:
+            print(f"❌ Tours d'outils: {problem}")
+        if not problems:
+            print(f"✅ Tours d'outils limités à {args.check_tools}, dernier tour sans outils")
+        return not problems
+    
+    fake = None
+    if args.fake:
+        from fake_ollama import FakeOllamaServer
+        fake = FakeOllamaServer(port=0, models=models, seed=0, tool_calls=args.tools).start()
+        url = fake.url
+    
+    corpus = [dict(entry, context=None) if args.no_context else entry for entry in CORPUS]
+    matrix = list(itertools.product(models, args.num_ctx, args.num_predict, [mode == "on" for mode in args.stream]))
+    
+    print("JARVIS - BANC DE MESURE LLM")
+    print("=" * 60)
+    print(f"Ollama: {url}{' (simulé)' if fake else ''} | {len(matrix)} combinaison(s) x "
+          f"{len(corpus)} demandes x {args.repeat} passe(s)")
+    
+    results = []
+    try:
+        for model, num_ctx, num_predict, stream in matrix:
+            print(f"⏱️  {model} ctx={num_ctx} pred={num_predict} flux={'oui' if stream else 'non'}...")
+            result = run_combination(url, model, num_ctx, num_predict, stream, corpus,
+                                     args.repeat, args.warmup, args.verbose, tools=args.tools)
+            if result is None:
+                print(f"❌ Modèle {model} indisponible sur {url}")
+                continue
+            results.append(result)
+    finally:
+        if fake:
+            fake.stop()
+    
+    if not results:
+        print("❌ Aucune mesure réalisée")
+        return False
+    
+    print("=" * 60)
+    print_table(results)
+    
+    output = Path(args.output or f"logs/bench/ollama_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "date": datetime.now().isoformat(),
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": psutil.cpu_count(),
+            "ram_gb": round(psutil.virtual_memory().total / 1024 ** 3, 1),
+            "ollama_url": url,
+            "fake": bool(fake)
+        },
+        "matrix": {"models": models, "num_ctx": args.num_ctx, "num_predict": args.num_predict,
+                   "stream": args.stream, "repeat": args.repeat, "context": not args.no_context,
+                   "tools": args.tools},
+        "corpus": [entry["id"] for entry in corpus],
+        "results": results
+    }
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"📄 Résultats: {output}")
+    
+    success = all(result["errors"] == 0 for result in results)
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"⚠️  Régression: {regression}")
+        if not regressions:
+            print(f"✅ Aucune régression par rapport à {args.baseline}")
+        success = success and not regressions
+    
+    return success
+
+if __name__ == "__main__":
+    try:
+        success = main()
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\nMesure interrompue par l'utilisateur")
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur Ollama simulé pour J.A.R.V.I.S.
+Implémente /api/tags, /api/version, /api/chat et /api/generate (avec ou sans
+streaming) avec un temps de premier token, un débit, un taux d'erreur et des
+réponses (prédéfinies ou écho) réglables: tests et mesures sans GPU ni modèle
+"""
+
+import sys
+import json
+import time
+import random
+import re
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Réponses prédéfinies (style J.A.R.V.I.S.)
+CANNED_RESPONSES = [
+    "Bien sûr, monsieur. Tous les systèmes sont opérationnels et je reste à votre disposition.",
+    "D'après mes analyses, la solution la plus simple consiste à vérifier les réglages avant de recommencer.",
+    "Je m'en occupe immédiatement. Le résultat devrait être disponible dans quelques instants.",
+    "Excellente question, monsieur. En résumé, il faut procéder étape par étape et contrôler chaque paramètre."
+]
+
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+def estimate_prompt_tokens(text):
+    """Nombre approximatif de tokens d'un prompt"""
+    return max(1, len(text) // 4)
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP du serveur simulé"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def handle(self):
+        """Ignorer les connexions persistantes fermées par le client"""
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def do_GET(self):
+        """GET /api/version et /api/tags"""
+        fake = self.server.fake
+        fake.count("GET " + self.path)
+        
+        if self.path == "/api/version":
+            self.send_json(200, {"version": fake.version})
+        elif self.path == "/api/tags":
+            self.send_json(200, {"models": [fake.describe_model(name) for name in fake.models]})
+        else:
+            self.send_json(404, {"error": "404 page not found"})
+    
+    def do_POST(self):
+        """POST /api/chat et /api/generate"""
+        fake = self.server.fake
+        fake.count("POST " + self.path)
+        
+        if self.path not in ("/api/chat", "/api/generate"):
+            self.send_json(404, {"error": "404 page not found"})
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except (ValueError, UnicodeDecodeError) as e:
+            self.send_json(400, {"error": f"invalid request: {e}"})
+            return
+        
+        model = request.get("model", "")
+        if model not in fake.models:
+            self.send_json(404, {"error": f"model \"{model}\" not found, try pulling it first"})
+            return
+        
+        if fake.should_fail():
+            self.send_json(500, {"error": "simulated server error"})
+            return
+        
+        chat = self.path == "/api/chat"
+        prompt = self.extract_prompt(request, chat)
+        
+        # Chargement/déchargement seul (préchargement de J.A.R.V.I.S.)
+        if not prompt:
+            unload = request.get("keep_alive") in (0, "0", "0s", "0m")
+            load_ms = 0.0 if unload else fake.load(model)
+            if unload:
+                fake.unload(model)
+            time.sleep(load_ms / 1000)
+            result = {"model": model, "created_at": fake.timestamp(), "done": True,
+                      "done_reason": "unload" if unload else "load", "load_duration": int(load_ms * 1e6)}
+            if chat:
+                result["message"] = {"role": "assistant", "content": ""}
+            else:
+                result["response"] = ""
+            self.send_json(200, result)
+            return
+        
+        options = request.get("options") or {}
+        load_ms = fake.load(model)
+        # Durée et statistiques d'évaluation calculées sur tout le prompt (historique, outils)
+        full_prompt = self.full_prompt(request, chat)
+        
+        # Outils proposés: le modèle simulé appelle le premier tant que son quota n'est pas atteint
+        if chat:
+            fake.count("chat with tools" if request.get("tools") else "chat without tools")
+        if chat and request.get("tools") and fake.wants_tool_call(request.get("messages") or []):
+            self.send_tool_call(model, request["tools"][0], prompt, full_prompt, load_ms, request.get("stream", True))
+            return
+        
+        tokens = fake.response_tokens(prompt, options.get("num_predict"))
+        if request.get("stream", True):
+            self.stream_tokens(model, tokens, full_prompt, load_ms, chat)
+        else:
+            self.send_complete(model, tokens, full_prompt, load_ms, chat)
+    
+    def extract_prompt(self, request, chat):
+        """Texte du prompt (dernier message utilisateur pour /api/chat)"""
+        if not chat:
+            return request.get("prompt", "")
+        messages = request.get("messages") or []
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                return message.get("content", "")
+        return ""
+    
+    def full_prompt(self, request, chat):
+        """Texte complet évalué par le modèle (messages et descripteurs d'outils)"""
+        if not chat:
+            return request.get("prompt", "")
+        text = "\n".join(message.get("content", "") for message in request.get("messages") or [])
+        if request.get("tools"):
+            text += json.dumps(request["tools"], ensure_ascii=False)
+        return text
+    
+    def send_tool_call(self, model, tool, prompt, full_prompt, load_ms, stream):
+        """Réponse limitée à un appel d'outil (paramètres requis remplis avec la question)"""
+        fake = self.server.fake
+        fake.count("tool_calls")
+        started = time.perf_counter()
+        function = tool.get("function", {})
+        arguments = {name: prompt for name in function.get("parameters", {}).get("required", [])}
+        message = {"role": "assistant", "content": "",
+                   "tool_calls": [{"function": {"name": function.get("name"), "arguments": arguments}}]}
+        
+        prompt_ms = fake.first_token_delay(full_prompt) * 1000
+        time.sleep((load_ms + prompt_ms) / 1000)
+        result = {"model": model, "created_at": fake.timestamp(), "message": message}
+        result.update(self.final_fields([], full_prompt, load_ms, prompt_ms, 0.0, started))
+        if not stream:
+            self.send_json(200, result)
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.write_chunk({"model": model, "created_at": fake.timestamp(), "message": message, "done": False})
+        result["message"] = {"role": "assistant", "content": ""}
+        self.write_chunk(result)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+    
+    def final_fields(self, tokens, prompt, load_ms, prompt_ms, eval_ms, started):
+        """Statistiques de fin de génération (durées en nanosecondes, comme Ollama)"""
+        return {
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": int(load_ms * 1e6),
+            "prompt_eval_count": estimate_prompt_tokens(prompt),
+            "prompt_eval_duration": int(prompt_ms * 1e6),
+            "eval_count": len(tokens),
+            "eval_duration": int(eval_ms * 1e6)
+        }
+    
+    def stream_tokens(self, model, tokens, prompt, load_ms, chat):
+        """Réponse NDJSON morceau par morceau (Transfer-Encoding: chunked)"""
+        fake = self.server.fake
+        started = time.perf_counter()
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        try:
+            prompt_ms = fake.first_token_delay(prompt) * 1000
+            time.sleep(load_ms / 1000 + prompt_ms / 1000)
+            
+            eval_start = time.perf_counter()
+            for index, token in enumerate(tokens):
+                if index:
+                    time.sleep(fake.token_interval())
+                chunk = {"model": model, "created_at": fake.timestamp(), "done": False}
+                if chat:
+                    chunk["message"] = {"role": "assistant", "content": token}
+                else:
+                    chunk["response"] = token
+                self.write_chunk(chunk)
+            eval_ms = (time.perf_counter() - eval_start) * 1000
+            
+            final = {"model": model, "created_at": fake.timestamp()}
+            if chat:
+                final["message"] = {"role": "assistant", "content": ""}
+            else:
+                final["response"] = ""
+            final.update(self.final_fields(tokens, prompt, load_ms, prompt_ms, eval_ms, started))
+            self.write_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        
+        except (BrokenPipeError, ConnectionResetError):
+            # Client parti (génération annulée)
+            fake.count("cancelled")
+            self.close_connection = True
+    
+    def send_complete(self, model, tokens, prompt, load_ms, chat):
+        """Réponse complète en un seul objet JSON (stream: false)"""
+        fake = self.server.fake
+        started = time.perf_counter()
+        prompt_ms = fake.first_token_delay(prompt) * 1000
+        eval_ms = max(0, len(tokens) - 1) * fake.token_interval() * 1000
+        time.sleep((load_ms + prompt_ms + eval_ms) / 1000)
+        
+        result = {"model": model, "created_at": fake.timestamp()}
+        text = "".join(tokens)
+        if chat:
+            result["message"] = {"role": "assistant", "content": text}
+        else:
+            result["response"] = text
+        result.update(self.final_fields(tokens, prompt, load_ms, prompt_ms, eval_ms, started))
+        self.send_json(200, result)
+    
+    def write_chunk(self, data):
+        """Écrire un objet NDJSON dans un morceau HTTP"""
+        line = json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+    
+    def send_json(self, status, data):
+        """Envoyer une réponse JSON"""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Journal HTTP uniquement en mode verbeux"""
+        if self.server.fake.verbose:
+            sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+
+class FakeOllamaServer:
+    def __init__(self, host="127.0.0.1", port=11435, models=None, ttft=0.15, tokens_per_s=40.0,
+                 prompt_tokens_per_s=0.0, load_time=0.0, error_rate=0.0, mode="canned",
+                 responses=None, seed=None, tool_calls=False, verbose=False):
+        """Initialisation du serveur simulé
+        
+        Args:
+            host (str): Adresse d'écoute
+            port (int): Port d'écoute (0 = port libre choisi par le système)
+            models (list): Modèles annoncés par /api/tags
+            ttft (float): Délai avant le premier token (secondes)
+            tokens_per_s (float): Débit de génération simulé
+            prompt_tokens_per_s (float): Débit d'évaluation du prompt (0 = inclus dans ttft)
+            load_time (float): Temps de chargement d'un modèle non résident (secondes)
+            error_rate (float): Proportion de requêtes répondues en HTTP 500
+            mode (str): "canned" (réponses prédéfinies) ou "echo" (répète la question)
+            responses (list): Réponses prédéfinies utilisées à tour de rôle
+            seed (int): Graine du tirage des erreurs (reproductibilité)
+            tool_calls (bool|int): Appels d'outils consécutifs avant de répondre (True = 1,
+                -1 = tant que des outils sont proposés, pour vérifier la limite de tours du client)
+            verbose (bool): Afficher chaque requête HTTP
+        """
+        self.host = host
+        self.port = port
+        self.models = list(models or ["llama3.2:3b"])
+        self.ttft = ttft
+        self.tokens_per_s = tokens_per_s
+        self.prompt_tokens_per_s = prompt_tokens_per_s
+        self.load_time = load_time
+        self.error_rate = error_rate
+        self.mode = mode
+        self.responses = list(responses or CANNED_RESPONSES)
+        self.tool_calls = tool_calls
+        self.verbose = verbose
+        self.version = "0.0.0-fake"
+        
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.loaded_models = set()
+        self.response_index = 0
+        self.counters = {}
+        
+        self.httpd = None
+        self.thread = None
+    
+    @property
+    def url(self):
+        """Adresse de base à placer dans config["ollama"]["url"]"""
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self):
+        """Démarrer le serveur dans un thread (utilisation depuis un test ou un banc de mesure)"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), FakeOllamaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="fake-ollama")
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Arrêter le serveur"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def count(self, name):
+        """Compter une requête"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+    
+    def timestamp(self):
+        """Horodatage au format d'Ollama"""
+        return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    
+    def describe_model(self, name):
+        """Entrée de /api/tags"""
+        return {"name": name, "model": name, "modified_at": self.timestamp(), "size": 2019393189,
+                "digest": "fake", "details": {"format": "gguf", "family": "fake", "parameter_size": "3B",
+                                              "quantization_level": "Q4_K_M"}}
+    
+    def wants_tool_call(self, messages):
+        """Le modèle simulé doit-il encore appeler un outil pour cette question"""
+        if not self.tool_calls or not messages:
+            return False
+        # Tours d'outils déjà joués depuis le dernier message utilisateur
+        rounds = 0
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                break
+            if message.get("role") == "assistant" and message.get("tool_calls"):
+                rounds += 1
+        else:
+            return False
+        limit = int(self.tool_calls)
+        return limit < 0 or rounds < limit
+    
+    def should_fail(self):
+        """Tirage d'une erreur simulée"""
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+        if failed:
+            self.count("errors")
+        return failed
+    
+    def load(self, model):
+        """Charger un modèle s'il n'est pas résident; retourne la durée simulée (ms)"""
+        with self.lock:
+            cold = model not in self.loaded_models
+            self.loaded_models.add(model)
+        if cold and self.load_time:
+            return self.load_time * 1000
+        return 1.0
+    
+    def unload(self, model):
+        """Décharger un modèle (keep_alive: 0)"""
+        with self.lock:
+            self.loaded_models.discard(model)
+    
+    def first_token_delay(self, prompt):
+        """Délai avant le premier token (secondes)"""
+        if self.prompt_tokens_per_s:
+            return self.ttft + estimate_prompt_tokens(prompt) / self.prompt_tokens_per_s
+        return self.ttft
+    
+    def token_interval(self):
+        """Intervalle entre deux tokens (secondes)"""
+        return 1.0 / self.tokens_per_s if self.tokens_per_s else 0.0
+    
+    def response_tokens(self, prompt, num_predict=None):
+        """Tokens de la réponse (mots avec leurs espaces), limités à num_predict"""
+        if self.mode == "echo":
+            # La question seule, sans le bloc de contexte ajouté par J.A.R.V.I.S.
+            question = prompt.split("\n\n[CONTEXTE:")[0].strip()
+            text = f"Vous avez dit: {question}"
+        else:
+            with self.lock:
+                text = self.responses[self.response_index % len(self.responses)]
+                self.response_index += 1
+        
+        tokens = TOKEN_PATTERN.findall(text)
+        if num_predict and num_predict > 0:
+            tokens = tokens[:num_predict]
+        return tokens
+    
+    def get_status(self):
+        """Compteurs de requêtes"""
+        with self.lock:
+            return {"url": self.url, "loaded_models": sorted(self.loaded_models), "requests": dict(self.counters)}
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Serveur Ollama simulé (tests et mesures sans GPU)")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=11435, help="Port d'écoute (11434 pour remplacer Ollama)")
+    parser.add_argument("--models", nargs="+", default=["llama3.2:3b"], help="Modèles annoncés")
+    parser.add_argument("--ttft", type=float, default=0.15, help="Délai avant le premier token (s)")
+    parser.add_argument("--tokens-per-s", type=float, default=40.0, help="Débit de génération")
+    parser.add_argument("--prompt-tokens-per-s", type=float, default=0.0, help="Débit d'évaluation du prompt (0 = ignoré)")
+    parser.add_argument("--load-time", type=float, default=0.0, help="Chargement d'un modèle non résident (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion d'erreurs HTTP 500")
+    parser.add_argument("--mode", choices=["canned", "echo"], default="canned", help="Réponses prédéfinies ou écho")
+    parser.add_argument("--responses", help="Fichier de réponses prédéfinies (une par ligne)")
+    parser.add_argument("--seed", type=int, help="Graine du tirage des erreurs")
+    parser.add_argument("--tool-calls", type=int, nargs="?", const=1, default=0,
+                        help="Appels d'outils consécutifs avant de répondre (-1 = tant que des outils sont proposés)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Afficher chaque requête")
+    args = parser.parse_args()
+    
+    responses = None
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as f:
+            responses = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    
+    fake = FakeOllamaServer(
+        host=args.host, port=args.port, models=args.models, ttft=args.ttft,
+        tokens_per_s=args.tokens_per_s, prompt_tokens_per_s=args.prompt_tokens_per_s,
+        load_time=args.load_time, error_rate=args.error_rate, mode=args.mode,
+        responses=responses, seed=args.seed, tool_calls=args.tool_calls, verbose=args.verbose
+    )
+    
+    try:
+        fake.start()
+    except OSError as e:
+        print(f"❌ Impossible d'écouter sur {args.host}:{args.port}: {e}")
+        return False
+    
+    print(f"🧪 Ollama simulé sur {fake.url} | modèles: {', '.join(fake.models)}")
+    print(f"   premier token {args.ttft:.2f}s, {args.tokens_per_s:.0f} tokens/s, erreurs {args.error_rate:.0%}, mode {args.mode}")
+    print(f"   Pour J.A.R.V.I.S.: \"ollama\": {{\"url\": \"{fake.url}\"}} dans config/config.json (Ctrl+C pour arrêter)")
+    
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n📊 {fake.get_status()['requests']}")
+    finally:
+        fake.stop()
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
\ No newline at end of file
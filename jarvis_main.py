@@ -8,27 +8,31 @@ Module principal de gestion
 import os
 import sys
 import json
-import threading
-import time
 import logging
-import select
+import asyncio
+import importlib.util
 from datetime import datetime
 from pathlib import Path
 
-# Pour Windows
-try:
-    import msvcrt
-except ImportError:
-    msvcrt = None
-
 # Modules internes
+from modules.event_core import EventCore
+from modules.intent_router import IntentRouter
 from modules.voice_manager import VoiceManager
 from modules.speech_recognition_module import SpeechRecognitionModule
 from modules.ollama_client import OllamaClient
-from modules.openai_client import OpenAIClient
-from modules.screen_monitor import ScreenMonitor
-from modules.simhub_mechanic import SimHubMechanic
-from modules.dcs_cockpit import DCSCockpit
+from modules.lazy_loader import LazyModule
+from modules.startup_orchestrator import StartupOrchestrator
+from modules.context_store import ContextStore
+from modules.scheduler import BackgroundScheduler
+from modules.tracing import tracer
+from modules.capability_probe import capabilities
+from modules.command_server import CommandServer
+from modules.response_cache import ResponseCache
+from modules.context_tools import ContextTools
+from modules.hedged_llm import HedgedLLM
+from modules.single_flight import SingleFlightLLM
+from modules.speech_pipeline import StreamingSpeechPipeline
+from modules.speech_queue import SpeechOutputQueue, PRIORITY_ALERT, PRIORITY_CHAT
 from modules.memory_manager import MemoryManager
 
 class JARVIS:
@@ -43,15 +47,111 @@ class JARVIS:
         self.is_silent = False
         self.current_voice = "William"  # William ou Windows
         
-        # Initialisation des modules
-        self.memory_manager = MemoryManager()
-        self.voice_manager = VoiceManager(self.config)
-        self.speech_recognition = SpeechRecognitionModule(self.config)
-        self.ollama_client = OllamaClient(self.config)
-        self.openai_client = OpenAIClient(self.config)
-        self.screen_monitor = ScreenMonitor(self.config)
-        self.simhub_mechanic = SimHubMechanic(self.config)
-        self.dcs_cockpit = DCSCockpit(self.config)
+        # Traçage de latence par commande (logs/traces, format Chrome trace)
+        tracer.configure(self.config.get("tracing", {}))
+        
+        # Détection matérielle partagée (CUDA, Tesseract, micros), en cache par environnement
+        capabilities.configure(self.config.get("capabilities", {}))
+        
+        # Initialisation des modules en parallèle (calibrage micro, test Ollama,
+        # voix système et base SQLite sont indépendants)
+        self.startup = StartupOrchestrator()
+        self.startup.add_task("memory_manager", MemoryManager)
+        self.startup.add_task("speech_recognition", lambda: SpeechRecognitionModule(self.config))
+        self.startup.add_task("ollama_client", lambda: OllamaClient(self.config))
+        # Mixer pygame initialisé dans le thread principal (pyttsx3 a son propre thread)
+        self.startup.add_task("voice_manager", lambda: VoiceManager(self.config), main_thread=True)
+        
+        modules = self.startup.run()
+        self.startup.write_report()
+        print(self.startup.format_timeline())
+        self.startup.raise_first_error()
+        
+        self.memory_manager = modules["memory_manager"]
+        self.voice_manager = modules["voice_manager"]
+        self.speech_recognition = modules["speech_recognition"]
+        self.ollama_client = modules["ollama_client"]
+        
+        # Chargement du modèle en arrière-plan pendant la fin du démarrage
+        self.ollama_client.preload_model()
+        
+        # Cache des réponses LLM (questions répétées sans contexte volatil)
+        cache_config = self.config.get("cache", {})
+        self.response_cache = None
+        if cache_config.get("enabled", True):
+            self.response_cache = ResponseCache(
+                max_entries=cache_config.get("max_entries", 256),
+                ttl=cache_config.get("ttl_hours", 24) * 3600,
+                disk_path="memory/response_cache.json" if cache_config.get("disk", True) else None
+            )
+        self.ollama_client.response_cache = self.response_cache
+        
+        # Contexte alimenté en continu par les modules (lecture sans E/S)
+        self.context_store = ContextStore()
+        self.memory_manager.attach_context_store(self.context_store)
+        
+        # Toutes les surveillances périodiques partagent un seul thread
+        self.scheduler = BackgroundScheduler()
+        
+        # Modules chargés au premier usage (OCR, ChatGPT) ou après le démarrage (SimHub, DCS)
+        self.openai_client = LazyModule("OpenAIClient", self.create_openai_client)
+        self.screen_monitor = LazyModule("ScreenMonitor", self.create_screen_monitor)
+        self.simhub_mechanic = LazyModule("SimHubMechanic", self.create_simhub_mechanic)
+        self.dcs_cockpit = LazyModule("DCSCockpit", self.create_dcs_cockpit)
+        
+        # Outils de contexte à la demande (mode outils d'Ollama: écran, télémétrie, DCS, mémoire)
+        self.ollama_client.tools = ContextTools(
+            memory_manager=self.memory_manager,
+            dcs_cockpit=self.dcs_cockpit,
+            is_fresh=self.ollama_client.is_context_fresh
+        )
+        
+        # Génération couverte: ChatGPT en renfort si Ollama tarde à produire un premier token
+        hedging_config = self.config.get("hedging", {})
+        self.hedged_llm = None
+        if hedging_config.get("enabled", False):
+            self.hedged_llm = HedgedLLM(
+                self.ollama_client,
+                self.openai_client,
+                first_token_deadline=hedging_config.get("first_token_deadline", 2.5),
+                secondary_configured=self.openai_configured
+            )
+        
+        # Requêtes identiques simultanées (doublon vocal, clients de l'API) servies par une seule génération
+        coalescing_config = self.config.get("coalescing", {})
+        self.llm_flights = None
+        self.chatgpt_flights = None
+        if coalescing_config.get("enabled", True):
+            linger = coalescing_config.get("linger_s", 2.0)
+            self.llm_flights = SingleFlightLLM(
+                self.hedged_llm or self.ollama_client,
+                linger=linger,
+                history_version=lambda: self.ollama_client.history_version
+            )
+            # ChatGPT sans historique ni contexte: la question seule fait la clé
+            self.chatgpt_flights = SingleFlightLLM(self.openai_client, linger=linger)
+        
+        # File de sortie vocale servie par un thread de lecture dédié
+        self.speech_queue = SpeechOutputQueue(self.voice_manager)
+        self.speech_queue.start()
+        
+        # Réponses LLM prononcées phrase par phrase pendant la génération
+        self.speech_pipeline = StreamingSpeechPipeline(self.speak)
+        
+        # Noyau événementiel (micro, clavier, surveillance)
+        self.event_core = EventCore()
+        
+        # API locale de commandes (pilotage sans micro, tests de charge)
+        api_config = self.config.get("api", {})
+        self.command_server = None
+        if api_config.get("enabled", False):
+            self.command_server = CommandServer(
+                self.process_command,
+                host=api_config.get("host", "127.0.0.1"),
+                port=api_config.get("port", 8765),
+                workers=api_config.get("workers", 2),
+                max_queue=api_config.get("max_queue", 16)
+            )
         
         # Commandes d'activation/désactivation
         self.activation_phrases = [
@@ -63,8 +163,48 @@ class JARVIS:
             "silence", "c'est beau", "tais-toi", "stop"
         ]
         
+        # Routeur d'intentions compilé
+        self.intent_router = IntentRouter()
+        self.register_intents()
+        
         self.logger.info("J.A.R.V.I.S. initialisé avec succès")
         
+    def create_openai_client(self):
+        """Construire le client OpenAI"""
+        from modules.openai_client import OpenAIClient
+        openai_client = OpenAIClient(self.config)
+        openai_client.response_cache = self.response_cache
+        return openai_client
+    
+    def openai_configured(self):
+        """Clé API et bibliothèque OpenAI présentes (sans construire le client)"""
+        return bool(self.config.get("openai", {}).get("api_key")) and importlib.util.find_spec("openai") is not None
+    
+    def create_screen_monitor(self):
+        """Construire le moniteur d'écran (sonde Tesseract)"""
+        from modules.screen_monitor import ScreenMonitor
+        screen_monitor = ScreenMonitor(self.config, scheduler=self.scheduler)
+        screen_monitor.context_store = self.context_store
+        return screen_monitor
+    
+    def create_simhub_mechanic(self):
+        """Construire le mécanicien virtuel SimHub"""
+        from modules.simhub_mechanic import SimHubMechanic
+        simhub_mechanic = SimHubMechanic(self.config, scheduler=self.scheduler)
+        simhub_mechanic.event_callback = self.post_monitor_event
+        simhub_mechanic.context_store = self.context_store
+        # État de connexion connu immédiatement pour la première requête
+        simhub_mechanic.check_simhub_connection()
+        return simhub_mechanic
+    
+    def create_dcs_cockpit(self):
+        """Construire l'assistant cockpit DCS"""
+        from modules.dcs_cockpit import DCSCockpit
+        dcs_cockpit = DCSCockpit(self.config, scheduler=self.scheduler)
+        dcs_cockpit.event_callback = self.post_monitor_event
+        dcs_cockpit.context_store = self.context_store
+        return dcs_cockpit
+    
     def setup_logging(self):
         """Configuration du système de logs"""
         log_dir = Path("logs")
@@ -121,10 +261,10 @@ class JARVIS:
             
             return default_config
     
-    def speak(self, text):
-        """Faire parler J.A.R.V.I.S."""
+    def speak(self, text, on_start=None, priority=PRIORITY_CHAT):
+        """Faire parler J.A.R.V.I.S. (mise en file, retour immédiat)"""
         if not self.is_silent:
-            self.voice_manager.speak(text, voice=self.current_voice)
+            self.speech_queue.enqueue(text, voice=self.current_voice, priority=priority, on_start=on_start)
             self.logger.info(f"J.A.R.V.I.S. dit: {text}")
     
     def listen(self):
@@ -135,184 +275,316 @@ class JARVIS:
             self.logger.error(f"Erreur lors de l'écoute: {e}")
             return None
     
-    def process_command(self, command):
-        """Traiter une commande vocale ou textuelle"""
-        if not command:
-            return
-            
-        command_lower = command.lower()
-        self.logger.info(f"Commande reçue: {command}")
-        
-        # Sauvegarde en mémoire
-        self.memory_manager.add_interaction("user", command)
+    def register_intents(self):
+        """Enregistrer les intentions et leurs gestionnaires (ordre = priorité)"""
+        router = self.intent_router
         
         # Commandes de contrôle système
-        if any(phrase in command_lower for phrase in self.silence_phrases):
-            self.is_silent = True
-            self.speak("Mode silencieux activé.")
-            return
-            
-        if any(phrase in command_lower for phrase in self.activation_phrases) and self.is_silent:
-            self.is_silent = False
-            self.speak("Je suis là, monsieur. Prêt pour vos commandes.")
-            return
-            
+        router.register("silence", self.silence_phrases, self.handle_silence)
+        router.register("activation", self.activation_phrases, self.handle_activation,
+                        condition=lambda: self.is_silent)
+        
         # Commandes de changement de voix
-        if "change de voix" in command_lower or "voix windows" in command_lower:
-            self.current_voice = "Windows" if self.current_voice == "William" else "William"
-            self.speak(f"Voix changée vers {self.current_voice}")
-            return
-            
+        router.register("voice_switch", ["change de voix", "voix windows"], self.handle_voice_switch)
+        
         # Commandes spécifiques aux modules
-        if "utilise chatgpt" in command_lower:
-            response = self.openai_client.get_response(command)
-            self.speak(response)
+        router.register("chatgpt", ["utilise chatgpt"], self.handle_chatgpt)
+        router.register("screen_analysis", ["analyse l'écran"], self.handle_screen_analysis)
+        router.register("simhub_advice", ["analyse mon tour"], self.handle_simhub_advice)
+        router.register("dcs_activate", ["active le module f-18", "module dcs"], self.handle_dcs_activate)
+        router.register("dcs_command", ["comment", "prépare"], self.handle_dcs_command,
+                        condition=lambda: self.dcs_cockpit.is_loaded() and self.dcs_cockpit.is_active)
+        
+        router.compile()
+    
+    def handle_silence(self, command):
+        """Activer le mode silencieux"""
+        self.is_silent = True
+        self.interrupt()
+        # Mémoire du modèle rendue au système jusqu'à la réactivation
+        self.ollama_client.release_model()
+        return "Mode silencieux activé."
+    
+    def interrupt(self):
+        """Couper la parole et la génération en cours"""
+        self.ollama_client.cancel()
+        if self.openai_client.is_loaded():
+            self.openai_client.cancel()
+        if self.llm_flights:
+            self.llm_flights.forget()
+            self.chatgpt_flights.forget()
+        self.speech_queue.cancel()
+    
+    def handle_activation(self, command):
+        """Sortir du mode silencieux"""
+        self.is_silent = False
+        self.ollama_client.preload_model()
+        return "Je suis là, monsieur. Prêt pour vos commandes."
+    
+    def handle_voice_switch(self, command):
+        """Basculer entre les voix William et Windows"""
+        self.current_voice = "Windows" if self.current_voice == "William" else "William"
+        return f"Voix changée vers {self.current_voice}"
+    
+    def handle_chatgpt(self, command, speak=False):
+        """Transmettre la commande à ChatGPT
+        
+        Gère lui-même la mémoire et la parole: un doublon rattaché n'enregistre pas
+        l'échange, et un doublon vocal d'une réponse déjà prononcée n'est pas répété
+        """
+        if self.chatgpt_flights:
+            chunks, leader, spoken = self.chatgpt_flights.join(command, speak=speak)
+        else:
+            chunks, leader, spoken = [self.openai_client.get_response(command)], True, False
+        if spoken:
+            self.logger.info(f"Doublon vocal ignoré (réponse déjà prononcée): {command[:50]}")
+            return None
+        
+        if leader:
+            self.memory_manager.add_interaction("user", command)
+        response = "".join(chunks)
+        if leader and response.strip():
             self.memory_manager.add_interaction("jarvis", response)
-            return
-            
-        if "analyse l'écran" in command_lower:
-            screen_data = self.screen_monitor.analyze_screen()
-            response = f"Je vois: {screen_data}"
-            self.speak(response)
-            return
-            
-        if "analyse mon tour" in command_lower:
-            telemetry = self.simhub_mechanic.get_telemetry_advice()
-            self.speak(telemetry)
-            return
-            
-        if "active le module f-18" in command_lower or "module dcs" in command_lower:
-            self.dcs_cockpit.activate()
-            self.speak("Module F/A-18 activé. Je suis prêt à vous assister.")
-            return
-            
-        if self.dcs_cockpit.is_active and ("comment" in command_lower or "prépare" in command_lower):
-            response = self.dcs_cockpit.handle_command(command)
-            self.speak(response)
-            return
+        if response:
+            self.reply(response, speak)
+        return response
+    
+    def handle_screen_analysis(self, command):
+        """Analyser le contenu de l'écran"""
+        screen_data = self.screen_monitor.analyze_screen()
+        return f"Je vois: {screen_data}"
+    
+    def handle_simhub_advice(self, command):
+        """Conseils mécaniques SimHub"""
+        return self.simhub_mechanic.get_telemetry_advice()
+    
+    def handle_dcs_activate(self, command):
+        """Activer l'assistant DCS F/A-18"""
+        self.dcs_cockpit.activate()
+        return "Module F/A-18 activé. Je suis prêt à vous assister."
+    
+    def handle_dcs_command(self, command):
+        """Commande pour l'assistant DCS actif"""
+        return self.dcs_cockpit.handle_command(command)
+    
+    def process_command(self, command, speak=True):
+        """Traiter une commande vocale ou textuelle
+        
+        Args:
+            command (str): Commande à traiter
+            speak (bool): Prononcer la réponse (False pour l'API locale)
+        
+        Returns:
+            str: Texte de la réponse
+        """
+        if not command:
+            return None
+        
+        # Une trace par commande (reprise de la trace vocale le cas échéant)
+        with tracer.command_trace(command):
+            return self.execute_command(command, speak)
+    
+    def reply(self, text, speak=True):
+        """Prononcer (si demandé) et retourner une réponse"""
+        if speak:
+            self.speak(text)
+        return text
+    
+    def execute_command(self, command, speak=True):
+        """Router une commande et produire la réponse"""
+        self.logger.info(f"Commande reçue: {command}")
+        
+        # Routage vers le gestionnaire d'intention
+        with tracer.span("route"):
+            intent = self.intent_router.route(command)
+        if intent and intent["name"] == "chatgpt":
+            # Requêtes regroupées: mémoire et parole gérées par le gestionnaire
+            self.logger.info(f"Intention détectée: {intent['name']}")
+            with tracer.span(f"intent.{intent['name']}"):
+                return self.handle_chatgpt(command, speak)
+        if intent:
+            self.logger.info(f"Intention détectée: {intent['name']}")
+            # Sauvegarde en mémoire
+            self.memory_manager.add_interaction("user", command)
+            with tracer.span(f"intent.{intent['name']}"):
+                response = intent["handler"](command)
+            if response:
+                self.reply(response, speak)
+            return response
         
         # Commande générale - utiliser Ollama
         try:
             print(f"🤖 Traitement avec Ollama: {command}")
-            context = self.get_context()
-            
-            # Vérifier si Ollama est disponible avant d'essayer
-            if not self.ollama_client.test_connection():
-                print("❌ Ollama non connecté")
-                self.speak("Je ne parviens pas à accéder à mon processeur principal. Vérifiez qu'Ollama est démarré.")
-                return
+            with tracer.span("get_context"):
+                context = self.get_context()
             
-            response = self.ollama_client.get_response(command, context)
+            # Streaming: chaque phrase est prononcée dès qu'elle est complète
+            with tracer.span("llm"):
+                if self.llm_flights:
+                    chunks, leader, spoken = self.llm_flights.join(command, context, speak)
+                else:
+                    chunks = (self.hedged_llm or self.ollama_client).stream_response(command, context)
+                    leader, spoken = True, False
+                if spoken:
+                    # Doublon vocal (reconnaissance répétée): la réponse est déjà prononcée
+                    self.logger.info(f"Doublon vocal ignoré (réponse déjà prononcée): {command[:50]}")
+                    return None
+                # Mémoire écrite une seule fois, par la requête qui a lancé la génération
+                if leader:
+                    self.memory_manager.add_interaction("user", command)
+                if speak:
+                    response = self.speech_pipeline.speak_stream(chunks)
+                else:
+                    response = "".join(chunks)
             print(f"🤖 Réponse Ollama: {response}")
             
             if response and response.strip():
-                self.speak(response)
-                self.memory_manager.add_interaction("jarvis", response)
+                if leader:
+                    self.memory_manager.add_interaction("jarvis", response)
+                return response
             else:
                 print("❌ Réponse vide d'Ollama")
-                self.speak("Je n'ai pas pu générer de réponse. Veuillez réessayer.")
+                return self.reply("Je n'ai pas pu générer de réponse. Veuillez réessayer.", speak)
                 
         except Exception as e:
             error_msg = f"Erreur lors du traitement: {e}"
             self.logger.error(error_msg)
             print(f"❌ Erreur Ollama: {e}")
-            self.speak("Désolé, j'ai rencontré une erreur lors du traitement de votre demande.")
+            return self.reply("Désolé, j'ai rencontré une erreur lors du traitement de votre demande.", speak)
     
     def get_context(self):
-        """Obtenir le contexte actuel (écran, télémétrie, etc.)"""
-        context = {
-            "timestamp": datetime.now().isoformat(),
-            "screen_active": self.screen_monitor.is_monitoring,
-            "dcs_active": self.dcs_cockpit.is_active,
-            "recent_interactions": self.memory_manager.get_recent_interactions(5)
-        }
-        
-        # Ajouter données d'écran si disponibles
-        if self.screen_monitor.is_monitoring:
-            context["screen_data"] = self.screen_monitor.get_current_screen_text()
-        
-        # Ajouter données de télémétrie si disponibles
-        if self.simhub_mechanic.is_connected():
-            context["telemetry"] = self.simhub_mechanic.get_current_telemetry()
-            
-        return context
+        """Obtenir le contexte actuel (écran, télémétrie, etc.)
+        
+        Instantané du ContextStore: les modules y publient leurs données
+        en arrière-plan, aucune E/S n'a lieu ici.
+        """
+        return self.context_store.snapshot()
     
     def start_background_monitoring(self):
-        """Démarrer la surveillance en arrière-plan"""
-        def monitor_screen():
-            while self.is_active:
-                if self.screen_monitor.is_monitoring:
-                    self.screen_monitor.update_screen_data()
-                time.sleep(2)
-        
-        def monitor_simhub():
-            while self.is_active:
-                if self.simhub_mechanic.is_connected():
-                    self.simhub_mechanic.update_telemetry()
-                time.sleep(0.5)
-        
-        # Démarrer les threads de surveillance
-        threading.Thread(target=monitor_screen, daemon=True).start()
-        threading.Thread(target=monitor_simhub, daemon=True).start()
+        """Démarrer la surveillance en arrière-plan
         
+        Les modules planifient leurs propres tâches (OCR écran, connexion et
+        télémétrie SimHub, processus DCS) à leur construction.
+        """
+        # Sonde Ollama de fond, espacée tant que les requêtes réelles réussissent
+        probe_interval = self.ollama_client.health_probe_interval
+        self.scheduler.add_job("ollama_health", self.ollama_client.probe_health,
+                               interval=probe_interval, max_interval=probe_interval * 4,
+                               start_delay=probe_interval)
+        # Cache de réponses écrit sur le disque hors du chemin de génération
+        if self.response_cache:
+            self.scheduler.add_job("response_cache_flush", self.response_cache.flush,
+                                   interval=30, start_delay=30)
+        self.scheduler.start()
         self.logger.info("Surveillance en arrière-plan démarrée")
     
-    def run(self):
-        """Boucle principale de J.A.R.V.I.S."""
+    def post_monitor_event(self, message):
+        """Publier un événement de surveillance dans le noyau"""
+        self.event_core.post_event("monitor", message)
+    
+    def on_voice_command(self, text):
+        """Réception d'une commande vocale (thread d'écoute)
+        
+        Les commandes sont traitées une à une par le noyau; une demande de silence
+        interrompt immédiatement la réponse en cours sans attendre son tour.
+        """
+        intent = self.intent_router.route(text)
+        if intent and intent["name"] == "silence":
+            self.interrupt()
+        self.event_core.post_event("voice", text)
+    
+    def handle_voice_input(self, command):
+        """Traiter une commande vocale reçue"""
+        print(f"🎤 Vous avez dit: {command}")
+        self.process_command(command)
+    
+    def handle_keyboard_input(self, keyboard_input):
+        """Traiter une commande tapée au clavier"""
+        if keyboard_input.lower() == "exit":
+            self.shutdown()
+            return
+        print(f"⌨️ Commande tapée: {keyboard_input}")
+        self.process_command(keyboard_input)
+    
+    def handle_monitor_event(self, message):
+        """Annoncer un événement de surveillance"""
+        self.logger.info(f"Événement de surveillance: {message}")
+        self.speak(message, priority=PRIORITY_ALERT)
+    
+    def shutdown(self):
+        """Arrêter J.A.R.V.I.S."""
+        self.is_active = False
+        self.speech_recognition.stop_continuous_listening()
+        self.scheduler.stop()
+        if self.response_cache:
+            self.response_cache.flush()
+        if self.command_server:
+            self.command_server.stop()
+        self.event_core.stop()
+    
+    async def run_async(self):
+        """Boucle principale événementielle de J.A.R.V.I.S."""
         print("🎤 Initialisation de J.A.R.V.I.S...")
         self.speak("J.A.R.V.I.S. en ligne. Tous les systèmes opérationnels.")
         
-        # Test du microphone
-        print("🎤 Test du microphone...")
-        mic_test = self.speech_recognition.test_microphone()
-        if not mic_test[0]:
-            print(f"❌ Problème microphone: {mic_test[1]}")
-            self.speak("Attention: problème avec le microphone détecté.")
+        # Vérification du microphone (déjà calibré à l'initialisation, sans écoute de test)
+        if not self.speech_recognition.microphone:
+            print("❌ Problème microphone: Microphone non disponible")
+            self.speak("Attention: problème avec le microphone détecté.", priority=PRIORITY_ALERT)
         else:
             print("✅ Microphone opérationnel")
         
         # Démarrer la surveillance en arrière-plan
         self.start_background_monitoring()
         
-        # Activer l'analyse d'écran par défaut
-        self.screen_monitor.start_monitoring()
+        # Activer l'analyse d'écran par défaut, hors du chemin critique
+        if self.config.get("screen", {}).get("monitor_on_start", True):
+            self.event_core.executor.submit(self.screen_monitor.start_monitoring)
+        
+        # Surveillance SimHub (connexion, télémétrie) et DCS (processus) hors du chemin critique
+        if self.config.get("simhub", {}).get("enabled", True):
+            self.event_core.executor.submit(self.simhub_mechanic.get_instance)
+        if self.config.get("dcs", {}).get("enabled", True):
+            self.event_core.executor.submit(self.dcs_cockpit.get_instance)
+        
+        # Sources d'événements: micro, clavier et surveillance
+        self.event_core.add_handler("voice", self.handle_voice_input)
+        self.event_core.add_handler("keyboard", self.handle_keyboard_input)
+        self.event_core.add_handler("monitor", self.handle_monitor_event)
+        
+        self.speech_recognition.start_continuous_listening(on_command=self.on_voice_command)
+        
+        if self.command_server and self.command_server.start():
+            print(f"🌐 API locale: POST {self.command_server.get_status()['address']}/command")
         
         print("🎤 J.A.R.V.I.S. vous écoute... Parlez maintenant !")
         print("💬 Vous pouvez aussi taper des commandes et appuyer sur Entrée")
         
+        self.event_core.start_stdin_source()
+        await self.event_core.run()
+    
+    def run(self):
+        """Boucle principale de J.A.R.V.I.S."""
         try:
-            while self.is_active:
-                # Écoute vocale
-                command = self.listen()
-                if command:
-                    print(f"🎤 Vous avez dit: {command}")
-                    self.process_command(command)
-                
-                # Écoute clavier (compatible Windows/Linux)
-                try:
-                    if msvcrt and msvcrt.kbhit():  # Windows
-                        print("💬 Tapez votre commande: ", end="", flush=True)
-                        keyboard_input = input().strip()
-                        if keyboard_input.lower() == "exit":
-                            break
-                        if keyboard_input:
-                            print(f"⌨️ Commande tapée: {keyboard_input}")
-                            self.process_command(keyboard_input)
-                except KeyboardInterrupt:
-                    break
-                except:
-                    pass  # Ignorer les erreurs de clavier
-                
-                time.sleep(0.1)
-                
+            asyncio.run(self.run_async())
+            
         except KeyboardInterrupt:
             self.logger.info("Arrêt de J.A.R.V.I.S. demandé")
             self.speak("Au revoir, monsieur.")
-            self.is_active = False
         except Exception as e:
             self.logger.error(f"Erreur critique: {e}")
             self.speak("Erreur système critique. Arrêt d'urgence.")
+        finally:
             self.is_active = False
+            self.speech_recognition.stop_continuous_listening()
+            self.scheduler.stop()
+            if self.command_server:
+                self.command_server.stop()
+            self.event_core.shutdown()
+            # Laisser le dernier message se terminer
+            self.speech_queue.wait_until_idle(timeout=10)
+            self.speech_queue.stop()
+            self.ollama_client.release_model(background=False)
 
 if __name__ == "__main__":
     jarvis = JARVIS()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection partagée des capacités matérielles et logicielles pour J.A.R.V.I.S.
+CUDA, Tesseract et microphones sont détectés une seule fois, en parallèle, puis
+mis en cache sur disque avec l'empreinte de l'environnement: les modules lisent
+ce résultat au lieu de refaire la détection (torch n'est importé que si besoin)
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+# Racine du projet: le cache ne dépend pas du répertoire de lancement
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Emplacements Windows habituels de Tesseract, puis le PATH
+TESSERACT_PATHS = [
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+    "tesseract"
+]
+
+# Paquets dont la version change le résultat d'une détection
+FINGERPRINT_PACKAGES = ["torch", "SpeechRecognition", "PyAudio", "pytesseract"]
+
+def probe_cuda():
+    """CUDA via PyTorch (import de torch uniquement ici)"""
+    if importlib.util.find_spec("torch") is None:
+        return {"available": False, "error": "PyTorch non installé"}
+    
+    import torch
+    result = {
+        "available": torch.cuda.is_available(),
+        "torch_version": torch.__version__,
+        "device_count": 0,
+        "devices": []
+    }
+    if result["available"]:
+        result["device_count"] = torch.cuda.device_count()
+        result["devices"] = [torch.cuda.get_device_name(index) for index in range(result["device_count"])]
+    return result
+
+def probe_tesseract():
+    """Premier exécutable Tesseract qui répond, avec sa version et ses langues"""
+    for path in TESSERACT_PATHS:
+        executable = shutil.which(path) or (path if Path(path).exists() else None)
+        if not executable:
+            continue
+        try:
+            version = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=10)
+            if version.returncode != 0:
+                continue
+            langs = subprocess.run([executable, "--list-langs"], capture_output=True, text=True, timeout=10)
+            # La première ligne de --list-langs est un en-tête
+            languages = [line.strip() for line in langs.stdout.splitlines()[1:] if line.strip()]
+            output = (version.stdout or version.stderr).strip()
+            return {
+                "available": True,
+                "path": path,
+                "version": output.splitlines()[0] if output else None,
+                "languages": languages,
+                "french": "fra" in languages
+            }
+        except Exception:
+            continue
+    
+    return {"available": False, "error": "Tesseract non trouvé"}
+
+def probe_microphones():
+    """Liste des périphériques d'entrée audio (PyAudio)"""
+    if importlib.util.find_spec("speech_recognition") is None:
+        return {"available": False, "names": [], "error": "speech_recognition non installé"}
+    
+    import speech_recognition as sr
+    names = sr.Microphone.list_microphone_names()
+    return {"available": len(names) > 0, "names": names}
+
+class CapabilityProbe:
+    def __init__(self, cache_path="memory/capabilities.json", max_age_hours=168):
+        """Initialisation de la détection des capacités
+        
+        Args:
+            cache_path (str): Fichier JSON des résultats, relatif à la racine du projet
+                (None = mémoire seule)
+            max_age_hours (float): Âge maximal d'un résultat avant nouvelle détection
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_path = self.resolve_path(cache_path)
+        self.max_age = max_age_hours * 3600
+        self.probes = {
+            "cuda": probe_cuda,
+            "tesseract": probe_tesseract,
+            "microphones": probe_microphones
+        }
+        
+        # Nom -> {"result", "probed_at", "duration_ms"}
+        self.results = {}
+        # Détections en cours (nom -> événement de fin), partagées entre appelants
+        self.running = {}
+        self.fingerprint = None
+        self.loaded = False
+        self.lock = threading.Lock()
+        
+        # Statistiques
+        self.cache_hits = 0
+        self.probe_runs = 0
+    
+    def resolve_path(self, cache_path):
+        """Chemin du cache (les chemins relatifs partent de la racine du projet)"""
+        if not cache_path:
+            return None
+        path = Path(cache_path)
+        return path if path.is_absolute() else PROJECT_ROOT / path
+    
+    def configure(self, config):
+        """Appliquer la section "capabilities" de la configuration"""
+        with self.lock:
+            cache_path = config.get("cache", str(self.cache_path) if self.cache_path else None)
+            self.cache_path = self.resolve_path(cache_path)
+            self.max_age = config.get("max_age_hours", self.max_age / 3600) * 3600
+            self.loaded = False
+    
+    def compute_fingerprint(self):
+        """Empreinte de l'environnement: système, Python, paquets détectés, PATH et Tesseract"""
+        packages = {}
+        for package in FINGERPRINT_PACKAGES:
+            try:
+                packages[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                packages[package] = None
+        
+        environment = {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "python": sys.version,
+            "executable": sys.executable,
+            "packages": packages,
+            "path": os.environ.get("PATH", ""),
+            "cuda_visible_devices": os.environ.get("CUDA_VISIBLE_DEVICES"),
+            "tesseract": [path for path in TESSERACT_PATHS if shutil.which(path) or Path(path).exists()]
+        }
+        return hashlib.sha256(json.dumps(environment, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    
+    def load(self):
+        """Charger les résultats du cache disque s'ils correspondent à l'environnement"""
+        self.fingerprint = self.compute_fingerprint()
+        self.results = {}
+        self.loaded = True
+        
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            
+            if data.get("fingerprint") != self.fingerprint:
+                self.logger.info("Environnement modifié, capacités à détecter de nouveau")
+                return
+            self.results = data.get("results", {})
+        
+        except Exception as e:
+            self.logger.error(f"Erreur chargement cache des capacités: {e}")
+    
+    def save(self):
+        """Écrire les résultats et l'empreinte sur le disque"""
+        if not self.cache_path:
+            return
+        
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "results": self.results}, f, ensure_ascii=False, indent=2)
+            temp_path.replace(self.cache_path)
+        except Exception as e:
+            self.logger.error(f"Erreur sauvegarde cache des capacités: {e}")
+    
+    def is_fresh(self, name):
+        """Résultat en cache encore valable"""
+        entry = self.results.get(name)
+        return entry is not None and time.time() - entry["probed_at"] <= self.max_age
+    
+    def run_probe(self, name):
+        """Exécuter une détection (une erreur devient un résultat indisponible)"""
+        start = time.perf_counter()
+        try:
+            result = self.probes[name]()
+        except Exception as e:
+            result = {"available": False, "error": str(e)}
+        return {
+            "result": result,
+            "probed_at": time.time(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+    
+    def ensure(self, names=None, refresh=False):
+        """Détecter en parallèle les capacités demandées absentes, périmées ou forcées
+        
+        Seules les capacités demandées sont détectées (torch n'est importé que pour "cuda"),
+        hors du verrou: une détection lente ne bloque pas la lecture des autres résultats.
+        
+        Args:
+            names (list): Capacités demandées (None = toutes)
+            refresh (bool): Ignorer le cache pour ces capacités
+        
+        Returns:
+            dict: Résultat de chaque capacité demandée
+        """
+        names = list(names or self.probes)
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            
+            stale = [name for name in names if refresh or not self.is_fresh(name)]
+            if not stale:
+                self.cache_hits += 1
+                return {name: self.results[name]["result"] for name in names}
+            
+            # Détection déjà lancée par un autre appelant: attendre son résultat
+            waiting = [self.running[name] for name in stale if name in self.running]
+            mine = [name for name in stale if name not in self.running]
+            for name in mine:
+                self.running[name] = threading.Event()
+        
+        if mine:
+            entries = {}
+            try:
+                with ThreadPoolExecutor(max_workers=len(mine), thread_name_prefix="capability") as executor:
+                    entries = dict(zip(mine, executor.map(self.run_probe, mine)))
+            finally:
+                with self.lock:
+                    self.results.update(entries)
+                    self.probe_runs += 1
+                    self.save()
+                    for name in mine:
+                        self.running.pop(name).set()
+            self.logger.info("Capacités détectées: " + ", ".join(
+                f"{name} ({entry['duration_ms']:.0f} ms)" for name, entry in entries.items()))
+        
+        for event in waiting:
+            event.wait()
+        
+        with self.lock:
+            return {name: self.results[name]["result"] for name in names}
+    
+    def get(self, name, refresh=False):
+        """Résultat d'une capacité (dict avec au moins "available")"""
+        return self.ensure([name], refresh=refresh)[name]
+    
+    def invalidate(self, name=None):
+        """Oublier un résultat qui s'est révélé faux (None = tous)"""
+        with self.lock:
+            if name is None:
+                self.results.clear()
+            else:
+                self.results.pop(name, None)
+            if self.loaded:
+                self.save()
+    
+    def get_status(self):
+        """Capacités connues et âge des résultats"""
+        with self.lock:
+            results = {
+                name: dict(entry["result"], age_s=round(time.time() - entry["probed_at"]), duration_ms=entry["duration_ms"])
+                for name, entry in self.results.items()
+            }
+        return {
+            "fingerprint": self.fingerprint,
+            "cache": str(self.cache_path) if self.cache_path else None,
+            "cache_hits": self.cache_hits,
+            "probe_runs": self.probe_runs,
+            "capabilities": results
+        }
+
+# Détection partagée par tous les modules et scripts
+capabilities = CapabilityProbe()
\ No newline at end of file
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API locale de commandes pour J.A.R.V.I.S.
+Serveur HTTP sur localhost: les commandes passent par le même routage que la voix
+et la réponse texte est renvoyée (fonctionnement sans micro, tests de charge)
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Seuls les clients locaux sont acceptés (Host et Origin), contre le CSRF et le DNS rebinding
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+def is_loopback_host(value):
+    """Vérifier qu'un en-tête Host ou Origin désigne la machine locale"""
+    try:
+        host = urlsplit(value if "//" in value else f"//{value}").hostname
+    except ValueError:
+        return False
+    return host in LOOPBACK_HOSTS
+
+class CommandRequestHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP de l'API locale"""
+    
+    def check_origin(self):
+        """Refuser (403) les requêtes venant d'une page web ou d'un nom d'hôte non local"""
+        origin = self.headers.get("Origin")
+        if not is_loopback_host(self.headers.get("Host", "")) or (origin is not None and not is_loopback_host(origin)):
+            logging.getLogger(__name__).warning(f"Requête API refusée (Host: {self.headers.get('Host')}, Origin: {origin})")
+            self.send_json(403, {"error": "Origine non autorisée"})
+            return False
+        return True
+    
+    def do_GET(self):
+        """GET /status: statut de l'API"""
+        if not self.check_origin():
+            return
+        
+        if self.path != "/status":
+            self.send_json(404, {"error": "Ressource inconnue"})
+            return
+        
+        self.send_json(200, self.server.command_server.get_status())
+    
+    def do_POST(self):
+        """POST /command: {"command": "...", "speak": false} (application/json uniquement)"""
+        if not self.check_origin():
+            return
+        
+        if self.path != "/command":
+            self.send_json(404, {"error": "Ressource inconnue"})
+            return
+        
+        # Un formulaire HTML ne peut pas envoyer de JSON sans requête préliminaire CORS
+        if not self.headers.get("Content-Type", "").startswith("application/json"):
+            self.send_json(415, {"error": "Content-Type application/json requis"})
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            if not isinstance(request, dict):
+                raise ValueError("objet JSON attendu")
+        except (ValueError, UnicodeDecodeError) as e:
+            self.send_json(400, {"error": f"Requête invalide: {e}"})
+            return
+        
+        command = str(request.get("command", "")).strip()
+        if not command:
+            self.send_json(400, {"error": "Commande vide"})
+            return
+        
+        status, result = self.server.command_server.execute(command, speak=bool(request.get("speak", False)))
+        self.send_json(status, result)
+    
+    def send_json(self, status, data):
+        """Envoyer une réponse JSON"""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Journaliser via logging plutôt que sur stderr"""
+        logging.getLogger(__name__).debug(format % args)
+
+class CommandServer:
+    def __init__(self, process_func, host="127.0.0.1", port=8765, workers=2, max_queue=16, timeout=120):
+        """Initialisation de l'API locale
+        
+        Args:
+            process_func (callable): process_func(commande, speak=bool) -> texte de la réponse
+            host (str): Adresse d'écoute (localhost uniquement par défaut)
+            port (int): Port d'écoute
+            workers (int): Nombre de commandes traitées en parallèle
+            max_queue (int): Commandes en attente au-delà desquelles l'API répond 503
+            timeout (float): Délai maximal d'attente d'une réponse (secondes)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.process_func = process_func
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.timeout = timeout
+        
+        # File de travail bornée partagée par les clients
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.worker_threads = []
+        
+        self.httpd = None
+        self.server_thread = None
+        self.running = False
+        
+        # Statistiques
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.latencies = []
+        self.max_latencies = 200
+    
+    def start(self):
+        """Démarrer le serveur HTTP et les workers"""
+        if self.running:
+            return True
+        
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), CommandRequestHandler)
+        except OSError as e:
+            self.logger.error(f"Impossible de démarrer l'API locale sur {self.host}:{self.port}: {e}")
+            return False
+        
+        self.httpd.daemon_threads = True
+        self.httpd.command_server = self
+        self.running = True
+        
+        for index in range(self.workers):
+            worker = threading.Thread(target=self.worker_loop, daemon=True, name=f"jarvis-api-{index}")
+            worker.start()
+            self.worker_threads.append(worker)
+        
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="jarvis-api")
+        self.server_thread.start()
+        
+        self.logger.info(f"API locale démarrée sur http://{self.host}:{self.port}")
+        return True
+    
+    def execute(self, command, speak=False):
+        """Mettre une commande en file et attendre sa réponse
+        
+        Returns:
+            tuple: (code HTTP, données JSON)
+        """
+        job = {
+            "command": command,
+            "speak": speak,
+            "submitted_at": time.perf_counter(),
+            "done": threading.Event(),
+            "response": None,
+            "error": None
+        }
+        
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.rejected += 1
+            return 503, {"error": "File de commandes pleine, réessayez plus tard"}
+        
+        if not job["done"].wait(self.timeout):
+            return 504, {"error": "Délai de traitement dépassé"}
+        
+        if job["error"]:
+            return 500, {"error": job["error"]}
+        
+        return 200, {
+            "command": command,
+            "response": job["response"],
+            "queue_ms": job["queue_ms"],
+            "latency_ms": job["latency_ms"]
+        }
+    
+    def worker_loop(self):
+        """Traiter les commandes de la file"""
+        while self.running:
+            job = self.queue.get()
+            if job is None:
+                break
+            
+            started_at = time.perf_counter()
+            job["queue_ms"] = round((started_at - job["submitted_at"]) * 1000, 1)
+            try:
+                job["response"] = self.process_func(job["command"], speak=job["speak"])
+                self.completed += 1
+            except Exception as e:
+                self.logger.error(f"Erreur traitement commande API: {e}")
+                job["error"] = str(e)
+                self.failed += 1
+            
+            job["latency_ms"] = round((time.perf_counter() - job["submitted_at"]) * 1000, 1)
+            self.latencies.append(job["latency_ms"])
+            if len(self.latencies) > self.max_latencies:
+                self.latencies.pop(0)
+            job["done"].set()
+    
+    def stop(self):
+        """Arrêter le serveur et les workers"""
+        if not self.running:
+            return
+        
+        self.running = False
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        
+        for _ in self.worker_threads:
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                break
+        
+        self.logger.info("API locale arrêtée")
+    
+    def get_status(self):
+        """Obtenir le statut de l'API"""
+        latencies = sorted(self.latencies)
+        return {
+            "running": self.running,
+            "address": f"http://{self.host}:{self.port}",
+            "workers": self.workers,
+            "pending": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "median_latency_ms": latencies[len(latencies) // 2] if latencies else None
+        }
\ No newline at end of file
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Empaquetage du contexte des prompts Ollama pour J.A.R.V.I.S.
+Remplit la fenêtre num_ctx par priorité (prompt système, question, contexte frais,
+échanges récents) et résume les échanges les plus anciens
+"""
+
+import logging
+import math
+import re
+
+# Caractères par token (estimation pour le français avec les tokenizers Llama/Mistral)
+CHARS_PER_TOKEN = 3.2
+
+# Surcoût par message (balises de rôle du template de chat)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text):
+    """Nombre approximatif de tokens d'un texte"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+class ContextPacker:
+    def __init__(self, num_ctx=2048, num_predict=300, summary_tokens=120, context_share=0.4,
+                 history_block=8, safety_margin=0.05, tokenizer=None):
+        """Initialisation de l'empaqueteur
+        
+        Args:
+            num_ctx (int): Taille de la fenêtre de contexte du modèle
+            num_predict (int): Tokens réservés à la réponse
+            summary_tokens (int): Budget maximal du résumé des anciens échanges
+            context_share (float): Part maximale du budget pour le contexte frais (OCR écran)
+            history_block (int): Les anciens messages sont abandonnés par blocs de cette taille,
+                pour que le début du prompt (cache KV d'Ollama) reste identique entre les tours
+            safety_margin (float): Marge relative pour compenser l'estimation
+            tokenizer (callable): tokenizer(texte) -> nombre de tokens (estimation sinon)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.summary_tokens = summary_tokens
+        self.context_share = context_share
+        self.history_block = history_block
+        self.safety_margin = safety_margin
+        self.tokenizer = tokenizer or estimate_tokens
+        
+        self.last_report = None
+    
+    def get_budget(self):
+        """Tokens disponibles pour le prompt"""
+        return int((self.num_ctx - self.num_predict) * (1 - self.safety_margin))
+    
+    def count(self, text):
+        """Tokens d'un message (texte + balises de rôle)"""
+        return self.tokenizer(text) + MESSAGE_OVERHEAD_TOKENS
+    
+    def truncate(self, text, max_tokens):
+        """Couper un texte pour qu'il tienne dans max_tokens (estimation)"""
+        max_chars = int(max_tokens * CHARS_PER_TOKEN)
+        if len(text) <= max_chars:
+            return text
+        return text[:max(0, max_chars - 1)].rstrip() + "…"
+    
+    def summarize(self, turns, max_tokens):
+        """Résumé extractif des échanges abandonnés (premières phrases, plus récents d'abord)"""
+        lines = []
+        used = self.count("Résumé des échanges précédents:")
+        
+        # Paires question/réponse, de la plus récente à la plus ancienne
+        for message in reversed(turns):
+            first_sentence = SENTENCE_END.split(message["content"].strip(), maxsplit=1)[0]
+            prefix = "Q" if message["role"] == "user" else "R"
+            line = f"{prefix}: {self.truncate(first_sentence, 40)}"
+            cost = self.tokenizer(line) + 1
+            if used + cost > max_tokens:
+                break
+            lines.append(line)
+            used += cost
+        
+        if not lines:
+            return None
+        return "Résumé des échanges précédents:\n" + "\n".join(reversed(lines))
+    
+    def pack(self, system_prompt, question, context_items, history, history_offset=0):
+        """Choisir ce qui entre dans la fenêtre de contexte
+        
+        Args:
+            system_prompt (str): Prompt système (toujours inclus)
+            question (str): Question courante (toujours incluse)
+            context_items (list): Éléments de contexte frais, par priorité décroissante
+            history (list): Messages {"role", "content"} du plus ancien au plus récent
+            history_offset (int): Nombre de messages déjà retirés de l'historique (numérotation absolue)
+        
+        Returns:
+            dict: context_items et history retenus, summary (ou None) et rapport
+        """
+        budget = self.get_budget()
+        used = self.count(system_prompt) + self.count(question) + self.tokenizer("\n\n[CONTEXTE: ]")
+        
+        # Contexte frais: les éléments courts d'abord, le plus long (écran) est tronqué
+        context_limit = min(budget, used + int(budget * self.context_share))
+        kept = {}
+        for position in sorted(range(len(context_items)), key=lambda i: len(context_items[i])):
+            item = context_items[position]
+            cost = self.tokenizer(item) + 1
+            remaining = context_limit - used
+            if cost > remaining:
+                if remaining < 20:
+                    continue
+                item = self.truncate(item, remaining - 1)
+                cost = self.tokenizer(item) + 1
+            kept[position] = item
+            used += cost
+        kept_context = [kept[position] for position in sorted(kept)]
+        
+        # Échanges récents, par paires question/réponse, en réservant la place du résumé
+        reserve = self.summary_tokens if len(history) > 2 else 0
+        kept_start = len(history)
+        index = len(history)
+        while index > 0:
+            start = max(0, index - 2)
+            cost = sum(self.count(message["content"]) for message in history[start:index])
+            if used + cost > budget - reserve:
+                break
+            used += cost
+            kept_start = start
+            index = start
+        
+        # Point de coupe aligné sur un bloc absolu: il ne bouge qu'une fois tous les
+        # history_block messages, le préfixe reste donc stable d'un tour à l'autre
+        if kept_start > 0 and self.history_block > 1:
+            absolute_start = history_offset + kept_start
+            aligned_start = -(-absolute_start // self.history_block) * self.history_block
+            aligned = min(len(history), aligned_start - history_offset)
+            used -= sum(self.count(message["content"]) for message in history[kept_start:aligned])
+            kept_start = aligned
+        
+        dropped = history[:kept_start]
+        summary = None
+        if dropped:
+            summary = self.summarize(dropped, min(self.summary_tokens, budget - used))
+            if summary:
+                used += self.count(summary)
+        
+        self.last_report = {
+            "budget": budget,
+            "estimated_tokens": used,
+            "context_items": len(kept_context),
+            "context_dropped": len(context_items) - len(kept_context),
+            "turns_kept": len(history) - kept_start,
+            "turns_dropped": len(dropped),
+            "summarized": summary is not None
+        }
+        if dropped:
+            self.logger.debug(f"Fenêtre de contexte: {self.last_report}")
+        
+        return {
+            "context_items": kept_context,
+            "history": history[kept_start:],
+            "summary": summary,
+            "report": self.last_report
+        }
\ No newline at end of file
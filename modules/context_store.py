@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Magasin de contexte pour J.A.R.V.I.S.
+Les modules y publient leurs données en arrière-plan; la lecture du contexte
+est un instantané sans aucune entrée/sortie
+"""
+
+import logging
+import threading
+import time
+
+class ContextStore:
+    def __init__(self):
+        """Initialisation du magasin de contexte"""
+        self.logger = logging.getLogger(__name__)
+        
+        # Champ -> {"value", "version", "changed_at", "updated_at"}
+        self.fields = {}
+        self.version = 0
+        self.lock = threading.Lock()
+        
+        # Instantané reconstruit uniquement après une modification
+        self.snapshot_cache = None
+        self.snapshot_version = -1
+    
+    def update(self, field, value):
+        """Publier une valeur (la version n'augmente que si la valeur change)"""
+        now = time.time()
+        with self.lock:
+            entry = self.fields.get(field)
+            if entry is not None and entry["value"] == value:
+                entry["updated_at"] = now
+                # L'instantané déjà distribué reste intact: le suivant est reconstruit
+                # avec la nouvelle date, sans changer les versions
+                self.snapshot_version = -1
+                return entry["version"]
+            
+            self.version += 1
+            self.fields[field] = {
+                "value": value,
+                "version": self.version,
+                "changed_at": now,
+                "updated_at": now
+            }
+            return self.version
+    
+    def remove(self, field):
+        """Retirer un champ devenu indisponible"""
+        with self.lock:
+            if self.fields.pop(field, None) is not None:
+                self.version += 1
+    
+    def get(self, field, default=None):
+        """Lire la valeur d'un champ"""
+        entry = self.fields.get(field)
+        return entry["value"] if entry else default
+    
+    def get_version(self, field):
+        """Version courante d'un champ (0 si absent)"""
+        entry = self.fields.get(field)
+        return entry["version"] if entry else 0
+    
+    def get_age(self, field):
+        """Secondes écoulées depuis la dernière publication du champ"""
+        entry = self.fields.get(field)
+        return time.time() - entry["updated_at"] if entry else None
+    
+    def snapshot(self):
+        """Instantané du contexte (partagé, à ne pas modifier)
+        
+        Contient les valeurs des champs ainsi que leurs versions ("versions")
+        et les horodatages de dernière publication ("updated_at").
+        """
+        cached = self.snapshot_cache
+        if cached is not None and self.snapshot_version == self.version:
+            return cached
+        
+        with self.lock:
+            snapshot = {field: entry["value"] for field, entry in self.fields.items()}
+            snapshot["versions"] = {field: entry["version"] for field, entry in self.fields.items()}
+            snapshot["updated_at"] = {field: entry["updated_at"] for field, entry in self.fields.items()}
+            self.snapshot_cache = snapshot
+            self.snapshot_version = self.version
+        
+        return snapshot
+    
+    def get_status(self):
+        """Obtenir le statut du magasin"""
+        return {
+            "version": self.version,
+            "fields": {
+                field: {"version": entry["version"], "age_s": round(time.time() - entry["updated_at"], 1)}
+                for field, entry in list(self.fields.items())
+            }
+        }
\ No newline at end of file
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Outils de contexte à la demande pour le LLM de J.A.R.V.I.S.
+Au lieu d'ajouter l'écran et la télémétrie à chaque prompt, le modèle reçoit
+de courts descripteurs d'outils (écran, télémétrie, procédures DCS, mémoire)
+et n'obtient que les données qu'il demande
+"""
+
+import json
+import logging
+import threading
+from modules.context_packer import estimate_tokens
+from modules.model_router import normalize_words
+
+# Mots français renvoyant aux entrées de la base DCS (clés anglaises)
+DCS_ALIASES = {
+    "demarrage": "startup", "demarrer": "startup", "mise": "startup",
+    "decollage": "takeoff", "decoller": "takeoff",
+    "atterrissage": "landing", "atterrir": "landing", "appontage": "landing",
+    "feu": "engine_fire", "incendie": "engine_fire", "moteur": "engine_fire",
+    "hydraulique": "hydraulic_failure", "panne": "hydraulic_failure",
+    "missile": "armement", "missiles": "armement", "bombe": "armement", "bombes": "armement", "armes": "armement"
+}
+
+class ContextTools:
+    def __init__(self, memory_manager=None, dcs_cockpit=None, is_fresh=None, max_result_chars=1200):
+        """Initialisation des outils
+        
+        Args:
+            memory_manager: Gestionnaire de mémoire (recherche dans les échanges passés)
+            dcs_cockpit: Assistant DCS (LazyModule accepté, chargé seulement si DCS est actif)
+            is_fresh (callable): is_fresh(context, champ) -> donnée assez récente
+            max_result_chars (int): Longueur maximale d'un résultat renvoyé au modèle
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memory_manager = memory_manager
+        self.dcs_cockpit = dcs_cockpit
+        self.is_fresh = is_fresh or (lambda context, field: bool(context.get(field)))
+        self.max_result_chars = max_result_chars
+        
+        self.tools = {
+            "lire_ecran": {
+                "description": "Texte actuellement affiché à l'écran (OCR)",
+                "parameters": {},
+                "handler": self.read_screen
+            },
+            "telemetrie": {
+                "description": "Résumé de la télémétrie de course en cours (SimHub)",
+                "parameters": {},
+                "handler": self.telemetry_summary
+            },
+            "procedure_dcs": {
+                "description": "Procédure ou système du F/A-18C dans DCS",
+                "parameters": {"sujet": "Sujet recherché, ex. démarrage, radar, feu moteur"},
+                "handler": self.dcs_procedure
+            },
+            "recherche_memoire": {
+                "description": "Rechercher dans les conversations passées",
+                "parameters": {"requete": "Mot ou expression à retrouver"},
+                "handler": self.search_memory
+            }
+        }
+        
+        # Statistiques par outil
+        self.lock = threading.Lock()
+        self.stats = {name: {"calls": 0, "errors": 0, "result_tokens": 0} for name in self.tools}
+        self.offered = 0
+        self.unknown_calls = 0
+    
+    def available(self, context):
+        """Outils utiles pour ce contexte (source présente et fraîche)"""
+        context = context or {}
+        names = []
+        if self.is_fresh(context, "screen_data"):
+            names.append("lire_ecran")
+        if self.is_fresh(context, "telemetry"):
+            names.append("telemetrie")
+        if context.get("dcs_active") and self.dcs_cockpit is not None:
+            names.append("procedure_dcs")
+        if self.memory_manager is not None:
+            names.append("recherche_memoire")
+        return names
+    
+    def descriptors(self, context):
+        """Descripteurs compacts au format "tools" de l'API chat d'Ollama"""
+        descriptors = []
+        for name in self.available(context):
+            tool = self.tools[name]
+            descriptors.append({
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": tool["description"],
+                    "parameters": {
+                        "type": "object",
+                        "properties": {key: {"type": "string", "description": text} for key, text in tool["parameters"].items()},
+                        "required": list(tool["parameters"])
+                    }
+                }
+            })
+        if descriptors:
+            with self.lock:
+                self.offered += 1
+        return descriptors
+    
+    def execute(self, name, arguments, context):
+        """Exécuter un appel d'outil demandé par le modèle
+        
+        Args:
+            name (str): Nom de l'outil
+            arguments (dict|str): Arguments (objet ou JSON selon le modèle)
+            context (dict): Instantané du contexte de la requête
+        
+        Returns:
+            str: Résultat à renvoyer au modèle (message d'erreur court en cas d'échec)
+        """
+        tool = self.tools.get(name)
+        if tool is None:
+            with self.lock:
+                self.unknown_calls += 1
+            return f"Outil inconnu: {name}"
+        
+        try:
+            if isinstance(arguments, str):
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            result = tool["handler"](context or {}, **{key: str(value) for key, value in (arguments or {}).items()
+                                                        if key in tool["parameters"]})
+        except Exception as e:
+            self.logger.error(f"Erreur outil {name}: {e}")
+            with self.lock:
+                self.stats[name]["errors"] += 1
+            return f"Erreur: {e}"
+        
+        if len(result) > self.max_result_chars:
+            result = result[:self.max_result_chars] + "..."
+        with self.lock:
+            self.stats[name]["calls"] += 1
+            self.stats[name]["result_tokens"] += estimate_tokens(result)
+        self.logger.info(f"Outil {name}({arguments}) -> {len(result)} caractères")
+        return result
+    
+    def read_screen(self, context):
+        """Texte de l'écran publié par ScreenMonitor"""
+        if not self.is_fresh(context, "screen_data"):
+            return "Aucun texte d'écran récent."
+        return context["screen_data"]
+    
+    def telemetry_summary(self, context):
+        """Valeurs simples de la télémétrie publiée par SimHubMechanic"""
+        if not self.is_fresh(context, "telemetry"):
+            return "Aucune télémétrie récente."
+        telemetry = context["telemetry"]
+        values = [f"{key}: {value}" for key, value in telemetry.items()
+                  if isinstance(value, (int, float, str)) and value not in ("", None)]
+        return " | ".join(values) if values else "Télémétrie vide."
+    
+    def dcs_procedure(self, context, sujet=""):
+        """Entrées de la base F/A-18C correspondant au sujet demandé"""
+        cockpit = self.dcs_cockpit
+        entries = {name: "\n".join(steps) for name, steps in cockpit.procedures.items()}
+        entries.update({name: "\n".join(steps) for name, steps in cockpit.knowledge_base["procedures_urgence"].items()})
+        entries.update({name: json.dumps(info, ensure_ascii=False) for name, info in cockpit.knowledge_base["systemes"].items()})
+        
+        words = normalize_words(sujet)
+        targets = {DCS_ALIASES.get(word, word) for word in words}
+        matches = [name for name in entries if name in targets or any(word in name for word in words if len(word) > 3)]
+        if not matches:
+            return f"Aucune entrée pour \"{sujet}\". Sujets disponibles: {', '.join(entries)}."
+        return "\n\n".join(f"{name}:\n{entries[name]}" for name in matches[:2])
+    
+    def search_memory(self, context, requete=""):
+        """Échanges passés contenant la requête (30 derniers jours)"""
+        if not requete.strip():
+            return "Requête vide."
+        results = self.memory_manager.search_interactions(requete, days_back=30)
+        if not results:
+            return f"Aucun échange trouvé pour \"{requete}\"."
+        return "\n".join(f"[{result['timestamp'][:16]}] {result['speaker']}: {result['content'][:200]}"
+                         for result in results[:5])
+    
+    def get_status(self):
+        """Appels et volume renvoyé par outil"""
+        with self.lock:
+            tools = {name: dict(stats) for name, stats in self.stats.items()}
+        return {
+            "offered": self.offered,
+            "unknown_calls": self.unknown_calls,
+            "tools": tools
+        }
\ No newline at end of file
@@ -8,13 +8,12 @@ Assistant pour DCS World F/A-18C Hornet
 import logging
 import json
 import psutil
-import time
 import threading
 from datetime import datetime
 from pathlib import Path
 
 class DCSCockpit:
-    def __init__(self, config):
+    def __init__(self, config, scheduler=None):
         """Initialisation de l'assistant cockpit DCS"""
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -28,6 +27,16 @@ class DCSCockpit:
         self.dcs_running = False
         self.current_phase = "parked"  # parked, startup, taxi, takeoff, flight, landing
         
+        # Planificateur des tâches de fond (thread dédié si absent)
+        self.scheduler = scheduler
+        self.monitor_stop = threading.Event()
+        
+        # Notification des changements d'état (noyau événementiel)
+        self.event_callback = None
+        
+        # Publication vers le magasin de contexte de J.A.R.V.I.S.
+        self.context_store = None
+        
         # Base de connaissances F/A-18C
         self.knowledge_base = self.load_fa18_knowledge()
         
@@ -123,14 +132,31 @@ class DCSCockpit:
     
     def start_dcs_monitoring(self):
         """Démarrer la surveillance de DCS World"""
+        if self.scheduler:
+            # Toutes les 10 s pendant le vol, espacé jusqu'à 30 s quand DCS est fermé
+            self.scheduler.add_job("dcs_process", self.poll_dcs_status,
+                                   interval=10, max_interval=30, backoff=1.5)
+            return
+        
         def monitor():
-            while True:
+            while not self.monitor_stop.is_set():
                 self.check_dcs_status()
-                time.sleep(10)
+                self.monitor_stop.wait(10)
         
         monitor_thread = threading.Thread(target=monitor, daemon=True)
         monitor_thread.start()
     
+    def stop_dcs_monitoring(self):
+        """Arrêter la surveillance de DCS World"""
+        self.monitor_stop.set()
+        if self.scheduler:
+            self.scheduler.remove_job("dcs_process")
+    
+    def poll_dcs_status(self):
+        """Tâche planifiée: vérifier DCS World (False tant qu'il est fermé)"""
+        self.check_dcs_status()
+        return self.dcs_running
+    
     def check_dcs_status(self):
         """Vérifier si DCS World est en cours d'exécution"""
         try:
@@ -152,7 +178,10 @@ class DCSCockpit:
             if running and not was_running:
                 self.logger.info("DCS World détecté")
                 if self.is_active:
-                    return "DCS World détecté. Module F/A-18 prêt."
+                    message = "DCS World détecté. Module F/A-18 prêt."
+                    if self.event_callback:
+                        self.event_callback(message)
+                    return message
             elif not running and was_running:
                 self.logger.info("DCS World fermé")
                 
@@ -162,6 +191,8 @@ class DCSCockpit:
     def activate(self):
         """Activer le module DCS F/A-18"""
         self.is_active = True
+        if self.context_store:
+            self.context_store.update("dcs_active", True)
         self.logger.info("Module DCS F/A-18 activé")
         
         if self.dcs_running:
@@ -172,6 +203,8 @@ class DCSCockpit:
     def deactivate(self):
         """Désactiver le module"""
         self.is_active = False
+        if self.context_store:
+            self.context_store.update("dcs_active", False)
         self.logger.info("Module DCS F/A-18 désactivé")
         return "Module F/A-18 désactivé."
     
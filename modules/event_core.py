@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Noyau événementiel asyncio pour J.A.R.V.I.S.
+Les entrées (micro, clavier, surveillance) arrivent comme des événements
+et sont traitées dès leur réception
+"""
+
+import sys
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from modules.tracing import tracer
+
+class EventCore:
+    def __init__(self, max_workers=4):
+        """Initialisation du noyau événementiel"""
+        self.logger = logging.getLogger(__name__)
+        
+        self.loop = None
+        self.queue = None
+        self.is_running = False
+        
+        # Exécuteur pour les appels bloquants des modules
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-worker")
+        
+        # Gestionnaires par source d'événement ("voice", "keyboard", "monitor"...)
+        self.handlers = {}
+        
+        # Événements reçus avant le démarrage de la boucle
+        self.pending_events = []
+        self.lock = threading.Lock()
+        
+        # Statistiques de latence entrée -> traitement (en ms)
+        self.dispatch_latencies = []
+        self.max_latencies = 100
+    
+    def add_handler(self, source, handler):
+        """Associer un gestionnaire à une source d'événements"""
+        self.handlers[source] = handler
+    
+    def post_event(self, source, payload):
+        """Publier un événement (appelable depuis n'importe quel thread)"""
+        # Le contexte de l'émetteur (trace en cours) suit l'événement jusqu'au gestionnaire
+        event = {
+            "source": source,
+            "payload": payload,
+            "received_at": time.perf_counter(),
+            "context": contextvars.copy_context(),
+            "trace": tracer.current()
+        }
+        
+        with self.lock:
+            if not self.is_running or self.loop is None:
+                self.pending_events.append(event)
+                return
+        
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            # Boucle déjà fermée
+            pass
+    
+    async def run_blocking(self, func, *args):
+        """Exécuter un appel bloquant dans l'exécuteur"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    def start_stdin_source(self):
+        """Lire les lignes tapées au clavier dans un thread dédié"""
+        def reader():
+            while True:
+                try:
+                    line = sys.stdin.readline()
+                except Exception as e:
+                    self.logger.error(f"Erreur lecture clavier: {e}")
+                    break
+                
+                if not line:
+                    # Fin de l'entrée standard
+                    break
+                
+                line = line.strip()
+                if line:
+                    self.post_event("keyboard", line)
+        
+        threading.Thread(target=reader, daemon=True, name="jarvis-stdin").start()
+    
+    async def run(self):
+        """Boucle principale: attendre et distribuer les événements"""
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        
+        with self.lock:
+            self.is_running = True
+            for event in self.pending_events:
+                self.queue.put_nowait(event)
+            self.pending_events = []
+        
+        self.logger.info("Noyau événementiel démarré")
+        
+        while self.is_running:
+            event = await self.queue.get()
+            if event is None:
+                break
+            
+            await self.dispatch(event)
+        
+        self.logger.info("Noyau événementiel arrêté")
+    
+    async def dispatch(self, event):
+        """Distribuer un événement à son gestionnaire"""
+        handler = self.handlers.get(event["source"])
+        if not handler:
+            self.logger.warning(f"Aucun gestionnaire pour la source: {event['source']}")
+            return
+        
+        latency_ms = (time.perf_counter() - event["received_at"]) * 1000
+        self.dispatch_latencies.append(latency_ms)
+        if len(self.dispatch_latencies) > self.max_latencies:
+            self.dispatch_latencies.pop(0)
+        self.logger.debug(f"Événement {event['source']} distribué en {latency_ms:.2f} ms")
+        tracer.add_span("event_queue", event["received_at"], time.perf_counter(),
+                        trace=event["trace"], source=event["source"])
+        
+        try:
+            await self.run_blocking(event["context"].run, handler, event["payload"])
+        except Exception as e:
+            self.logger.error(f"Erreur traitement événement {event['source']}: {e}")
+    
+    def stop(self):
+        """Arrêter la boucle événementielle"""
+        with self.lock:
+            was_running = self.is_running
+            self.is_running = False
+        
+        if was_running and self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+            except RuntimeError:
+                pass
+    
+    def shutdown(self):
+        """Libérer les ressources"""
+        self.stop()
+        self.executor.shutdown(wait=False)
+    
+    def get_status(self):
+        """Obtenir le statut du noyau"""
+        latencies = sorted(self.dispatch_latencies)
+        return {
+            "running": self.is_running,
+            "queued_events": self.queue.qsize() if self.queue else len(self.pending_events),
+            "sources": list(self.handlers.keys()),
+            "median_dispatch_latency_ms": latencies[len(latencies) // 2] if latencies else None
+        }
\ No newline at end of file
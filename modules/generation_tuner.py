@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Réglage automatique des options de génération Ollama pour J.A.R.V.I.S.
+Les vitesses d'évaluation du prompt et de génération sont mesurées à chaque
+réponse: num_predict est ajusté par classe de question pour tenir une latence
+cible, num_ctx et num_thread par modèle; les réglages appris sont conservés
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from modules.model_router import REASONING_WORDS, normalize_words
+
+# Latence cible (ms) de la réponse complète par classe de question
+DEFAULT_TARGETS_MS = {"courte": 4000, "contexte": 6000, "raisonnement": 12000}
+
+# Paliers de fenêtre de contexte (un changement de num_ctx recharge le modèle)
+CTX_STEPS = [1024, 2048, 3072, 4096, 6144, 8192, 16384]
+
+def physical_cores():
+    """Nombre de cœurs physiques (psutil si disponible)"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return max(1, (os.cpu_count() or 2) // 2)
+
+class GenerationTuner:
+    def __init__(self, num_predict=300, num_ctx=2048, use_gpu=False, config=None):
+        """Initialisation du régulateur
+        
+        Args:
+            num_predict (int): Longueur de réponse configurée (point de départ)
+            num_ctx (int): Fenêtre de contexte configurée (point de départ)
+            use_gpu (bool): Génération sur GPU (num_thread n'est alors pas réglé)
+            config (dict): Section "tuning" de la configuration Ollama
+        """
+        config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.enabled = config.get("enabled", True)
+        self.base = {"num_predict": num_predict, "num_ctx": num_ctx}
+        self.use_gpu = use_gpu
+        
+        self.targets_ms = dict(DEFAULT_TARGETS_MS, **config.get("targets_ms", {}))
+        self.min_num_predict = config.get("min_num_predict", 64)
+        self.max_num_predict = config.get("max_num_predict", max(num_predict, 512))
+        self.min_ctx = config.get("min_ctx", 1024)
+        self.max_ctx = config.get("max_ctx", max(num_ctx, 4096))
+        self.adjust_every = config.get("adjust_every", 10)
+        self.smoothing = config.get("smoothing", 0.3)
+        # Part maximale de la latence cible consacrée à l'évaluation du prompt
+        self.prefill_share = config.get("prefill_share", 0.35)
+        
+        # Nombre de threads essayés sur CPU (chaque essai recharge le modèle une fois)
+        self.tune_threads = config.get("threads", True) and not use_gpu
+        cores = physical_cores()
+        self.thread_candidates = sorted({max(1, cores // 2), max(1, cores - 1), cores})
+        
+        path = config.get("path", "memory/generation_tuning.json")
+        self.path = Path(path) if path else None
+        
+        # Clé modèle|matériel -> réglages et mesures
+        self.models = {}
+        self.decisions = []
+        self.max_decisions = 50
+        self.max_recent = 50
+        self.lock = threading.Lock()
+        
+        if self.path:
+            self.load()
+    
+    def classify(self, command, context=None):
+        """Classe d'une question: courte, contexte (écran, télémétrie, DCS) ou raisonnement"""
+        words = normalize_words(command)
+        if len(words) > 25 or any(word in REASONING_WORDS for word in words):
+            return "raisonnement"
+        if context and (context.get("screen_data") or context.get("telemetry") or context.get("dcs_active")):
+            return "contexte"
+        return "courte"
+    
+    def model_key(self, model):
+        """Les vitesses mesurées dépendent du modèle et du matériel"""
+        return f"{model}|{'gpu' if self.use_gpu else 'cpu'}"
+    
+    def model_state(self, model):
+        """Réglages d'un modèle (créés avec les valeurs configurées)"""
+        key = self.model_key(model)
+        if key not in self.models:
+            self.models[key] = {
+                "num_ctx": self.base["num_ctx"],
+                "num_thread": None,
+                "thread_rates": {},
+                "samples": 0,
+                "recent": [],
+                "classes": {}
+            }
+        state = self.models[key]
+        for query_class in self.targets_ms:
+            state["classes"].setdefault(query_class, {
+                "num_predict": self.base["num_predict"],
+                "gen_rate": None,
+                "prefill_ms": None,
+                "samples": 0
+            })
+        return state
+    
+    def settings(self, command, context=None, model=None):
+        """Options de génération d'une requête
+        
+        Returns:
+            dict: query_class, model, num_predict, num_ctx, num_thread (None = choix d'Ollama)
+        """
+        query_class = self.classify(command, context)
+        if not self.enabled:
+            return {"query_class": query_class, "model": model, "num_thread": None, **self.base}
+        
+        with self.lock:
+            state = self.model_state(model)
+            return {
+                "query_class": query_class,
+                "model": model,
+                "num_predict": state["classes"][query_class]["num_predict"],
+                "num_ctx": state["num_ctx"],
+                "num_thread": state["num_thread"]
+            }
+    
+    def load_options(self, model):
+        """Options de chargement (préchargement identique aux requêtes: pas de rechargement)"""
+        if not self.enabled:
+            return {"num_ctx": self.base["num_ctx"]}
+        
+        with self.lock:
+            state = self.model_state(model)
+            options = {"num_ctx": state["num_ctx"]}
+            if state["num_thread"]:
+                options["num_thread"] = state["num_thread"]
+            return options
+    
+    def smooth(self, previous, value):
+        """Moyenne mobile exponentielle"""
+        if previous is None:
+            return value
+        return previous + self.smoothing * (value - previous)
+    
+    def record(self, settings, metrics):
+        """Intégrer les mesures d'une génération et ajuster les réglages
+        
+        Args:
+            settings (dict): Options utilisées (settings)
+            metrics (dict): Métriques de la génération (statistiques Ollama)
+        """
+        if not self.enabled or metrics.get("error") or metrics.get("cancelled"):
+            return
+        if not metrics.get("tokens_per_s") or metrics.get("prompt_eval_ms") is None:
+            return
+        
+        with self.lock:
+            state = self.model_state(settings["model"])
+            if settings["num_ctx"] != state["num_ctx"] or settings["num_thread"] != state["num_thread"]:
+                # Mesure obtenue avec des réglages déjà remplacés
+                return
+            
+            query_class = settings["query_class"]
+            stats = state["classes"][query_class]
+            stats["gen_rate"] = round(self.smooth(stats["gen_rate"], metrics["tokens_per_s"]), 2)
+            stats["prefill_ms"] = round(self.smooth(stats["prefill_ms"], metrics["prompt_eval_ms"]), 1)
+            stats["samples"] += 1
+            self.adjust_num_predict(settings["model"], query_class, stats)
+            
+            # Débit par nombre de threads (None = choix d'Ollama)
+            thread_key = str(state["num_thread"] or "auto")
+            thread_rate = state["thread_rates"].setdefault(thread_key, {"rate": None, "samples": 0})
+            thread_rate["rate"] = round(self.smooth(thread_rate["rate"], metrics["tokens_per_s"]), 2)
+            thread_rate["samples"] += 1
+            
+            state["recent"].append([metrics.get("prompt_tokens_estimate") or 0, metrics["prompt_eval_ms"]])
+            if len(state["recent"]) > self.max_recent:
+                state["recent"].pop(0)
+            state["samples"] += 1
+            
+            if state["samples"] % self.adjust_every == 0:
+                self.adjust_model(settings["model"], state)
+        
+        if self.path:
+            self.save()
+    
+    def adjust_num_predict(self, model, query_class, stats):
+        """Longueur de réponse que la vitesse mesurée permet dans la latence cible"""
+        budget_ms = self.targets_ms[query_class] - stats["prefill_ms"]
+        target = budget_ms / 1000 * stats["gen_rate"]
+        target = min(max(target, self.min_num_predict), self.max_num_predict)
+        
+        current = stats["num_predict"]
+        proposed = int(round(self.smooth(current, target) / 16) * 16)
+        proposed = min(max(proposed, self.min_num_predict), self.max_num_predict)
+        if abs(proposed - current) >= 16:
+            stats["num_predict"] = proposed
+            self.record_decision(model, f"num_predict[{query_class}]", current, proposed,
+                                 f"{stats['gen_rate']:.1f} tokens/s, prompt {stats['prefill_ms']:.0f} ms, "
+                                 f"cible {self.targets_ms[query_class]} ms")
+    
+    def adjust_model(self, model, state):
+        """Réglages qui rechargent le modèle (num_ctx, num_thread), revus par fenêtre de mesures"""
+        recent = state["recent"]
+        if not recent:
+            return
+        
+        prefill = sorted(entry[1] for entry in recent)[len(recent) // 2]
+        prompt_tokens = sorted(entry[0] for entry in recent)[int(len(recent) * 0.9)]
+        prefill_budget = min(self.targets_ms.values()) * self.prefill_share
+        needed = prompt_tokens + max(stats["num_predict"] for stats in state["classes"].values())
+        
+        steps = [step for step in CTX_STEPS if self.min_ctx <= step <= self.max_ctx]
+        smaller = [step for step in steps if step < state["num_ctx"]]
+        larger = [step for step in steps if step > state["num_ctx"]]
+        
+        if prefill > prefill_budget and smaller:
+            # Prompt trop long à évaluer: fenêtre réduite, l'empaqueteur écarte le contexte le moins utile
+            self.change_model_option(model, state, "num_ctx", smaller[-1],
+                                     f"évaluation du prompt {prefill:.0f} ms > {prefill_budget:.0f} ms")
+        elif needed > state["num_ctx"] * 0.9 and prefill < prefill_budget / 2 and larger:
+            self.change_model_option(model, state, "num_ctx", larger[0],
+                                     f"prompt {prompt_tokens} tokens à l'étroit, évaluation {prefill:.0f} ms")
+        elif self.tune_threads:
+            self.adjust_threads(model, state)
+    
+    def adjust_threads(self, model, state):
+        """Essayer chaque nombre de threads candidat une fois, puis garder le plus rapide"""
+        untried = [count for count in self.thread_candidates if str(count) not in state["thread_rates"]]
+        if untried:
+            self.change_model_option(model, state, "num_thread", untried[0], "essai")
+            return
+        
+        measured = {key: value["rate"] for key, value in state["thread_rates"].items() if value["rate"]}
+        if not measured:
+            return
+        best = max(measured, key=measured.get)
+        best_count = None if best == "auto" else int(best)
+        if best_count != state["num_thread"]:
+            self.change_model_option(model, state, "num_thread", best_count, f"{measured[best]:.1f} tokens/s")
+    
+    def change_model_option(self, model, state, option, value, reason):
+        """Appliquer un réglage de modèle et repartir d'une fenêtre de mesures vide"""
+        previous = state[option]
+        state[option] = value
+        state["recent"] = []
+        self.record_decision(model, option, previous, value, reason)
+    
+    def record_decision(self, model, option, previous, value, reason):
+        """Journaliser un changement de réglage"""
+        decision = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model": model,
+            "option": option,
+            "from": previous,
+            "to": value,
+            "reason": reason
+        }
+        self.decisions.append(decision)
+        if len(self.decisions) > self.max_decisions:
+            self.decisions.pop(0)
+        self.logger.info(f"Réglage Ollama {model}: {option} {previous} -> {value} ({reason})")
+    
+    def load(self):
+        """Charger les réglages appris lors des sessions précédentes"""
+        try:
+            if not self.path.exists():
+                return
+            
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.models = data.get("models", {})
+            self.decisions = data.get("decisions", [])[-self.max_decisions:]
+            self.logger.info(f"Réglages de génération chargés pour {len(self.models)} modèle(s)")
+        
+        except Exception as e:
+            self.logger.error(f"Erreur chargement des réglages de génération: {e}")
+    
+    def save(self):
+        """Écrire les réglages appris sur le disque"""
+        try:
+            with self.lock:
+                data = json.dumps({"models": self.models, "decisions": self.decisions}, ensure_ascii=False, indent=2)
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            temp_path.replace(self.path)
+        
+        except Exception as e:
+            self.logger.error(f"Erreur sauvegarde des réglages de génération: {e}")
+    
+    def get_status(self):
+        """Réglages courants par modèle et classe, et dernières décisions"""
+        with self.lock:
+            models = {
+                key: {
+                    "num_ctx": state["num_ctx"],
+                    "num_thread": state["num_thread"],
+                    "samples": state["samples"],
+                    "thread_rates": {name: value["rate"] for name, value in state["thread_rates"].items()},
+                    "classes": {name: dict(stats) for name, stats in state["classes"].items()}
+                }
+                for key, state in self.models.items()
+            }
+            decisions = self.decisions[-10:]
+        
+        return {
+            "enabled": self.enabled,
+            "targets_ms": self.targets_ms,
+            "thread_candidates": self.thread_candidates if self.tune_threads else None,
+            "models": models,
+            "decisions": decisions,
+            "path": str(self.path) if self.path else None
+        }
\ No newline at end of file
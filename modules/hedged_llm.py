@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Génération couverte (hedging) Ollama / ChatGPT pour J.A.R.V.I.S.
+Si Ollama n'a produit aucun token avant l'échéance, la même demande part aussi
+vers ChatGPT: le premier flux valide est prononcé, l'autre est annulé
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from modules.llm_backend import AsyncLLMBackend, ErrorMessage
+from modules.tracing import tracer
+
+class HedgedLLM(AsyncLLMBackend):
+    def __init__(self, primary, secondary, first_token_deadline=2.5, name_primary="ollama", name_secondary="openai",
+                 secondary_configured=None):
+        """Initialisation de la génération couverte
+        
+        Args:
+            primary: Moteur principal (OllamaClient)
+            secondary: Moteur de secours (OpenAIClient, éventuellement chargé à la demande)
+            first_token_deadline (float): Secondes sans premier token avant d'interroger le secours
+            name_primary (str): Nom du moteur principal dans les statistiques
+            name_secondary (str): Nom du moteur de secours dans les statistiques
+            secondary_configured (callable): Vérification du secours sans le construire
+                (clé API, bibliothèque); None = toujours configuré
+        """
+        self.logger = logging.getLogger(__name__)
+        self.primary = primary
+        self.secondary = secondary
+        self.first_token_deadline = first_token_deadline
+        self.names = {"primary": name_primary, "secondary": name_secondary}
+        self.secondary_configured = secondary_configured or (lambda: True)
+        self.active_generations = set()
+        self.last_winner = None
+        
+        # Secours construit en arrière-plan: aucun import à froid sur le chemin de la couverture
+        self.warmup_thread = None
+        self.warm_secondary()
+        
+        # Statistiques
+        self.requests = 0
+        self.hedged = 0
+        self.wins = {name_primary: 0, name_secondary: 0}
+        self.failures = 0
+        self.saved_ms = []
+        self.primary_ttft = []
+        self.max_samples = 100
+    
+    def stream_response(self, user_input, context=None, timeout=None):
+        """Version bloquante de astream (thread de traitement des commandes)"""
+        return self.stream_blocking(user_input, context, timeout)
+    
+    def cancel(self):
+        """Interrompre les générations des deux moteurs"""
+        cancelled = self.primary.cancel()
+        if self.secondary_loaded():
+            cancelled += self.secondary.cancel()
+        return cancelled
+    
+    def secondary_loaded(self):
+        """Le moteur de secours est déjà construit (aucun chargement déclenché)"""
+        is_loaded = getattr(self.secondary, "is_loaded", None)
+        return is_loaded() if is_loaded else True
+    
+    def warm_secondary(self):
+        """Construire le moteur de secours en arrière-plan s'il est configuré"""
+        if self.secondary_loaded() or self.warmup_thread is not None or not self.secondary_configured():
+            return
+        
+        def warm():
+            try:
+                self.secondary.is_available()
+            except Exception as e:
+                self.logger.error(f"Préchargement de {self.names['secondary']} impossible: {e}")
+        
+        self.warmup_thread = threading.Thread(target=warm, daemon=True, name="hedge-warmup")
+        self.warmup_thread.start()
+    
+    def secondary_ready(self):
+        """Le secours peut partir tout de suite (configuré, déjà construit et disponible)"""
+        if not self.secondary_configured():
+            return False
+        if not self.secondary_loaded():
+            self.warm_secondary()
+            return False
+        return self.secondary.is_available()
+    
+    def record_sample(self, samples, value):
+        """Ajouter une mesure en conservant les max_samples dernières"""
+        samples.append(value)
+        if len(samples) > self.max_samples:
+            samples.pop(0)
+    
+    async def close_contender(self, task, stream):
+        """Annuler le flux perdant et fermer sa connexion"""
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        try:
+            await stream.aclose()
+        except Exception as e:
+            self.logger.debug(f"Fermeture du flux perdant: {e}")
+    
+    def first_chunk(self, task):
+        """Premier morceau d'un flux terminé, ou None s'il a échoué (erreur, flux vide)"""
+        if task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+    
+    async def astream(self, user_input, context=None, timeout=None, supersede=False, on_first_token=None):
+        """Réponse du premier moteur qui produit un flux valide
+        
+        L'échéance de couverture porte sur le premier token brut du principal (signalé
+        par on_first_token), pas sur son premier morceau prononçable: un début de
+        réponse retenu par le routeur de niveaux ne déclenche pas le secours.
+        
+        Args:
+            user_input (str): Question de l'utilisateur
+            context (dict): Instantané du contexte
+            timeout (float): Échéance de l'appel en secondes (None = échéance de chaque moteur)
+            supersede (bool): Interrompre les générations en cours des deux moteurs
+            on_first_token (callable): Appelé au premier morceau du flux gagnant
+        
+        Yields:
+            str: Morceaux de texte du flux gagnant (ou message d'erreur en français)
+        """
+        self.requests += 1
+        start = time.perf_counter()
+        primary_token = asyncio.Event()
+        streams = {"primary": self.primary.astream(user_input, context, timeout=timeout, supersede=supersede,
+                                                   on_first_token=primary_token.set)}
+        tasks = {"primary": asyncio.ensure_future(streams["primary"].__anext__())}
+        winner = None
+        first = None
+        errors = []
+        
+        try:
+            token_wait = asyncio.ensure_future(primary_token.wait())
+            try:
+                await asyncio.wait({tasks["primary"], token_wait}, timeout=self.first_token_deadline,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                token_wait.cancel()
+            if tasks["primary"].done():
+                first = self.first_chunk(tasks["primary"])
+                if first is not None and not isinstance(first, ErrorMessage):
+                    winner = "primary"
+                else:
+                    if isinstance(first, ErrorMessage):
+                        errors.append(first)
+                    del tasks["primary"]
+            
+            # Principal en train de générer (début retenu par le routeur): pas de couverture
+            producing = "primary" in tasks and primary_token.is_set()
+            if winner is None and not producing and self.secondary_ready():
+                # Échéance dépassée ou échec immédiat: la demande part aussi vers le secours
+                self.logger.info(f"Pas de premier token {self.names['primary']} après "
+                                 f"{self.first_token_deadline}s, demande envoyée à {self.names['secondary']}")
+                self.start_secondary(streams, tasks, start, user_input, context, timeout, supersede)
+            
+            # Course: le premier morceau valide désigne le gagnant
+            while winner is None and tasks:
+                done, _ = await asyncio.wait(set(tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+                for role, task in list(tasks.items()):
+                    if task not in done or winner is not None:
+                        continue
+                    chunk = self.first_chunk(task)
+                    if chunk is not None and not isinstance(chunk, ErrorMessage):
+                        winner, first = role, chunk
+                    else:
+                        if isinstance(chunk, ErrorMessage):
+                            errors.append(chunk)
+                        del tasks[role]
+                        # Principal en échec après son premier token: le secours prend le relais
+                        if role == "primary" and "secondary" not in streams and self.secondary_ready():
+                            self.start_secondary(streams, tasks, start, user_input, context, timeout, supersede)
+            
+            if winner is None:
+                self.failures += 1
+                yield errors[0] if errors else ErrorMessage("Je rencontre une erreur technique. Veuillez réessayer.")
+                return
+            
+            # Annuler le perdant avant de lire la suite du gagnant
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for role in list(tasks):
+                if role != winner:
+                    await self.close_contender(tasks.pop(role), streams[role])
+            self.record_outcome(winner, elapsed_ms)
+            
+            parts = [first]
+            if on_first_token:
+                on_first_token()
+            yield first
+            async for chunk in streams[winner]:
+                parts.append(chunk)
+                yield chunk
+            
+            # Réponse de secours ajoutée à l'historique du moteur principal (suite de conversation),
+            # avec le moteur qui l'a produite
+            if winner == "secondary" and hasattr(self.primary, "remember_exchange"):
+                self.primary.remember_exchange(user_input, "".join(parts), source=self.names["secondary"])
+        
+        finally:
+            for role, stream in streams.items():
+                await self.close_contender(tasks.get(role), stream)
+    
+    def start_secondary(self, streams, tasks, start, user_input, context, timeout, supersede):
+        """Lancer la même demande sur le moteur de secours"""
+        self.hedged += 1
+        tracer.instant("hedge.start", after_ms=round((time.perf_counter() - start) * 1000))
+        streams["secondary"] = self.secondary.astream(user_input, context, timeout=timeout, supersede=supersede)
+        tasks["secondary"] = asyncio.ensure_future(streams["secondary"].__anext__())
+    
+    def record_outcome(self, winner, elapsed_ms):
+        """Noter le moteur gagnant et la latence gagnée"""
+        name = self.names[winner]
+        self.wins[name] += 1
+        self.last_winner = name
+        tracer.instant("hedge.winner", winner=name)
+        
+        if winner == "secondary":
+            # Estimation: le principal aurait mis au moins le temps écoulé,
+            # et en général sa latence médiane récente
+            ttft = sorted(self.primary_ttft)
+            baseline = max(elapsed_ms, ttft[len(ttft) // 2] if ttft else 0.0)
+            self.record_sample(self.saved_ms, baseline - elapsed_ms)
+            self.logger.info(f"Réponse servie par {name} en {elapsed_ms:.0f} ms")
+        else:
+            # Latence du principal, référence des estimations suivantes
+            self.record_sample(self.primary_ttft, elapsed_ms)
+    
+    def get_status(self):
+        """Statistiques de couverture"""
+        saved = sorted(self.saved_ms)
+        return {
+            "first_token_deadline_s": self.first_token_deadline,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else None,
+            "wins": dict(self.wins),
+            "last_winner": self.last_winner,
+            "secondary_loaded": self.secondary_loaded(),
+            "secondary_win_rate": round(self.wins[self.names["secondary"]] / self.hedged, 3) if self.hedged else None,
+            "failures": self.failures,
+            "median_saved_ms": round(saved[len(saved) // 2], 1) if saved else None,
+            "total_saved_ms": round(sum(saved), 1)
+        }
\ No newline at end of file
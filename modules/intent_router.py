@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Routeur d'intentions pour J.A.R.V.I.S.
+Toutes les phrases d'activation sont compilées dans un automate Aho-Corasick:
+le coût du routage reste proportionnel à la longueur de la commande
+"""
+
+import logging
+from collections import deque
+
+class IntentRouter:
+    def __init__(self):
+        """Initialisation du routeur d'intentions"""
+        self.logger = logging.getLogger(__name__)
+        
+        # Intentions enregistrées, dans l'ordre de priorité
+        self.intents = []
+        
+        # Automate Aho-Corasick (transitions, liens d'échec, sorties)
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [set()]
+        self.compiled = False
+    
+    def register(self, name, phrases, handler, condition=None, priority=None):
+        """Enregistrer une intention
+        
+        Args:
+            name (str): Nom de l'intention
+            phrases (list): Phrases déclenchantes (sous-chaînes, en minuscules)
+            handler (callable): Fonction appelée avec la commande, retourne la réponse
+            condition (callable): Condition supplémentaire évaluée au routage
+            priority (int): Priorité (plus petit = prioritaire), ordre d'ajout par défaut
+        """
+        intent = {
+            "name": name,
+            "phrases": [phrase.lower() for phrase in phrases],
+            "handler": handler,
+            "condition": condition,
+            "priority": len(self.intents) if priority is None else priority
+        }
+        self.intents.append(intent)
+        self.intents.sort(key=lambda item: item["priority"])
+        self.compiled = False
+    
+    def unregister(self, name):
+        """Retirer une intention"""
+        self.intents = [intent for intent in self.intents if intent["name"] != name]
+        self.compiled = False
+    
+    def compile(self):
+        """Construire l'automate à partir de toutes les phrases"""
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [set()]
+        
+        # Construction du trie
+        for index, intent in enumerate(self.intents):
+            for phrase in intent["phrases"]:
+                state = 0
+                for char in phrase:
+                    next_state = self.transitions[state].get(char)
+                    if next_state is None:
+                        next_state = len(self.transitions)
+                        self.transitions.append({})
+                        self.failure.append(0)
+                        self.outputs.append(set())
+                        self.transitions[state][char] = next_state
+                    state = next_state
+                self.outputs[state].add(index)
+        
+        # Liens d'échec (parcours en largeur)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                
+                fallback = self.failure[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                self.failure[next_state] = self.transitions[fallback].get(char, 0)
+                self.outputs[next_state] |= self.outputs[self.failure[next_state]]
+        
+        self.compiled = True
+        self.logger.info(f"Routeur compilé: {len(self.intents)} intentions, {len(self.transitions)} états")
+    
+    def match(self, text):
+        """Retourner les indices des intentions dont une phrase apparaît dans le texte"""
+        if not self.compiled:
+            self.compile()
+        
+        transitions = self.transitions
+        failure = self.failure
+        outputs = self.outputs
+        
+        matched = set()
+        state = 0
+        for char in text:
+            while state and char not in transitions[state]:
+                state = failure[state]
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                matched |= outputs[state]
+        
+        return matched
+    
+    def route(self, command):
+        """Trouver l'intention prioritaire correspondant à la commande"""
+        if not command:
+            return None
+        
+        for index in sorted(self.match(command.lower())):
+            intent = self.intents[index]
+            if intent["condition"] is None or intent["condition"]():
+                return intent
+        
+        return None
+    
+    def get_phrase_count(self):
+        """Nombre total de phrases enregistrées"""
+        return sum(len(intent["phrases"]) for intent in self.intents)
+    
+    def get_status(self):
+        """Obtenir le statut du routeur"""
+        return {
+            "intents": [intent["name"] for intent in self.intents],
+            "phrases": self.get_phrase_count(),
+            "states": len(self.transitions),
+            "compiled": self.compiled
+        }
\ No newline at end of file
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargement différé des modules de J.A.R.V.I.S.
+Un module n'est construit qu'à sa première utilisation réelle
+"""
+
+import logging
+import threading
+import time
+from modules.tracing import tracer
+
+class LazyModule:
+    """Proxy qui construit le module cible au premier accès à un attribut"""
+    
+    def __init__(self, name, factory):
+        """
+        Args:
+            name (str): Nom du module (pour les logs et le statut)
+            factory (callable): Fonction sans argument qui construit le module
+        """
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_load_time", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_logger", logging.getLogger(__name__))
+    
+    def get_instance(self):
+        """Obtenir le module, en le construisant si nécessaire"""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        
+        with self._lock:
+            if self._instance is None:
+                self._logger.info(f"Chargement différé de {self._name}...")
+                start_time = time.perf_counter()
+                with tracer.span(f"lazy_load.{self._name}"):
+                    object.__setattr__(self, "_instance", self._factory())
+                object.__setattr__(self, "_load_time", time.perf_counter() - start_time)
+                self._logger.info(f"{self._name} chargé en {self._load_time:.2f}s")
+        
+        return self._instance
+    
+    def is_loaded(self):
+        """Vérifier si le module a déjà été construit"""
+        return self._instance is not None
+    
+    def get_load_time(self):
+        """Durée de construction du module (None si pas encore chargé)"""
+        return self._load_time
+    
+    def __getattr__(self, attribute):
+        return getattr(self.get_instance(), attribute)
+    
+    def __setattr__(self, attribute, value):
+        setattr(self.get_instance(), attribute, value)
+    
+    def __repr__(self):
+        state = "chargé" if self.is_loaded() else "non chargé"
+        return f"<LazyModule {self._name} ({state})>"
\ No newline at end of file
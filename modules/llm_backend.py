@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interface asynchrone commune des moteurs LLM de J.A.R.V.I.S.
+Chaque moteur (Ollama, ChatGPT) fournit astream / agenerate / cancel / get_status:
+les appels s'exécutent dans une boucle asyncio sans thread par requête, peuvent être
+annulés (nouvelle demande, "stop") et respectent une échéance par appel
+"""
+
+import abc
+import asyncio
+import contextvars
+import json
+import logging
+import queue
+import ssl
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+class ErrorMessage(str):
+    """Message d'erreur prononçable produit à la place d'une réponse du modèle"""
+
+class GenerationCancelled(Exception):
+    """Génération interrompue par cancel() pendant une attente"""
+
+class StreamTimeout(Exception):
+    """Serveur muet plus longtemps que le délai de lecture (panne probable, pas l'échéance de l'appel)"""
+
+class HTTPStatusError(Exception):
+    """Réponse HTTP autre que 200"""
+    
+    def __init__(self, status, body=""):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+class CancelEvent(threading.Event):
+    """Événement d'annulation qui réveille aussi les lectures en attente
+    
+    Les fonctions enregistrées par add_callback sont appelées au déclenchement,
+    dans le thread qui annule (voir cancel_future).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.callbacks = []
+        self.callbacks_lock = threading.Lock()
+    
+    def add_callback(self, callback):
+        """Appeler callback à l'annulation (immédiatement si elle a déjà eu lieu)"""
+        with self.callbacks_lock:
+            if not self.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+    
+    def remove_callback(self, callback):
+        """Retirer un rappel devenu inutile (lecture terminée)"""
+        with self.callbacks_lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+    
+    def set(self):
+        with self.callbacks_lock:
+            super().set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Rappel d'annulation: {e}")
+
+def make_deadline(timeout):
+    """Échéance absolue (horloge de la boucle) d'un délai en secondes (None = aucune)"""
+    if timeout is None:
+        return None
+    return asyncio.get_running_loop().time() + timeout
+
+def cancel_future(cancel_event):
+    """Futur de la boucle courante terminé au déclenchement de cancel_event (depuis n'importe quel thread)
+    
+    L'appelant annule le futur à la fin de la génération pour retirer le rappel.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    if cancel_event is None:
+        return future
+    
+    def wake():
+        try:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        except RuntimeError:
+            # Boucle fermée: plus personne n'attend
+            pass
+    
+    cancel_event.add_callback(wake)
+    future.add_done_callback(lambda _: cancel_event.remove_callback(wake))
+    return future
+
+async def wait_deadline(awaitable, deadline, cancelled=None):
+    """Attendre un résultat sans dépasser l'échéance (asyncio.TimeoutError sinon)
+    
+    Args:
+        awaitable: Coroutine ou futur attendu
+        deadline (float): Échéance absolue (make_deadline), None = aucune
+        cancelled (asyncio.Future): Futur d'annulation (cancel_future): GenerationCancelled
+            dès son déclenchement, la lecture en cours est abandonnée
+    """
+    loop = asyncio.get_running_loop()
+    if cancelled is None:
+        if deadline is None:
+            return await awaitable
+        
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            # Fermer la coroutine jamais attendue
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise asyncio.TimeoutError()
+        return await asyncio.wait_for(awaitable, remaining)
+    
+    if cancelled.done():
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise GenerationCancelled()
+    
+    task = asyncio.ensure_future(awaitable)
+    try:
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        done, _ = await asyncio.wait({task, cancelled}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        task.cancel()
+        raise
+    
+    if task in done:
+        return task.result()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    if cancelled.done():
+        raise GenerationCancelled()
+    raise asyncio.TimeoutError()
+
+class KeepAliveConnections:
+    """Connexions HTTP/1.1 persistantes pour les flux NDJSON asynchrones (bibliothèque standard)
+    
+    Une réserve de connexions par boucle asyncio: les appels bloquants passent tous
+    par la boucle partagée (io_loop), dont les connexions restent chaudes d'une
+    commande à l'autre. Une connexion interrompue (annulation, échéance) est fermée,
+    ce qui arrête la génération côté serveur.
+    """
+    
+    def __init__(self, max_idle=4, connect_timeout=10, read_timeout=30):
+        """Initialisation de la réserve
+        
+        Args:
+            max_idle (int): Connexions inactives conservées par serveur
+            connect_timeout (float): Délai maximal d'établissement d'une connexion
+            read_timeout (float): Silence maximal du serveur pendant une réponse (StreamTimeout)
+        """
+        self.max_idle = max_idle
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        
+        # Boucle -> {(hôte, port, https): [(reader, writer)]}
+        self.idle = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        
+        # Statistiques
+        self.opened = 0
+        self.reused = 0
+    
+    def take_idle(self, key):
+        """Connexion inactive encore ouverte pour ce serveur (boucle courante), ou None"""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            connections = self.idle.get(loop, {}).get(key, [])
+            while connections:
+                reader, writer = connections.pop()
+                if not writer.is_closing() and not reader.at_eof():
+                    self.reused += 1
+                    return reader, writer
+                writer.close()
+        return None
+    
+    def release(self, key, reader, writer):
+        """Rendre une connexion dont la réponse a été lue en entier"""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            connections = self.idle.setdefault(loop, {}).setdefault(key, [])
+            if len(connections) < self.max_idle and not writer.is_closing():
+                connections.append((reader, writer))
+                return
+        writer.close()
+    
+    async def connect(self, key, deadline, cancelled):
+        """Ouvrir une nouvelle connexion dans la limite de connect_timeout"""
+        host, port, secure = key
+        limit = asyncio.get_running_loop().time() + self.connect_timeout
+        try:
+            connection = await wait_deadline(
+                asyncio.open_connection(host, port, ssl=ssl.create_default_context() if secure else None),
+                limit if deadline is None else min(deadline, limit), cancelled)
+        except asyncio.TimeoutError:
+            if deadline is not None and deadline <= limit:
+                raise
+            raise ConnectionError(f"Connexion à {host}:{port} impossible en {self.connect_timeout}s")
+        self.opened += 1
+        return connection
+    
+    async def read(self, awaitable, deadline, cancelled):
+        """Lecture bornée par l'échéance de l'appel et par le silence maximal du serveur"""
+        limit = asyncio.get_running_loop().time() + self.read_timeout
+        if deadline is not None and deadline <= limit:
+            return await wait_deadline(awaitable, deadline, cancelled)
+        try:
+            return await wait_deadline(awaitable, limit, cancelled)
+        except asyncio.TimeoutError:
+            raise StreamTimeout(f"Aucune donnée reçue depuis {self.read_timeout}s")
+    
+    async def send_request(self, key, request, deadline, cancelled):
+        """Envoyer la requête et lire l'en-tête de la réponse
+        
+        Une connexion réutilisée que le serveur a fermée entre-temps est remplacée
+        une fois par une connexion neuve.
+        
+        Returns:
+            tuple: (reader, writer, statut, en-têtes)
+        """
+        connection = self.take_idle(key)
+        while True:
+            reused = connection is not None
+            reader, writer = connection or await self.connect(key, deadline, cancelled)
+            try:
+                writer.write(request)
+                await self.read(writer.drain(), deadline, cancelled)
+                status_line = await self.read(reader.readline(), deadline, cancelled)
+                if not status_line:
+                    raise ConnectionResetError("Connexion fermée par le serveur")
+                
+                headers = {}
+                while True:
+                    line = await self.read(reader.readline(), deadline, cancelled)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                fields = status_line.split()
+                return reader, writer, int(fields[1]) if len(fields) > 1 else 0, headers
+            
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                connection = None
+            except BaseException:
+                writer.close()
+                raise
+    
+    async def read_body(self, reader, headers, deadline, cancelled, state):
+        """Lire le corps d'une réponse par morceaux (chunked, longueur fixe ou jusqu'à la fermeture)
+        
+        state["complete"] passe à True quand le corps a été lu en entier (connexion réutilisable)
+        """
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await self.read(reader.readline(), deadline, cancelled)
+                if not size_line:
+                    raise ConnectionResetError("Réponse interrompue par le serveur")
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # En-têtes de fin éventuels puis ligne vide
+                    while await self.read(reader.readline(), deadline, cancelled) not in (b"\r\n", b"\n", b""):
+                        pass
+                    state["complete"] = True
+                    return
+                data = await self.read(reader.readexactly(size + 2), deadline, cancelled)
+                yield data[:-2]
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length:
+                yield await self.read(reader.readexactly(length), deadline, cancelled)
+            state["complete"] = True
+        else:
+            # Corps délimité par la fermeture: connexion non réutilisable
+            while True:
+                data = await self.read(reader.read(65536), deadline, cancelled)
+                if not data:
+                    return
+                yield data
+    
+    async def stream_json(self, url, payload, deadline=None, cancelled=None):
+        """POST JSON et lecture d'une réponse NDJSON ligne par ligne
+        
+        Args:
+            url (str): Adresse complète (http ou https)
+            payload (dict): Corps JSON de la requête
+            deadline (float): Échéance absolue de l'appel (make_deadline)
+            cancelled (asyncio.Future): Futur d'annulation (cancel_future)
+        
+        Yields:
+            dict: Objets JSON reçus (HTTPStatusError si le statut n'est pas 200)
+        """
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        key = (parts.hostname, parts.port or (443 if secure else 80), secure)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        body = json.dumps(payload).encode("utf-8")
+        request = (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {key[0]}:{key[1]}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/x-ndjson\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii") + body
+        
+        reader, writer, status, headers = await self.send_request(key, request, deadline, cancelled)
+        state = {"complete": False}
+        try:
+            if status != 200:
+                error_body = b""
+                async for data in self.read_body(reader, headers, deadline, cancelled, state):
+                    error_body += data
+                raise HTTPStatusError(status, error_body.decode("utf-8", "replace"))
+            
+            # Découpage NDJSON: un objet par ligne, les morceaux HTTP peuvent couper une ligne
+            buffer = b""
+            async for data in self.read_body(reader, headers, deadline, cancelled, state):
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+        
+        finally:
+            # Réponse lue en entier: connexion gardée chaude; sinon fermée (le serveur arrête de générer)
+            if state["complete"] and headers.get("connection", "").lower() != "close":
+                self.release(key, reader, writer)
+            else:
+                writer.close()
+    
+    def get_status(self):
+        """Connexions ouvertes et réutilisées"""
+        with self.lock:
+            idle = sum(len(connections) for pools in self.idle.values() for connections in pools.values())
+        return {"opened": self.opened, "reused": self.reused, "idle": idle}
+
+class BackgroundLoop:
+    """Boucle asyncio partagée par les appels bloquants (un seul thread pour toutes les générations)"""
+    
+    def __init__(self, name="llm-io"):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+    
+    def get(self):
+        """Boucle en cours d'exécution (démarrée au premier appel)"""
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name=self.name)
+                self.thread.start()
+            return self.loop
+    
+    def submit(self, coroutine):
+        """Exécuter une coroutine dans la boucle avec le contexte de l'appelant (trace de la commande)
+        
+        Returns:
+            callable: Annulation de la tâche (appelable depuis n'importe quel thread)
+        """
+        loop = self.get()
+        holder = {}
+        
+        def start():
+            holder["task"] = loop.create_task(coroutine)
+        
+        # La tâche copie le contexte courant au moment de sa création
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return lambda: loop.call_soon_threadsafe(lambda: holder["task"].cancel())
+
+# Boucle d'E/S des moteurs LLM pour le code bloquant (commandes, API locale, regroupement)
+io_loop = BackgroundLoop()
+
+# Fin du flux parcouru par iterate_blocking
+STREAM_END = object()
+
+def iterate_blocking(astream_factory):
+    """Parcourir un générateur asynchrone depuis du code bloquant
+    
+    Le générateur s'exécute dans la boucle partagée io_loop: l'appelant attend
+    les morceaux sans boucle ni thread supplémentaire par requête.
+    
+    Args:
+        astream_factory (callable): Fonction sans argument retournant le générateur asynchrone
+            (appelée dans le thread de l'appelant)
+    
+    Yields:
+        Les éléments du générateur dès leur production
+    """
+    items = queue.Queue()
+    stream = astream_factory()
+    
+    async def pump():
+        try:
+            async for item in stream:
+                items.put((item, None))
+            items.put((STREAM_END, None))
+        except asyncio.CancelledError:
+            items.put((STREAM_END, None))
+            raise
+        except Exception as e:
+            items.put((STREAM_END, e))
+        finally:
+            await stream.aclose()
+    
+    cancel = io_loop.submit(pump())
+    try:
+        while True:
+            item, error = items.get()
+            if item is STREAM_END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Lecteur parti avant la fin: la génération est abandonnée (connexion fermée)
+        cancel()
+
+class AsyncLLMBackend(abc.ABC):
+    """Protocole commun des moteurs LLM
+    
+    Les sous-classes définissent self.active_generations (set) et
+    astream(user_input, context=None, timeout=None, supersede=False, on_first_token=None).
+    """
+    
+    # Échéance appliquée quand l'appelant n'en donne pas (secondes, None = aucune)
+    default_timeout = None
+    
+    @abc.abstractmethod
+    async def astream(self, user_input, context=None, timeout=None, supersede=False, on_first_token=None):
+        """Morceaux de la réponse dès leur production (générateur asynchrone)
+        
+        on_first_token (callable) est appelé au premier token reçu du modèle, avant tout
+        filtrage de la sortie (mesure du temps de premier token pour la couverture)
+        """
+    
+    async def agenerate(self, user_input, context=None, timeout=None, supersede=False):
+        """Réponse complète (annulable, échéance en secondes)"""
+        parts = []
+        async for chunk in self.astream(user_input, context, timeout=timeout, supersede=supersede):
+            parts.append(chunk)
+        return "".join(parts)
+    
+    def stream_blocking(self, user_input, context=None, timeout=None):
+        """Version bloquante de astream (thread de traitement des commandes, boucle io_loop)"""
+        return iterate_blocking(lambda: self.astream(user_input, context, timeout=timeout))
+    
+    def deadline(self, timeout):
+        """Échéance absolue d'un appel (default_timeout si timeout est None)"""
+        return make_deadline(self.default_timeout if timeout is None else timeout)
+    
+    def begin_generation(self, supersede=False):
+        """Enregistrer une génération; supersede interrompt celles déjà en cours"""
+        if supersede:
+            self.cancel()
+        cancel_event = CancelEvent()
+        self.active_generations.add(cancel_event)
+        return cancel_event
+    
+    def end_generation(self, cancel_event):
+        """Retirer une génération terminée"""
+        self.active_generations.discard(cancel_event)
+    
+    def cancel(self):
+        """Interrompre les générations en cours (appelable depuis n'importe quel thread)
+        
+        Les lectures en attente sont réveillées et leur connexion fermée.
+        """
+        cancelled = 0
+        for cancel_event in list(self.active_generations):
+            if not cancel_event.is_set():
+                cancel_event.set()
+                cancelled += 1
+        if cancelled:
+            logging.getLogger(self.__class__.__module__).info(f"{cancelled} génération(s) interrompue(s)")
+        return cancelled
\ No newline at end of file
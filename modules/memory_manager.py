@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import sqlite3
 import threading
+from modules.tracing import tracer
 
 class MemoryManager:
     def __init__(self):
@@ -34,6 +35,10 @@ class MemoryManager:
         # Verrou pour les accès concurrents
         self.lock = threading.Lock()
         
+        # Publication vers le magasin de contexte de J.A.R.V.I.S.
+        self.context_store = None
+        self.context_interactions = 5
+        
         self.logger.info("MemoryManager initialisé")
     
     def init_database(self):
@@ -91,7 +96,7 @@ class MemoryManager:
     
     def add_interaction(self, speaker, content, context=None):
         """Ajouter une interaction à la mémoire"""
-        with self.lock:
+        with self.lock, tracer.span("memory.add_interaction", speaker=speaker):
             try:
                 timestamp = datetime.now().isoformat()
                 session_id = self.get_current_session_id()
@@ -119,6 +124,8 @@ class MemoryManager:
                 if len(self.recent_interactions) > self.max_recent:
                     self.recent_interactions.pop(0)
                 
+                self.publish_recent_interactions()
+                
                 # Sauvegarder périodiquement en JSON
                 self.backup_to_json()
                 
@@ -154,6 +161,17 @@ class MemoryManager:
                 self.logger.error(f"Erreur récupération interactions: {e}")
                 return self.recent_interactions[-count:] if self.recent_interactions else []
     
+    def attach_context_store(self, context_store):
+        """Brancher le magasin de contexte (amorcé depuis la base une seule fois)"""
+        self.context_store = context_store
+        self.recent_interactions = self.get_recent_interactions(self.max_recent)
+        self.publish_recent_interactions()
+    
+    def publish_recent_interactions(self):
+        """Publier les interactions récentes dans le magasin de contexte"""
+        if self.context_store:
+            self.context_store.update("recent_interactions", self.recent_interactions[-self.context_interactions:])
+    
     def search_interactions(self, query, days_back=7, speaker=None):
         """Rechercher dans les interactions"""
         try:
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Routage des requêtes entre plusieurs modèles Ollama pour J.A.R.V.I.S.
+Un classifieur léger (longueur, mots de raisonnement, suite de conversation,
+module actif) choisit le niveau de modèle; une réponse hésitante du petit
+modèle peut être reprise par le niveau supérieur
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+# Mots (sans accents) signalant une question qui demande du raisonnement
+REASONING_WORDS = {
+    "pourquoi", "explique", "expliquer", "expliques", "compare", "comparer", "difference",
+    "differences", "analyse", "analyser", "strategie", "optimiser", "optimise", "reglage",
+    "reglages", "code", "programme", "script", "fonction", "algorithme", "detaille",
+    "detailler", "procedure", "calcule", "calculer", "avantages", "inconvenients", "resume",
+    "plan", "conseille", "conseils", "diagnostic"
+}
+
+# Mots renvoyant à la conversation en cours
+FOLLOW_UP_WORDS = {"ca", "cela", "ce", "precedent", "precedente", "encore", "continue", "aussi", "plutot"}
+
+# Début de réponse signalant un modèle qui ne sait pas répondre
+LOW_CONFIDENCE_PATTERN = re.compile(
+    r"je ne (sais|connais) pas|je ne suis pas (sûr|certain)|pas (sûr|certain) de|"
+    r"je n'ai pas (d'information|accès|de données)|je ne peux pas (répondre|vous aider)|"
+    r"impossible de (répondre|savoir)|je ne comprends pas",
+    re.IGNORECASE
+)
+
+SENTENCE_END = re.compile(r"[.!?…](\s|$)")
+
+def normalize_words(text):
+    """Mots d'un texte en minuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", text).split()
+
+class ModelRouter:
+    def __init__(self, tiers, thresholds=None, escalation=True, probe_chars=160, log_path=None):
+        """Initialisation du routeur
+        
+        Args:
+            tiers (list): Niveaux {"name", "model"} du plus rapide au plus capable
+            thresholds (list): Score minimal de chaque niveau au-delà du premier
+            escalation (bool): Reprendre une réponse hésitante avec le niveau supérieur
+            probe_chars (int): Caractères examinés avant de libérer la réponse du petit modèle
+            log_path (str): Fichier JSONL des décisions (réglage des seuils), None = journal seul
+        """
+        self.logger = logging.getLogger(__name__)
+        self.tiers = tiers
+        self.thresholds = thresholds or [3 * index for index in range(1, len(tiers))]
+        self.escalation = escalation and len(tiers) > 1
+        self.probe_chars = probe_chars
+        self.log_path = Path(log_path) if log_path else None
+        self.lock = threading.Lock()
+        
+        # Statistiques par niveau
+        self.tier_stats = {tier["name"]: {"requests": 0, "escalated_to": 0, "latencies": []} for tier in tiers}
+        self.max_latencies = 100
+        self.escalations = 0
+    
+    def is_tiered(self):
+        """Plus d'un modèle configuré"""
+        return len(self.tiers) > 1
+    
+    def score(self, command, context=None, history_length=0):
+        """Score de complexité d'une commande et raisons retenues"""
+        words = normalize_words(command)
+        score = 0
+        reasons = []
+        
+        if len(words) > 25:
+            score += 2
+            reasons.append("longue")
+        elif len(words) > 12:
+            score += 1
+            reasons.append("moyenne")
+        
+        reasoning = [word for word in words if word in REASONING_WORDS]
+        if reasoning:
+            score += 2 + min(len(reasoning) - 1, 1)
+            reasons.append(f"raisonnement:{','.join(reasoning[:3])}")
+        
+        if command.count("?") > 1 or (" et " in f" {' '.join(words)} " and len(words) > 10):
+            score += 1
+            reasons.append("plusieurs questions")
+        
+        if history_length and any(word in FOLLOW_UP_WORDS for word in words):
+            score += 1
+            reasons.append("suite de conversation")
+        
+        if context:
+            if context.get("dcs_active"):
+                score += 1
+                reasons.append("module DCS")
+            if context.get("telemetry") and any(word in ("pneus", "reglage", "reglages", "strategie") for word in words):
+                score += 1
+                reasons.append("télémétrie")
+        
+        return score, reasons
+    
+    def choose(self, command, context=None, history_length=0):
+        """Choisir le niveau de modèle d'une commande"""
+        if not self.is_tiered():
+            return {"tier": 0, "name": self.tiers[0]["name"], "model": self.tiers[0]["model"],
+                    "score": None, "reasons": [], "escalated": False}
+        
+        score, reasons = self.score(command, context, history_length)
+        tier = 0
+        for index, threshold in enumerate(self.thresholds, start=1):
+            if score >= threshold:
+                tier = index
+        
+        return {"tier": tier, "name": self.tiers[tier]["name"], "model": self.tiers[tier]["model"],
+                "score": score, "reasons": reasons, "escalated": False}
+    
+    def can_escalate(self, decision):
+        """La réponse de ce niveau peut-elle être reprise par un niveau supérieur"""
+        return self.escalation and decision["tier"] < len(self.tiers) - 1
+    
+    def escalate(self, decision):
+        """Décision pour le niveau supérieur"""
+        tier = decision["tier"] + 1
+        with self.lock:
+            self.escalations += 1
+            self.tier_stats[self.tiers[tier]["name"]]["escalated_to"] += 1
+        self.logger.info(f"Réponse hésitante de {decision['model']}, reprise par {self.tiers[tier]['model']}")
+        return dict(decision, tier=tier, name=self.tiers[tier]["name"], model=self.tiers[tier]["model"], escalated=True)
+    
+    def probe_ready(self, text):
+        """Assez de texte pour juger la réponse (première phrase ou probe_chars)"""
+        return len(text) >= self.probe_chars or SENTENCE_END.search(text) is not None
+    
+    def is_low_confidence(self, command, text, done=False):
+        """Début de réponse hésitant, ou réponse complète trop courte pour la question"""
+        if LOW_CONFIDENCE_PATTERN.search(text):
+            return True
+        return done and len(text.split()) < 4 and len(normalize_words(command)) > 12
+    
+    def record(self, decision, metrics):
+        """Noter la latence d'un niveau et journaliser la décision"""
+        stats = self.tier_stats.get(decision["name"])
+        if stats is None:
+            return
+        
+        with self.lock:
+            stats["requests"] += 1
+            if metrics.get("total_ms") is not None and not metrics.get("error"):
+                stats["latencies"].append(metrics["total_ms"])
+                if len(stats["latencies"]) > self.max_latencies:
+                    stats["latencies"].pop(0)
+        
+        if not self.is_tiered():
+            return
+        
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tier": decision["name"],
+            "model": decision["model"],
+            "score": decision["score"],
+            "reasons": decision["reasons"],
+            "escalated": decision["escalated"],
+            "rejected": metrics.get("rejected", False),
+            "ttft_ms": metrics.get("ttft_ms"),
+            "total_ms": metrics.get("total_ms"),
+            "error": metrics.get("error")
+        }
+        self.logger.info(f"Routage modèle: {entry}")
+        
+        if self.log_path:
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.lock, open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                self.logger.error(f"Erreur écriture journal de routage: {e}")
+    
+    def get_status(self):
+        """Statistiques de routage par niveau"""
+        tiers = {}
+        for tier, threshold in zip(self.tiers, [None] + list(self.thresholds)):
+            stats = self.tier_stats[tier["name"]]
+            latencies = sorted(stats["latencies"])
+            tiers[tier["name"]] = {
+                "model": tier["model"],
+                "min_score": threshold,
+                "requests": stats["requests"],
+                "escalated_to": stats["escalated_to"],
+                "median_ms": latencies[len(latencies) // 2] if latencies else None
+            }
+        
+        return {
+            "tiered": self.is_tiered(),
+            "escalation": self.escalation,
+            "escalations": self.escalations,
+            "tiers": tiers,
+            "log": str(self.log_path) if self.log_path else None
+        }
\ No newline at end of file
@@ -6,13 +6,26 @@ Communication avec le modèle Mistral local
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import contextvars
 import json
 import logging
 from datetime import datetime
 import time
-import torch
+import threading
+from modules.tracing import tracer
+from modules.capability_probe import capabilities
+from modules.context_packer import ContextPacker, estimate_tokens
+from modules.llm_backend import (AsyncLLMBackend, ErrorMessage, GenerationCancelled, HTTPStatusError,
+                                 KeepAliveConnections, StreamTimeout, cancel_future)
+from modules.model_router import ModelRouter
+from modules.generation_tuner import GenerationTuner
 
-class OllamaClient:
+# Temps de chargement (ms) en dessous duquel le modèle était déjà en mémoire
+WARM_LOAD_THRESHOLD_MS = 500
+
+class OllamaClient(AsyncLLMBackend):
     def __init__(self, config):
         """Initialisation du client Ollama"""
         self.config = config
@@ -21,6 +34,36 @@ class OllamaClient:
         self.base_url = config["ollama"]["url"]
         self.model = config["ollama"]["model"]
         
+        # Niveaux de modèles (rapide -> capable) choisis selon la complexité de la commande
+        tiers = config["ollama"].get("tiers") or [{"name": "principal", "model": self.model}]
+        routing = config["ollama"].get("routing", {})
+        self.model = tiers[0]["model"]
+        self.router = ModelRouter(
+            tiers,
+            thresholds=routing.get("thresholds"),
+            escalation=routing.get("escalation", True),
+            probe_chars=routing.get("probe_chars", 160),
+            log_path=routing.get("log", "logs/model_routing.jsonl")
+        )
+        
+        # Session HTTP persistante: les connexions keep-alive sont réutilisées
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        # Générations: connexions keep-alive asynchrones (fermées à l'annulation, Ollama s'arrête)
+        self.connections = KeepAliveConnections(read_timeout=30)
+        # Échéance d'une génération complète quand l'appelant n'en donne pas
+        self.default_timeout = config["ollama"].get("deadline_s", 120)
+        
+        # État de santé déduit des requêtes réelles (aucune sonde sur le chemin critique)
+        self.health_probe_interval = config["ollama"].get("health_probe_interval", 30)
+        self.healthy = None
+        self.model_available = None
+        self.available_models = []
+        self.last_success = None
+        self.last_failure = None
+        self.last_error = None
+        self.consecutive_failures = 0
+        
         # Personnalité de J.A.R.V.I.S.
         self.system_prompt = """Tu es J.A.R.V.I.S., l'assistant personnel intelligent d'Iron Man.
         Tu es poli, professionnel, légèrement sarcastique parfois, et très compétent.
@@ -32,17 +75,104 @@ class OllamaClient:
         
         self.conversation_history = []
         self.max_history = 20
+        # Messages déjà retirés de l'historique (point de coupe stable du prompt)
+        self.history_offset = 0
+        # Version de l'historique (changée par chaque échange ou effacement)
+        self.history_version = 0
+        
+        # Fenêtre de contexte remplie par priorité dans la limite de num_ctx
+        self.num_ctx = config["ollama"].get("context_length", 2048)
+        self.num_predict = config["ollama"].get("num_predict", 300)
+        self.packer = ContextPacker(num_ctx=self.num_ctx, num_predict=self.num_predict)
+        
+        # État partagé par les requêtes simultanées (workers de l'API locale): historique,
+        # empaqueteur, bloc de contexte en cache et métriques
+        self.state_lock = threading.RLock()
+        
+        # Déchargement GPU selon la détection partagée (torch n'est pas importé ici)
+        self.num_gpu = -1 if capabilities.get("cuda")["available"] else 0
+        
+        # num_predict / num_ctx / num_thread ajustés selon les vitesses mesurées (latence cible par classe)
+        self.tuner = GenerationTuner(
+            num_predict=self.num_predict,
+            num_ctx=self.num_ctx,
+            use_gpu=self.num_gpu != 0,
+            config=config["ollama"].get("tuning", {})
+        )
+        
+        # Résidence du modèle: préchargement et maintien en mémoire (keep_alive Ollama)
+        self.keep_alive = config["ollama"].get("keep_alive", "30m")
+        self.model_state = "unloaded"  # unloaded, loading, warm, released, failed
+        self.model_load_ms = None
+        self.warm_requests = 0
+        self.cold_requests = 0
+        
+        # Cache de réponses partagé (fourni par J.A.R.V.I.S.)
+        self.response_cache = None
+        
+        # Contexte à la demande: outils fournis par J.A.R.V.I.S. (ContextTools), appelés par le modèle
+        tools_config = config["ollama"].get("tools", {})
+        self.tools = None
+        self.tool_mode = tools_config.get("enabled", False)
+        self.max_tool_rounds = tools_config.get("max_rounds", 2)
+        
+        # Générations en cours (événements d'annulation) et métriques de streaming
+        self.active_generations = set()
+        self.stream_metrics = []
+        self.max_stream_metrics = 50
+        
+        # Âge maximal (s) des données de contexte injectées dans le prompt
+        self.context_max_age = config["ollama"].get("context_max_age", {"screen_data": 30, "telemetry": 10})
+        
+        # Bloc de contexte déjà formaté, réutilisé tant que les versions n'ont pas changé
+        self.context_cache_key = None
+        self.context_cache_info = []
         
         # Test de connexion
         self.test_connection()
         
+    def record_success(self):
+        """Noter une requête réussie"""
+        if self.healthy is False:
+            self.logger.info("Connexion Ollama rétablie")
+        self.healthy = True
+        self.last_success = time.time()
+        self.consecutive_failures = 0
+    
+    def record_failure(self, error):
+        """Noter une requête échouée"""
+        if self.healthy is not False:
+            self.logger.warning(f"Ollama indisponible: {error}")
+        self.healthy = False
+        self.last_failure = time.time()
+        self.last_error = str(error)
+        self.consecutive_failures += 1
+    
+    def is_available(self):
+        """État connu d'Ollama, sans requête (inconnu = disponible)"""
+        return self.healthy is not False
+    
+    def probe_health(self):
+        """Sonde de fond limitée: inutile si une requête réelle a réussi récemment"""
+        if self.last_success and time.time() - self.last_success < self.health_probe_interval:
+            return True
+        return self.test_connection()
+    
     def test_connection(self):
         """Tester la connexion à Ollama"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            with tracer.span("ollama.test_connection"):
+                response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
+                self.record_success()
                 models = response.json()
                 model_names = [model["name"] for model in models.get("models", [])]
+                self.available_models = model_names
+                self.model_available = self.model in model_names
+                
+                missing_tiers = [tier["model"] for tier in self.router.tiers[1:] if tier["model"] not in model_names]
+                if missing_tiers:
+                    self.logger.warning(f"Modèles de niveau supérieur non trouvés: {missing_tiers}")
                 
                 if self.model in model_names:
                     self.logger.info(f"Connexion Ollama réussie. Modèle {self.model} disponible.")
@@ -50,136 +180,590 @@ class OllamaClient:
                 else:
                     self.logger.warning(f"Modèle {self.model} non trouvé. Modèles disponibles: {model_names}")
             else:
+                self.record_failure(f"HTTP {response.status_code}")
                 self.logger.error(f"Erreur Ollama: {response.status_code}")
                 
-        except requests.exceptions.ConnectionError:
+        except requests.exceptions.ConnectionError as e:
+            self.record_failure(e)
             self.logger.error("Impossible de se connecter à Ollama. Vérifiez qu'Ollama est démarré.")
         except Exception as e:
+            self.record_failure(e)
             self.logger.error(f"Erreur lors du test de connexion Ollama: {e}")
             
         return False
     
     def get_response(self, user_input, context=None):
-        """Obtenir une réponse du modèle Mistral"""
-        try:
-            print(f"🔄 Début traitement Ollama...")
-            
-            # Test de connexion rapide
-            if not self.test_connection():
-                print("❌ Connexion Ollama échouée")
-                return "Désolé monsieur, je ne parviens pas à accéder à mon processeur principal."
-            
-            # Préparer le prompt avec contexte
-            full_prompt = self.prepare_prompt(user_input, context)
-            print(f"📝 Prompt préparé: {full_prompt[:100]}...")
-            
-            # Préparer la requête
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self.system_prompt},
-                    *self.conversation_history[-self.max_history:],
-                    {"role": "user", "content": full_prompt}
-                ],
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 300,  # Réduction pour vitesse
-                    "num_predict": 300,
-                    "repeat_penalty": 1.1,
-                    "num_ctx": 2048,    # Contexte plus petit = plus rapide
-                    "num_gpu": -1 if torch.cuda.is_available() else 0  # Utiliser GPU si disponible
-                }
+        """Obtenir une réponse complète du modèle (enveloppe bloquante du streaming)"""
+        print(f"🔄 Début traitement Ollama...")
+        response = "".join(self.stream_response(user_input, context))
+        print(f"✅ Réponse obtenue: {response[:100]}...")
+        return response
+    
+    def build_messages(self, user_input, context=None):
+        """Messages du prompt, empaquetés dans le budget de tokens
+        
+        Ordre compatible avec le cache KV d'Ollama: prompt système, résumé et
+        historique validé (identiques d'un tour à l'autre), puis la question et
+        enfin le contexte volatil (heure, écran, télémétrie).
+        """
+        packed = self.packer.pack(
+            self.system_prompt,
+            user_input,
+            self.build_context_info(context),
+            self.conversation_history,
+            history_offset=self.history_offset
+        )
+        
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if packed["summary"]:
+            messages.append({"role": "system", "content": packed["summary"]})
+        messages.extend({"role": message["role"], "content": message["content"]} for message in packed["history"])
+        messages.append({"role": "user", "content": self.prepare_prompt(user_input, context_info=packed["context_items"])})
+        return messages
+    
+    def build_chat_payload(self, user_input, context=None, stream=False, model=None, settings=None):
+        """Construire la requête /api/chat
+        
+        Args:
+            model (str): Niveau choisi par le routeur (modèle principal sinon)
+            settings (dict): Options du régulateur (num_predict, num_ctx, num_thread),
+                valeurs configurées sinon
+        """
+        settings = settings or {"num_predict": self.num_predict, "num_ctx": self.num_ctx, "num_thread": None}
+        with self.state_lock:
+            # Budget de l'empaqueteur aligné sur les options envoyées
+            self.packer.num_ctx = settings["num_ctx"]
+            self.packer.num_predict = settings["num_predict"]
+            messages = self.build_messages(user_input, context)
+        
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": settings["num_predict"],  # Réduction pour vitesse
+                "num_predict": settings["num_predict"],
+                "repeat_penalty": 1.1,
+                "num_ctx": settings["num_ctx"],    # Contexte plus petit = plus rapide
+                "num_gpu": self.num_gpu  # Utiliser GPU si disponible
             }
+        }
+        if settings["num_thread"]:
+            payload["options"]["num_thread"] = settings["num_thread"]
+        if self.uses_tools():
+            tools = self.tools.descriptors(context)
+            if tools:
+                payload["tools"] = tools
+        return payload
+    
+    def prepare_payload(self, user_input, context, decision, metrics):
+        """Requête streaming d'un niveau, avec ses réglages et son estimation de tokens"""
+        with tracer.span("ollama.prepare_prompt"), self.state_lock:
+            metrics["volatile_prompt"] = self.prompt_is_volatile(context)
+            metrics["tuning"] = self.tuner.settings(user_input, context, decision["model"])
+            payload = self.build_chat_payload(user_input, context, stream=True, model=decision["model"],
+                                              settings=metrics["tuning"])
+            # Rapport de l'empaqueteur lu avant qu'une autre requête ne le remplace
+            metrics["prompt_tokens_estimate"] = self.estimate_payload_tokens(payload)
+        return payload
+    
+    def uses_tools(self):
+        """Mode outils: le contexte volumineux n'est fourni qu'à la demande du modèle"""
+        return self.tool_mode and self.tools is not None
+    
+    def estimate_payload_tokens(self, payload):
+        """Tokens estimés du prompt empaqueté et des descripteurs d'outils"""
+        tokens = self.packer.last_report["estimated_tokens"]
+        if payload.get("tools"):
+            tokens += estimate_tokens(json.dumps(payload["tools"], ensure_ascii=False))
+        return tokens
+    
+    def append_tool_results(self, payload, tool_calls, round_text, context, metrics, final):
+        """Exécuter les appels d'outils du modèle et préparer le tour suivant
+        
+        Args:
+            payload (dict): Requête /api/chat complétée sur place
+            tool_calls (list): Appels {"function": {"name", "arguments"}} reçus
+            round_text (str): Texte produit pendant ce tour
+            context (dict): Instantané du contexte de la requête
+            metrics (dict): Métriques de la génération (outils appelés, tokens ajoutés)
+            final (bool): Dernier tour autorisé: outils retirés, le modèle doit répondre
+        """
+        payload["messages"].append({"role": "assistant", "content": round_text, "tool_calls": tool_calls})
+        for call in tool_calls:
+            function = call.get("function", {})
+            with tracer.span("ollama.tool", tool=function.get("name")):
+                result = self.tools.execute(function.get("name"), function.get("arguments"), context)
+            payload["messages"].append({"role": "tool", "content": result, "tool_name": function.get("name")})
+            metrics["tool_calls"].append(function.get("name"))
+            metrics["prompt_tokens_estimate"] += self.packer.count(result)
+        
+        if final:
+            payload.pop("tools", None)
+    
+    def remember_exchange(self, user_input, assistant_response, source="ollama"):
+        """Ajouter un échange à l'historique de conversation
+        
+        Args:
+            source (str): Moteur qui a produit la réponse (ChatGPT en cas de couverture)
+        """
+        with self.state_lock:
+            self.conversation_history.append({"role": "user", "content": user_input})
+            self.conversation_history.append({"role": "assistant", "content": assistant_response, "source": source})
+            self.history_version += 1
             
-            print(f"🚀 Envoi requête à Ollama...")
-            
-            # Envoi de la requête
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=30
+            # Limiter l'historique conservé (la fenêtre envoyée est choisie par l'empaqueteur)
+            if len(self.conversation_history) > self.max_history * 2:
+                removed = len(self.conversation_history) - self.max_history * 2
+                self.conversation_history = self.conversation_history[removed:]
+                self.history_offset += removed
+    
+    def preload_model(self, background=True):
+        """Charger le modèle principal en mémoire sans générer (premier appel sans coût de chargement)"""
+        if background:
+            threading.Thread(target=self.preload_model, args=(False,), daemon=True, name="ollama-preload").start()
+            return None
+        
+        self.model_state = "loading"
+        start = time.perf_counter()
+        try:
+            # /api/generate sans prompt: Ollama charge le modèle et le garde keep_alive
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive,
+                      "options": dict(self.tuner.load_options(self.model), num_gpu=self.num_gpu)},
+                timeout=300
             )
-            
-            print(f"📨 Réponse reçue - Status: {response.status_code}")
-            
             if response.status_code == 200:
-                result = response.json()
-                assistant_response = result["message"]["content"]
-                
-                print(f"✅ Réponse obtenue: {assistant_response[:100]}...")
-                
-                # Ajouter à l'historique
-                self.conversation_history.append({"role": "user", "content": user_input})
-                self.conversation_history.append({"role": "assistant", "content": assistant_response})
-                
-                # Limiter l'historique
-                if len(self.conversation_history) > self.max_history * 2:
-                    self.conversation_history = self.conversation_history[-self.max_history:]
-                
-                self.logger.info(f"Réponse Ollama obtenue: {assistant_response[:100]}...")
-                return assistant_response
-                
-            else:
-                error_msg = f"Erreur HTTP {response.status_code}: {response.text}"
-                print(f"❌ {error_msg}")
-                self.logger.error(error_msg)
-                return "Désolé, je rencontre des difficultés techniques avec mon processeur principal."
-                
-        except requests.exceptions.Timeout:
-            error_msg = "Timeout lors de la requête Ollama"
-            print(f"⏰ {error_msg}")
-            self.logger.error(error_msg)
-            return "Désolé monsieur, le temps de traitement a été dépassé."
-            
-        except requests.exceptions.ConnectionError:
-            error_msg = "Impossible de se connecter à Ollama"
-            print(f"🔌 {error_msg}")
-            self.logger.error(error_msg)
-            return "Je ne parviens pas à me connecter à Ollama. Vérifiez qu'il est démarré."
+                self.record_success()
+                self.model_load_ms = round((time.perf_counter() - start) * 1000, 1)
+                self.model_state = "warm"
+                print(f"🔥 Modèle {self.model} préchargé en {self.model_load_ms / 1000:.1f}s")
+                self.logger.info(f"Modèle {self.model} préchargé en {self.model_load_ms:.0f} ms (keep_alive {self.keep_alive})")
+                return True
             
+            self.logger.warning(f"Préchargement du modèle {self.model} refusé: HTTP {response.status_code}")
         except Exception as e:
-            error_msg = f"Erreur lors de la requête Ollama: {e}"
-            print(f"💥 {error_msg}")
-            self.logger.error(error_msg)
-            return "Je rencontre une erreur technique. Veuillez réessayer."
+            self.record_failure(e)
+            self.logger.warning(f"Préchargement du modèle {self.model} impossible: {e}")
+        
+        self.model_state = "failed"
+        return False
     
-    def prepare_prompt(self, user_input, context=None):
-        """Préparer le prompt avec le contexte"""
-        prompt = user_input
+    def release_model(self, background=True):
+        """Libérer la mémoire des modèles de tous les niveaux (mode silencieux, arrêt)"""
+        if background:
+            threading.Thread(target=self.release_model, args=(False,), daemon=True, name="ollama-release").start()
+            return None
         
-        if context:
-            context_info = []
-            
-            # Ajouter l'heure
-            context_info.append(f"Heure actuelle: {datetime.now().strftime('%H:%M:%S')}")
+        released = False
+        for model in dict.fromkeys([self.model] + [tier["model"] for tier in self.router.tiers]):
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json={"model": model, "keep_alive": 0},
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    released = True
+                    self.logger.info(f"Modèle {model} libéré de la mémoire")
+            except Exception as e:
+                self.logger.warning(f"Libération du modèle {model} impossible: {e}")
+        
+        if released:
+            self.model_state = "released"
+        return released
+    
+    def record_residency(self, metrics):
+        """Noter si la requête a trouvé le modèle déjà chargé"""
+        metrics["warm"] = metrics["load_ms"] < WARM_LOAD_THRESHOLD_MS
+        with self.state_lock:
+            if metrics["warm"]:
+                self.warm_requests += 1
+            else:
+                self.cold_requests += 1
+                self.model_load_ms = metrics["load_ms"]
+                self.logger.info(f"Modèle {metrics['model']} chargé à la demande en {metrics['load_ms']:.0f} ms")
+            self.model_state = "warm"
+    
+    def record_stream_metrics(self, metrics):
+        """Conserver et afficher les métriques d'une génération"""
+        with self.state_lock:
+            self.stream_metrics.append(metrics)
+            if len(self.stream_metrics) > self.max_stream_metrics:
+                self.stream_metrics.pop(0)
+        
+        if metrics["ttft_ms"] is not None:
+            speed = f"{metrics['tokens_per_s']:.1f} tokens/s" if metrics["tokens_per_s"] else "débit inconnu"
+            prefill = ""
+            if metrics["prompt_eval_ms"] is not None:
+                prefill = f", prompt {metrics['prompt_eval_count']} tokens évalués en {metrics['prompt_eval_ms']:.0f} ms"
+            print(f"⚡ Premier token en {metrics['ttft_ms']:.0f} ms, {speed}{prefill}"
+                  f"{' (interrompu)' if metrics['cancelled'] else ''}")
+        self.logger.info(f"Métriques génération Ollama: {metrics}")
+    
+    def prompt_is_volatile(self, context):
+        """Le prompt dépend d'un contexte changeant: écran ou télémétrie récents
+        
+        L'historique n'intervient pas: une question qui y renvoie ("et ça ?", "continue")
+        est déjà exclue par ResponseCache.is_cacheable, les autres ont la même réponse
+        """
+        return bool(context) and any(self.is_context_fresh(context, field) for field in ("screen_data", "telemetry"))
+    
+    def get_cached_response(self, user_input, context, decision):
+        """Réponse déjà connue pour cette question (ajoutée à l'historique), ou None
+        
+        Les réponses du niveau choisi par le routeur ou d'un niveau supérieur sont acceptées.
+        """
+        if not self.response_cache:
+            return None
+        
+        models = [tier["model"] for tier in self.router.tiers[decision["tier"]:]] or [decision["model"]]
+        cached = self.response_cache.get([f"ollama:{model}" for model in models], user_input, context,
+                                         volatile=self.prompt_is_volatile(context))
+        if cached is not None:
+            tracer.instant("ollama.cache_hit")
+            self.remember_exchange(user_input, cached)
+        return cached
+    
+    def new_stream_metrics(self, decision):
+        """Métriques vides d'une génération"""
+        return {
+            "model": decision["model"],
+            "tier": decision["name"],
+            "ttft_ms": None,
+            "total_ms": None,
+            "chunks": 0,
+            "eval_count": None,
+            "tokens_per_s": None,
+            "prompt_tokens_estimate": None,
+            "tuning": None,
+            "volatile_prompt": None,
+            "tool_mode": self.uses_tools(),
+            "tool_calls": [],
+            "prompt_eval_count": None,
+            "prompt_eval_ms": None,
+            "load_ms": None,
+            "warm": None,
+            "cancelled": False,
+            "rejected": False,
+            "error": None
+        }
+    
+    def apply_stream_chunk(self, chunk, metrics, parts, start):
+        """Traiter un objet du flux /api/chat et retourner son texte"""
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            if not parts:
+                metrics["ttft_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                tracer.instant("ollama.first_token")
+            parts.append(content)
+            metrics["chunks"] += 1
+        
+        if chunk.get("done"):
+            # Statistiques fournies par Ollama (durées en nanosecondes)
+            metrics["eval_count"] = chunk.get("eval_count")
+            if chunk.get("eval_count") and chunk.get("eval_duration"):
+                metrics["tokens_per_s"] = round(chunk["eval_count"] / (chunk["eval_duration"] / 1e9), 1)
+            # Évaluation du prompt cumulée sur les tours d'outils
+            if chunk.get("prompt_eval_count") is not None:
+                metrics["prompt_eval_count"] = (metrics["prompt_eval_count"] or 0) + chunk["prompt_eval_count"]
+            if chunk.get("prompt_eval_duration") is not None:
+                metrics["prompt_eval_ms"] = round((metrics["prompt_eval_ms"] or 0) + chunk["prompt_eval_duration"] / 1e6, 1)
+            if chunk.get("load_duration") is not None:
+                metrics["load_ms"] = round(chunk["load_duration"] / 1e6, 1)
+                self.record_residency(metrics)
+        
+        return content
+    
+    def complete_exchange(self, user_input, context, parts, metrics):
+        """Mémoriser une réponse complète (historique et cache)"""
+        assistant_response = "".join(parts)
+        if assistant_response.strip() and not metrics["cancelled"] and not metrics["rejected"]:
+            self.remember_exchange(user_input, assistant_response)
+            if self.response_cache:
+                # Clé du modèle qui a réellement répondu (niveau escaladé compris); les résultats
+                # d'outils (écran, mémoire) rendent la réponse propre à ce moment
+                self.response_cache.put(f"ollama:{metrics['model']}", user_input, assistant_response, context,
+                                        volatile=metrics["volatile_prompt"] or bool(metrics["tool_calls"]))
+            self.logger.info(f"Réponse Ollama (streaming) obtenue: {assistant_response[:100]}...")
+    
+    def gate_chunk(self, state, user_input, content, done):
+        """Retenir le début de réponse d'un niveau escaladable jusqu'à pouvoir juger sa confiance
+        
+        Returns:
+            str: Texte libéré ("" tant que la première phrase n'est pas complète ou si
+                la réponse est rejetée: state["escalate"] passe alors à True)
+        """
+        if state["probe"] is None:
+            return content
+        
+        state["probe"].append(content)
+        text = "".join(state["probe"])
+        if not done and not self.router.probe_ready(text):
+            return ""
+        
+        state["probe"] = None
+        if self.router.is_low_confidence(user_input, text, done):
+            state["escalate"] = True
+            return ""
+        return text
+    
+    def close_stream_metrics(self, metrics, start, decision):
+        """Finaliser et enregistrer les métriques d'une génération"""
+        metrics["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        # Débit estimé par morceaux reçus si Ollama n'a pas fourni ses statistiques
+        if metrics["tokens_per_s"] is None and metrics["chunks"] and metrics["ttft_ms"] is not None:
+            generation_s = (metrics["total_ms"] - metrics["ttft_ms"]) / 1000
+            if generation_s > 0:
+                metrics["tokens_per_s"] = round(metrics["chunks"] / generation_s, 1)
+        self.record_stream_metrics(metrics)
+        self.router.record(decision, metrics)
+        if metrics["tuning"]:
+            self.tuner.record(metrics["tuning"], metrics)
+    
+    def stream_response(self, user_input, context=None, timeout=None):
+        """Obtenir la réponse du modèle morceau par morceau (générateur bloquant)
+        
+        La génération est celle de astream, exécutée dans la boucle d'E/S partagée:
+        cancel() l'interrompt immédiatement et l'échéance s'applique.
+        
+        Args:
+            user_input (str): Question de l'utilisateur
+            context (dict): Instantané du contexte
+            timeout (float): Échéance en secondes (None = deadline_s de la configuration)
+        
+        Yields:
+            str: Morceaux de texte dès leur production (ou message d'erreur en français)
+        """
+        return self.stream_blocking(user_input, context, timeout)
+    
+    async def astream(self, user_input, context=None, timeout=None, supersede=False, on_first_token=None):
+        """Réponse du modèle en streaming asynchrone (annulable, avec échéance)
+        
+        Args:
+            user_input (str): Question de l'utilisateur
+            context (dict): Instantané du contexte
+            timeout (float): Échéance de l'appel en secondes (None = deadline_s de la configuration)
+            supersede (bool): Interrompre les générations en cours (demande remplacée)
+            on_first_token (callable): Appelé au premier token reçu, avant la retenue du
+                début de réponse par le routeur
+        
+        Yields:
+            str: Morceaux de texte dès leur production (ou message d'erreur en français)
+        """
+        # Niveau de modèle choisi par le routeur, repris au niveau supérieur si la réponse hésite
+        decision = self.router.choose(user_input, context, len(self.conversation_history))
+        
+        # Question déjà posée: réponse servie sans génération
+        cached = self.get_cached_response(user_input, context, decision)
+        if cached is not None:
+            yield cached
+            return
+        
+        cancel_event = self.begin_generation(supersede)
+        cancelled = cancel_future(cancel_event)
+        deadline = self.deadline(timeout)
+        produced = False
+        try:
+            while True:
+                state = {"probe": [] if self.router.can_escalate(decision) else None, "escalate": False}
+                stream = self.stream_model(user_input, context, decision, state, deadline, cancelled, on_first_token)
+                try:
+                    async for chunk in stream:
+                        produced = True
+                        yield chunk
+                finally:
+                    await stream.aclose()
+                if not state["escalate"] or cancel_event.is_set():
+                    return
+                decision = self.router.escalate(decision)
+        
+        except asyncio.TimeoutError:
+            # Échéance de l'appelant: pas un signe de panne d'Ollama
+            self.logger.warning("Échéance dépassée (génération Ollama)")
+            if not produced:
+                yield ErrorMessage("Désolé monsieur, le temps de traitement a été dépassé.")
+        
+        finally:
+            cancelled.cancel()
+            self.end_generation(cancel_event)
+    
+    async def stream_model(self, user_input, context, decision, state, deadline, cancelled, on_first_token):
+        """Générer la réponse avec le modèle d'un niveau (voir astream)"""
+        start = time.perf_counter()
+        metrics = self.new_stream_metrics(decision)
+        
+        try:
+            payload = self.prepare_payload(user_input, context, decision, metrics)
             
-            # Ajouter les données d'écran si disponibles
-            if context.get("screen_data"):
-                context_info.append(f"Contenu de l'écran: {context['screen_data']}")
+            print(f"🚀 Envoi requête streaming à Ollama...")
             
-            # Ajouter les données de télémétrie si disponibles
-            if context.get("telemetry"):
-                telemetry = context["telemetry"]
-                context_info.append(f"Télémétrie course: Vitesse: {telemetry.get('speed', 'N/A')} km/h")
+            parts = []
+            for tool_round in range(self.max_tool_rounds + 1):
+                tool_calls = []
+                round_start = len(parts)
+                # Span couvrant la requête et la lecture du flux
+                with tracer.span("ollama.generate", model=decision["model"], tier=decision["name"], round=tool_round):
+                    stream = self.connections.stream_json(f"{self.base_url}/api/chat", payload, deadline, cancelled)
+                    connected = False
+                    try:
+                        async for chunk in stream:
+                            if not connected:
+                                connected = True
+                                self.record_success()
+                            tool_calls.extend(chunk.get("message", {}).get("tool_calls") or [])
+                            content = self.apply_stream_chunk(chunk, metrics, parts, start)
+                            if content and on_first_token and len(parts) == 1:
+                                on_first_token()
+                            text = self.gate_chunk(state, user_input, content, chunk.get("done") and not tool_calls)
+                            if state["escalate"]:
+                                metrics["rejected"] = True
+                                break
+                            if text:
+                                yield text
+                    finally:
+                        await stream.aclose()
+                
+                # Données demandées par le modèle: nouveau tour avec les résultats des outils
+                if not tool_calls or metrics["rejected"] or tool_round >= self.max_tool_rounds:
+                    break
+                # Outils (lecture SQLite, DCS) exécutés hors de la boucle d'E/S
+                await asyncio.get_running_loop().run_in_executor(
+                    None, contextvars.copy_context().run, self.append_tool_results,
+                    payload, tool_calls, "".join(parts[round_start:]), context, metrics,
+                    tool_round + 1 >= self.max_tool_rounds)
             
-            # Ajouter l'état des modules
-            if context.get("dcs_active"):
-                context_info.append("Module DCS F/A-18 actif")
+            # Flux terminé sans "done": libérer le début de réponse retenu
+            if state["probe"]:
+                text = self.gate_chunk(state, user_input, "", True)
+                metrics["rejected"] = state["escalate"]
+                if text:
+                    yield text
             
-            if context_info:
-                prompt = f"[CONTEXTE: {' | '.join(context_info)}]\n\nQuestion: {user_input}"
+            self.complete_exchange(user_input, context, parts, metrics)
+        
+        except GenerationCancelled:
+            # cancel(): connexion fermée, Ollama arrête de générer
+            metrics["cancelled"] = True
+        
+        except (GeneratorExit, asyncio.CancelledError):
+            # Flux abandonné par l'appelant (couverture perdue, lecteur parti)
+            metrics["cancelled"] = True
+            raise
+        
+        except asyncio.TimeoutError:
+            metrics["error"] = "échéance"
+            raise
         
-        return prompt
+        except HTTPStatusError as e:
+            error_msg = f"Erreur HTTP {e.status}: {e.body}"
+            print(f"❌ {error_msg}")
+            self.logger.error(error_msg)
+            self.record_failure(f"HTTP {e.status}")
+            metrics["error"] = f"HTTP {e.status}"
+            yield ErrorMessage("Désolé, je rencontre des difficultés techniques avec mon processeur principal.")
+        
+        except StreamTimeout as e:
+            self.record_failure(e)
+            metrics["error"] = "timeout"
+            self.logger.error("Timeout lors de la requête Ollama (streaming)")
+            yield ErrorMessage("Désolé monsieur, le temps de traitement a été dépassé.")
+        
+        except (ConnectionError, OSError) as e:
+            self.record_failure(e)
+            metrics["error"] = "connexion"
+            self.logger.error(f"Impossible de se connecter à Ollama (streaming): {e}")
+            yield ErrorMessage("Je ne parviens pas à me connecter à Ollama. Vérifiez qu'il est démarré.")
+        
+        except Exception as e:
+            metrics["error"] = str(e)
+            self.logger.error(f"Erreur lors de la requête Ollama (streaming): {e}")
+            yield ErrorMessage("Je rencontre une erreur technique. Veuillez réessayer.")
+        
+        finally:
+            self.close_stream_metrics(metrics, start, decision)
+    
+    def is_context_fresh(self, context, field):
+        """Vérifier qu'une donnée de contexte est présente et suffisamment récente"""
+        if not context.get(field):
+            return False
+        
+        max_age = self.context_max_age.get(field)
+        updated_at = context.get("updated_at", {}).get(field)
+        if max_age is None or updated_at is None:
+            return True
+        
+        return time.time() - updated_at <= max_age
+    
+    def format_context_fields(self, context):
+        """Formater les données de contexte (mis en cache par version)"""
+        fresh_fields = tuple(field for field in ("screen_data", "telemetry") if self.is_context_fresh(context, field))
+        versions = context.get("versions", {})
+        cache_key = (fresh_fields, tuple(versions.get(field) for field in fresh_fields), bool(context.get("dcs_active")))
+        
+        if versions and cache_key == self.context_cache_key:
+            return self.context_cache_info
+        
+        context_info = []
+        
+        # Ajouter les données d'écran si disponibles
+        if "screen_data" in fresh_fields:
+            context_info.append(f"Contenu de l'écran: {context['screen_data']}")
+        
+        # Ajouter les données de télémétrie si disponibles
+        if "telemetry" in fresh_fields:
+            telemetry = context["telemetry"]
+            context_info.append(f"Télémétrie course: Vitesse: {telemetry.get('speed', 'N/A')} km/h")
+        
+        # Ajouter l'état des modules
+        if context.get("dcs_active"):
+            context_info.append("Module DCS F/A-18 actif")
+        
+        self.context_cache_key = cache_key
+        self.context_cache_info = context_info
+        return context_info
+    
+    def build_context_info(self, context):
+        """Éléments de contexte à injecter, par priorité décroissante"""
+        if not context:
+            return []
+        
+        # Ajouter l'heure
+        context_info = [f"Heure actuelle: {datetime.now().strftime('%H:%M:%S')}"]
+        
+        # Mode outils: écran et télémétrie ne sont lus que si le modèle les demande
+        if self.uses_tools():
+            return context_info
+        
+        # Données écran/télémétrie/modules (les données périmées sont ignorées)
+        context_info.extend(self.format_context_fields(context))
+        return context_info
+    
+    def prepare_prompt(self, user_input, context=None, context_info=None):
+        """Préparer le prompt avec le contexte"""
+        if context_info is None:
+            context_info = self.build_context_info(context)
+        
+        # Contexte volatil en dernier: tout ce qui précède reste réutilisable par le cache KV
+        if context_info:
+            return f"{user_input}\n\n[CONTEXTE: {' | '.join(context_info)}]"
+        
+        return user_input
     
     def get_models(self):
         """Obtenir la liste des modèles disponibles"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            with tracer.span("ollama.get_models"):
+                response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
+                self.record_success()
                 models = response.json()
-                return [model["name"] for model in models.get("models", [])]
+                self.available_models = [model["name"] for model in models.get("models", [])]
+                return self.available_models
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des modèles: {e}")
         
@@ -190,7 +774,10 @@ class OllamaClient:
         available_models = self.get_models()
         if model_name in available_models:
             self.model = model_name
+            self.router.tiers[0]["model"] = model_name
+            self.model_state = "unloaded"
             self.logger.info(f"Modèle changé vers: {model_name}")
+            self.preload_model()
             return True
         else:
             self.logger.warning(f"Modèle {model_name} non disponible")
@@ -198,15 +785,74 @@ class OllamaClient:
     
     def clear_history(self):
         """Effacer l'historique de conversation"""
-        self.conversation_history = []
+        with self.state_lock:
+            self.conversation_history = []
+            self.history_version += 1
         self.logger.info("Historique de conversation effacé")
     
+    def get_tools_status(self):
+        """Mode outils et taille moyenne des prompts avec / sans contexte injecté"""
+        prompt_tokens = {}
+        for tool_mode, label in ((True, "tools"), (False, "context_injected")):
+            samples = [m for m in self.stream_metrics if m["tool_mode"] == tool_mode and m["prompt_tokens_estimate"]]
+            evaluated = [m["prompt_eval_count"] for m in samples if m["prompt_eval_count"] is not None]
+            prompt_tokens[label] = {
+                "requests": len(samples),
+                "mean_estimated": round(sum(m["prompt_tokens_estimate"] for m in samples) / len(samples), 1) if samples else None,
+                "mean_evaluated": round(sum(evaluated) / len(evaluated), 1) if evaluated else None
+            }
+        
+        tool_requests = [m for m in self.stream_metrics if m["tool_mode"]]
+        return {
+            "enabled": self.uses_tools(),
+            "max_rounds": self.max_tool_rounds,
+            "mean_calls": round(sum(len(m["tool_calls"]) for m in tool_requests) / len(tool_requests), 2) if tool_requests else None,
+            "prompt_tokens": prompt_tokens,
+            "registry": self.tools.get_status() if self.tools else None
+        }
+    
     def get_status(self):
         """Obtenir le statut du client"""
+        ttft = sorted(m["ttft_ms"] for m in self.stream_metrics if m["ttft_ms"] is not None)
+        speeds = [m["tokens_per_s"] for m in self.stream_metrics if m["tokens_per_s"]]
+        # Part du prompt servie par le cache KV: tokens estimés vs tokens réellement évalués
+        prefills = [m for m in self.stream_metrics if m["prompt_eval_ms"] is not None and m.get("prompt_tokens_estimate")]
+        prompt_eval = sorted(m["prompt_eval_ms"] for m in prefills)
+        estimated = sum(m["prompt_tokens_estimate"] for m in prefills)
+        evaluated = sum(min(m["prompt_eval_count"] or 0, m["prompt_tokens_estimate"]) for m in prefills)
         return {
-            "connected": self.test_connection(),
+            "connected": self.healthy,
             "model": self.model,
+            "model_available": self.model_available,
             "base_url": self.base_url,
+            "num_gpu": self.num_gpu,
             "history_length": len(self.conversation_history),
-            "available_models": self.get_models()
+            "context_window": self.packer.last_report,
+            "available_models": self.available_models,
+            "routing": self.router.get_status(),
+            "tuning": self.tuner.get_status(),
+            "tools": self.get_tools_status(),
+            "health": {
+                "last_success": datetime.fromtimestamp(self.last_success).isoformat() if self.last_success else None,
+                "last_failure": datetime.fromtimestamp(self.last_failure).isoformat() if self.last_failure else None,
+                "last_error": self.last_error,
+                "consecutive_failures": self.consecutive_failures
+            },
+            "residency": {
+                "state": self.model_state,
+                "keep_alive": self.keep_alive,
+                "load_ms": self.model_load_ms,
+                "last_request_warm": self.stream_metrics[-1]["warm"] if self.stream_metrics else None,
+                "warm_requests": self.warm_requests,
+                "cold_requests": self.cold_requests
+            },
+            "streaming": {
+                "active_generations": len(self.active_generations),
+                "connections": self.connections.get_status(),
+                "median_ttft_ms": ttft[len(ttft) // 2] if ttft else None,
+                "mean_tokens_per_s": round(sum(speeds) / len(speeds), 1) if speeds else None,
+                "median_prompt_eval_ms": prompt_eval[len(prompt_eval) // 2] if prompt_eval else None,
+                "prompt_reuse_estimate": round(1 - evaluated / estimated, 3) if estimated else None,
+                "last": self.stream_metrics[-1] if self.stream_metrics else None
+            }
         }
\ No newline at end of file
@@ -5,17 +5,20 @@ Client OpenAI pour J.A.R.V.I.S.
 Utilisation ponctuelle de ChatGPT avec nouvelle API
 """
 
+import asyncio
 import logging
 from datetime import datetime
+from modules.tracing import tracer
+from modules.llm_backend import AsyncLLMBackend, ErrorMessage, GenerationCancelled, cancel_future, wait_deadline
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     logging.warning("OpenAI library non disponible")
 
-class OpenAIClient:
+class OpenAIClient(AsyncLLMBackend):
     def __init__(self, config):
         """Initialisation du client OpenAI"""
         self.config = config
@@ -25,10 +28,20 @@ class OpenAIClient:
         self.api_key = config["openai"]["api_key"]
         self.model = config["openai"]["model"]
         self.client = None
+        self.async_client = None
+        # Échéance d'une réponse quand l'appelant n'en donne pas
+        self.default_timeout = config["openai"].get("deadline_s", 60)
+        
+        # Générations asynchrones en cours (événements d'annulation)
+        self.active_generations = set()
+        
+        # Cache de réponses partagé (fourni par J.A.R.V.I.S.)
+        self.response_cache = None
         
         if OPENAI_AVAILABLE and self.api_key:
             try:
                 self.client = OpenAI(api_key=self.api_key)
+                self.async_client = AsyncOpenAI(api_key=self.api_key)
                 self.logger.info("Client OpenAI initialisé")
             except Exception as e:
                 self.logger.error(f"Erreur initialisation OpenAI: {e}")
@@ -40,68 +53,155 @@ class OpenAIClient:
         """Vérifier si OpenAI est disponible"""
         return OPENAI_AVAILABLE and bool(self.api_key) and self.client is not None
     
-    def get_response(self, user_input, context=None):
-        """Obtenir une réponse de ChatGPT"""
+    def unavailable_message(self):
+        """Message expliquant pourquoi ChatGPT n'est pas utilisable"""
+        if not OPENAI_AVAILABLE:
+            return ErrorMessage("La bibliothèque OpenAI n'est pas installée. Installez avec: pip install openai")
+        return ErrorMessage("La fonctionnalité ChatGPT n'est pas configurée. Veuillez ajouter votre clé API OpenAI.")
+    
+    def prompt_is_volatile(self, context):
+        """Le prompt contient l'écran ou la télémétrie (réponse non réutilisable)"""
+        return bool(context and (context.get("screen_data") or context.get("telemetry")))
+    
+    def build_messages(self, user_input, context=None):
+        """Messages envoyés à ChatGPT"""
+        # Préparer le prompt système
+        system_prompt = """Tu es J.A.R.V.I.S., l'assistant personnel intelligent d'Iron Man.
+        Tu utilises maintenant les capacités avancées de ChatGPT.
+        Réponds en français, de manière précise et professionnelle.
+        Tu peux être légèrement sarcastique comme dans les films.
+        Adresse-toi à l'utilisateur avec respect ("Monsieur" ou "Madame")."""
+        
+        # Préparer les messages
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input}
+        ]
+        
+        # Ajouter le contexte si disponible
+        if context:
+            context_msg = self.format_context(context)
+            messages.insert(1, {"role": "system", "content": f"Contexte actuel: {context_msg}"})
+        
+        return messages
+    
+    def describe_error(self, e):
+        """Message d'erreur en français pour une exception de l'API"""
+        error_msg = str(e).lower()
+        
+        if "authentication" in error_msg or "api_key" in error_msg:
+            self.logger.error("Erreur d'authentification OpenAI")
+            return ErrorMessage("Erreur d'authentification avec ChatGPT. Vérifiez votre clé API.")
+        elif "rate_limit" in error_msg or "quota" in error_msg:
+            self.logger.error("Limite de taux OpenAI atteinte")
+            return ErrorMessage("Limite de requêtes ChatGPT atteinte. Veuillez patienter.")
+        elif "connection" in error_msg or "network" in error_msg:
+            self.logger.error(f"Erreur de connexion OpenAI: {e}")
+            return ErrorMessage("Erreur de connexion avec ChatGPT. Vérifiez votre connexion internet.")
+        else:
+            self.logger.error(f"Erreur OpenAI: {e}")
+            return ErrorMessage("Erreur technique avec ChatGPT. Veuillez réessayer.")
+    
+    def get_response(self, user_input, context=None, timeout=None):
+        """Obtenir une réponse de ChatGPT (annulable par cancel(), échéance deadline_s)"""
         if not self.is_available():
-            if not OPENAI_AVAILABLE:
-                return "La bibliothèque OpenAI n'est pas installée. Installez avec: pip install openai"
-            return "La fonctionnalité ChatGPT n'est pas configurée. Veuillez ajouter votre clé API OpenAI."
+            return self.unavailable_message()
+        
+        parts = list(self.stream_blocking(user_input, context, timeout))
+        # Message d'erreur seul: type conservé (non mis en cache, non resservi)
+        return parts[0] if len(parts) == 1 else "".join(parts)
+    
+    async def astream(self, user_input, context=None, timeout=None, supersede=False, on_first_token=None):
+        """Réponse de ChatGPT en streaming asynchrone (annulable, avec échéance)
+        
+        Args:
+            user_input (str): Question de l'utilisateur
+            context (dict): Instantané du contexte
+            timeout (float): Échéance de l'appel en secondes (None = deadline_s de la configuration)
+            supersede (bool): Interrompre les générations en cours (demande remplacée)
+            on_first_token (callable): Appelé au premier morceau de texte reçu
+        
+        Yields:
+            str: Morceaux de texte dès leur production (ou message d'erreur en français)
+        """
+        if not self.is_available() or self.async_client is None:
+            yield self.unavailable_message()
+            return
+        
+        if self.response_cache:
+            cached = self.response_cache.get(f"openai:{self.model}", user_input, context,
+                                             volatile=self.prompt_is_volatile(context))
+            if cached is not None:
+                yield cached
+                return
+        
+        cancel_event = self.begin_generation(supersede)
+        # cancel() réveille les attentes en cours (pas seulement entre deux morceaux)
+        cancelled = cancel_future(cancel_event)
+        deadline = self.deadline(timeout)
+        parts = []
+        stream = None
         
         try:
-            # Préparer le prompt système
-            system_prompt = """Tu es J.A.R.V.I.S., l'assistant personnel intelligent d'Iron Man.
-            Tu utilises maintenant les capacités avancées de ChatGPT.
-            Réponds en français, de manière précise et professionnelle.
-            Tu peux être légèrement sarcastique comme dans les films.
-            Adresse-toi à l'utilisateur avec respect ("Monsieur" ou "Madame")."""
-            
-            # Préparer les messages
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ]
-            
-            # Ajouter le contexte si disponible
-            if context:
-                context_msg = self.format_context(context)
-                messages.insert(1, {"role": "system", "content": f"Contexte actuel: {context_msg}"})
-            
-            # Appel à l'API OpenAI avec nouvelle méthode
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7,
-                top_p=0.9
-            )
-            
-            assistant_response = response.choices[0].message.content
-            self.logger.info(f"Réponse ChatGPT obtenue: {assistant_response[:100]}...")
-            
-            return assistant_response
+            with tracer.span("openai.generate", model=self.model, mode="async"):
+                stream = await wait_deadline(self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=self.build_messages(user_input, context),
+                    max_tokens=500,
+                    temperature=0.7,
+                    top_p=0.9,
+                    stream=True
+                ), deadline, cancelled)
+                
+                while True:
+                    try:
+                        event = await wait_deadline(stream.__anext__(), deadline, cancelled)
+                    except StopAsyncIteration:
+                        break
+                    
+                    content = event.choices[0].delta.content if event.choices else None
+                    if content:
+                        parts.append(content)
+                        if on_first_token and len(parts) == 1:
+                            on_first_token()
+                        yield content
             
+            assistant_response = "".join(parts)
+            if assistant_response.strip() and not cancel_event.is_set():
+                self.logger.info(f"Réponse ChatGPT (streaming) obtenue: {assistant_response[:100]}...")
+                if self.response_cache:
+                    self.response_cache.put(f"openai:{self.model}", user_input, assistant_response, context,
+                                            volatile=self.prompt_is_volatile(context))
+        
+        except GenerationCancelled:
+            self.logger.info("Génération ChatGPT interrompue")
+        
+        except asyncio.TimeoutError:
+            self.logger.warning("Échéance dépassée (ChatGPT)")
+            if not parts:
+                yield ErrorMessage("Délai de réponse de ChatGPT dépassé. Veuillez réessayer.")
+        
+        except asyncio.CancelledError:
+            raise
+        
         except Exception as e:
-            error_msg = str(e).lower()
-            
-            if "authentication" in error_msg or "api_key" in error_msg:
-                self.logger.error("Erreur d'authentification OpenAI")
-                return "Erreur d'authentification avec ChatGPT. Vérifiez votre clé API."
-            elif "rate_limit" in error_msg or "quota" in error_msg:
-                self.logger.error("Limite de taux OpenAI atteinte")
-                return "Limite de requêtes ChatGPT atteinte. Veuillez patienter."
-            elif "connection" in error_msg or "network" in error_msg:
-                self.logger.error(f"Erreur de connexion OpenAI: {e}")
-                return "Erreur de connexion avec ChatGPT. Vérifiez votre connexion internet."
-            else:
-                self.logger.error(f"Erreur OpenAI: {e}")
-                return "Erreur technique avec ChatGPT. Veuillez réessayer."
+            yield self.describe_error(e)
+        
+        finally:
+            cancelled.cancel()
+            self.end_generation(cancel_event)
+            # Fermer la connexion HTTP: OpenAI arrête de facturer la génération
+            if stream is not None:
+                try:
+                    await stream.close()
+                except Exception:
+                    pass
     
     def format_context(self, context):
         """Formater le contexte pour ChatGPT"""
         context_parts = []
         
-        if context.get("timestamp"):
-            context_parts.append(f"Heure: {context['timestamp']}")
+        context_parts.append(f"Heure: {context.get('timestamp') or datetime.now().isoformat()}")
         
         if context.get("screen_data"):
             context_parts.append(f"Écran: {context['screen_data']}")
@@ -143,6 +243,7 @@ class OpenAIClient:
         if OPENAI_AVAILABLE:
             try:
                 self.client = OpenAI(api_key=api_key)
+                self.async_client = AsyncOpenAI(api_key=api_key)
                 # Mise à jour du config
                 self.config["openai"]["api_key"] = api_key
                 self.logger.info("Clé API OpenAI mise à jour")
@@ -160,7 +261,8 @@ class OpenAIClient:
             "openai_library_available": OPENAI_AVAILABLE,
             "api_key_configured": bool(self.api_key),
             "client_initialized": self.client is not None,
-            "model": self.model
+            "model": self.model,
+            "active_generations": len(self.active_generations)
         }
         
         if self.is_available():
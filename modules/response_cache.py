@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de réponses pour J.A.R.V.I.S.
+Les questions répétées (procédures, définitions) sont servies sans nouvelle génération;
+les questions qui dépendent d'un contexte volatil (heure, écran, télémétrie) ou qui
+renvoient aux échanges précédents sont exclues, de même que les réponses dont le prompt
+contenait l'écran ou la télémétrie
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+# Mots (sans accents) signalant une réponse dépendant d'un contexte volatil
+# ou renvoyant à la conversation en cours
+VOLATILE_WORDS = {
+    # Heure et date
+    "heure", "heures", "date", "jour", "aujourd", "demain", "hier", "maintenant",
+    "actuel", "actuelle", "actuellement", "moment", "semaine", "mois", "annee", "meteo",
+    # Écran
+    "ecran", "vois", "voit", "affiche", "affichee", "fenetre",
+    # Télémétrie de la session en cours
+    "telemetrie", "pneu", "pneus", "carburant", "essence", "chrono", "degats",
+    # Suite de conversation (seules questions dont la réponse dépend de l'historique)
+    "ca", "cela", "precedent", "precedente", "encore", "continue"
+}
+
+# Formules de politesse ignorées dans la clé
+FILLER_PATTERN = re.compile(r"\b(jarvis|s il (te|vous) plait|stp|svp|dis moi|peux tu|pourrais tu)\b")
+
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=86400, disk_path=None, key_fields=("dcs_active",)):
+        """Initialisation du cache de réponses
+        
+        Args:
+            max_entries (int): Nombre maximal d'entrées (éviction LRU)
+            ttl (float): Durée de validité d'une réponse en secondes
+            disk_path (str): Fichier JSON persistant entre les redémarrages (None = mémoire seule)
+            key_fields (tuple): Champs de contexte stables intégrés à la clé
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.key_fields = key_fields
+        
+        # Clé -> {"response", "created_at"}, du moins au plus récemment utilisé
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        # Réponses ajoutées depuis la dernière écriture (flush périodique et à l'arrêt)
+        self.dirty = False
+        
+        # Statistiques
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        
+        if self.disk_path:
+            self.load()
+    
+    def normalize(self, question):
+        """Normaliser une question (minuscules, sans accents ni ponctuation)"""
+        text = unicodedata.normalize("NFKD", question.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        text = re.sub(r"[^a-z0-9]+", " ", text)
+        text = FILLER_PATTERN.sub(" ", text)
+        return " ".join(text.split())
+    
+    def is_cacheable(self, question):
+        """Une réponse est réutilisable si la question ne dépend d'aucun contexte volatil"""
+        words = self.normalize(question).split()
+        if len(words) < 2:
+            return False
+        return not any(word in VOLATILE_WORDS for word in words)
+    
+    def make_key(self, namespace, question, context=None):
+        """Clé: moteur/modèle + question normalisée + champs de contexte stables"""
+        fields = []
+        if context:
+            fields = [f"{field}={context.get(field)}" for field in self.key_fields if field in context]
+        return "|".join([namespace, self.normalize(question)] + fields)
+    
+    def get(self, namespace, question, context=None, volatile=False):
+        """Réponse en cache (None si absente, expirée ou non réutilisable)
+        
+        Args:
+            namespace (str|list): Moteur/modèle, ou liste de modèles acceptables (premier trouvé)
+            question (str): Question posée
+            context (dict): Instantané du contexte (champs stables de la clé)
+            volatile (bool): Le prompt contiendrait un contexte changeant (écran, télémétrie):
+                aucune réponse servie
+        """
+        if volatile or not self.is_cacheable(question):
+            self.bypassed += 1
+            return None
+        
+        namespaces = [namespace] if isinstance(namespace, str) else namespace
+        with self.lock:
+            entry = None
+            for key in [self.make_key(name, question, context) for name in namespaces]:
+                entry = self.entries.get(key)
+                if entry is not None and time.time() - entry["created_at"] > self.ttl:
+                    del self.entries[key]
+                    entry = None
+                if entry is not None:
+                    break
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+        
+        self.logger.info(f"Réponse servie depuis le cache: {question[:50]}")
+        return entry["response"]
+    
+    def put(self, namespace, question, response, context=None, volatile=False):
+        """Mémoriser une réponse (ignoré si la question ou le prompt n'est pas réutilisable)"""
+        if volatile or not response or not response.strip() or not self.is_cacheable(question):
+            return False
+        
+        key = self.make_key(namespace, question, context)
+        with self.lock:
+            self.entries[key] = {"response": response, "created_at": time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            # Écriture différée: pas d'E/S disque sur le thread de génération
+            self.dirty = True
+        return True
+    
+    def clear(self):
+        """Vider le cache (mémoire et disque)"""
+        with self.lock:
+            self.entries.clear()
+        if self.disk_path:
+            self.save()
+    
+    def load(self):
+        """Charger les réponses non expirées depuis le disque"""
+        try:
+            if not self.disk_path.exists():
+                return
+            
+            with open(self.disk_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            
+            now = time.time()
+            for key, entry in data.get("entries", []):
+                if now - entry["created_at"] <= self.ttl:
+                    self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            
+            self.logger.info(f"{len(self.entries)} réponse(s) chargée(s) depuis {self.disk_path}")
+        
+        except Exception as e:
+            self.logger.error(f"Erreur chargement cache de réponses: {e}")
+    
+    def flush(self):
+        """Écrire le cache sur le disque s'il a changé (tâche planifiée et arrêt)"""
+        if self.disk_path and self.dirty:
+            self.save()
+    
+    def save(self):
+        """Écrire le cache sur le disque (ordre LRU conservé)"""
+        try:
+            with self.lock:
+                data = {"entries": list(self.entries.items())}
+                self.dirty = False
+            
+            with self.save_lock:
+                self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.disk_path.with_suffix(".tmp")
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                temp_path.replace(self.disk_path)
+        
+        except Exception as e:
+            self.dirty = True
+            self.logger.error(f"Erreur sauvegarde cache de réponses: {e}")
+    
+    def get_status(self):
+        """Obtenir les statistiques du cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "disk": str(self.disk_path) if self.disk_path else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
\ No newline at end of file
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificateur de tâches de fond pour J.A.R.V.I.S.
+Un seul thread exécute toutes les surveillances périodiques (écran, SimHub, DCS...)
+avec intervalles adaptatifs
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+class BackgroundScheduler:
+    def __init__(self):
+        """Initialisation du planificateur"""
+        self.logger = logging.getLogger(__name__)
+        
+        # Nom -> tâche, et tas des prochaines exécutions (instant, ordre, nom)
+        self.jobs = {}
+        self.heap = []
+        self.sequence = itertools.count()
+        
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.current_job = None
+    
+    def add_job(self, name, func, interval, min_interval=None, max_interval=None,
+                jitter=0.1, backoff=2.0, start_delay=0.0):
+        """Ajouter (ou remplacer) une tâche périodique
+        
+        La fonction retourne True si la source est active (intervalle minimal),
+        False si elle est indisponible (intervalle multiplié par backoff jusqu'à
+        max_interval) ou None pour conserver l'intervalle de base.
+        
+        Args:
+            name (str): Nom unique de la tâche
+            func (callable): Fonction sans argument exécutée périodiquement
+            interval (float): Intervalle de base en secondes
+            min_interval (float): Intervalle quand la source est active
+            max_interval (float): Intervalle maximal après échecs répétés
+            jitter (float): Variation aléatoire relative de l'intervalle (0.1 = ±10%)
+            backoff (float): Facteur de ralentissement quand la source est indisponible
+            start_delay (float): Délai avant la première exécution
+        """
+        job = {
+            "name": name,
+            "func": func,
+            "interval": interval,
+            "min_interval": min_interval if min_interval is not None else interval,
+            "max_interval": max_interval if max_interval is not None else interval,
+            "current_interval": interval,
+            "jitter": jitter,
+            "backoff": backoff,
+            "next_run": time.monotonic() + start_delay,
+            "runs": 0,
+            "errors": 0,
+            "last_result": None,
+            "last_duration": None
+        }
+        
+        with self.condition:
+            self.jobs[name] = job
+            heapq.heappush(self.heap, (job["next_run"], next(self.sequence), name))
+            self.condition.notify()
+        
+        self.logger.info(f"Tâche planifiée: {name} (toutes les {interval}s)")
+    
+    def remove_job(self, name):
+        """Retirer une tâche"""
+        with self.condition:
+            if self.jobs.pop(name, None) is not None:
+                self.logger.info(f"Tâche retirée: {name}")
+            self.condition.notify()
+    
+    def trigger(self, name):
+        """Exécuter une tâche au plus tôt (ex: source qui vient de devenir active)"""
+        with self.condition:
+            job = self.jobs.get(name)
+            if job is None:
+                return False
+            
+            job["current_interval"] = job["min_interval"]
+            job["next_run"] = time.monotonic()
+            heapq.heappush(self.heap, (job["next_run"], next(self.sequence), name))
+            self.condition.notify()
+            return True
+    
+    def has_job(self, name):
+        """Vérifier si une tâche est planifiée"""
+        return name in self.jobs
+    
+    def start(self):
+        """Démarrer le thread du planificateur"""
+        if self.running:
+            return
+        
+        self.running = True
+        self.thread = threading.Thread(target=self.run_loop, daemon=True, name="jarvis-scheduler")
+        self.thread.start()
+        self.logger.info("Planificateur de tâches de fond démarré")
+    
+    def stop(self, timeout=5):
+        """Arrêter le planificateur et annuler toutes les tâches"""
+        if not self.running:
+            return
+        
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+        
+        self.logger.info("Planificateur de tâches de fond arrêté")
+    
+    def next_due_job(self):
+        """Attendre la prochaine tâche à exécuter (None à l'arrêt)"""
+        with self.condition:
+            while self.running:
+                # Ignorer les entrées obsolètes (tâche retirée ou replanifiée)
+                while self.heap:
+                    next_run, _, name = self.heap[0]
+                    job = self.jobs.get(name)
+                    if job is None or job["next_run"] != next_run:
+                        heapq.heappop(self.heap)
+                        continue
+                    break
+                
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                
+                delay = self.heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                
+                _, _, name = heapq.heappop(self.heap)
+                return self.jobs[name]
+        
+        return None
+    
+    def run_loop(self):
+        """Boucle du thread: exécuter les tâches à échéance"""
+        while self.running:
+            job = self.next_due_job()
+            if job is None:
+                break
+            
+            self.current_job = job["name"]
+            scheduled = job["next_run"]
+            start = time.monotonic()
+            try:
+                result = job["func"]()
+            except Exception as e:
+                self.logger.error(f"Erreur tâche {job['name']}: {e}")
+                job["errors"] += 1
+                result = False
+            finally:
+                self.current_job = None
+            
+            job["runs"] += 1
+            job["last_result"] = result
+            job["last_duration"] = time.monotonic() - start
+            self.reschedule(job, result, scheduled)
+    
+    def reschedule(self, job, result, scheduled):
+        """Calculer la prochaine exécution selon l'état de la source"""
+        if result is True:
+            interval = job["min_interval"]
+        elif result is False:
+            interval = min(job["current_interval"] * job["backoff"], job["max_interval"])
+        else:
+            interval = job["interval"]
+        
+        job["current_interval"] = interval
+        delay = interval * (1 + random.uniform(-job["jitter"], job["jitter"]))
+        
+        with self.condition:
+            # La tâche a pu être retirée ou redéclenchée pendant son exécution
+            if self.jobs.get(job["name"]) is not job or job["next_run"] != scheduled:
+                return
+            job["next_run"] = time.monotonic() + delay
+            heapq.heappush(self.heap, (job["next_run"], next(self.sequence), job["name"]))
+            self.condition.notify()
+    
+    def get_status(self):
+        """Obtenir le statut des tâches planifiées"""
+        now = time.monotonic()
+        return {
+            "running": self.running,
+            "current_job": self.current_job,
+            "jobs": {
+                name: {
+                    "interval": round(job["current_interval"], 2),
+                    "next_run_in": round(max(0.0, job["next_run"] - now), 2),
+                    "runs": job["runs"],
+                    "errors": job["errors"],
+                    "last_result": job["last_result"],
+                    "last_duration": round(job["last_duration"], 3) if job["last_duration"] is not None else None
+                }
+                for name, job in list(self.jobs.items())
+            }
+        }
\ No newline at end of file
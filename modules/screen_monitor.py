@@ -15,9 +15,11 @@ import pytesseract
 from PIL import Image, ImageGrab
 import pyautogui
 from pathlib import Path
+from modules.tracing import tracer
+from modules.capability_probe import capabilities
 
 class ScreenMonitor:
-    def __init__(self, config):
+    def __init__(self, config, scheduler=None):
         """Initialisation du moniteur d'écran"""
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -32,6 +34,12 @@ class ScreenMonitor:
         self.last_screenshot = None
         self.monitor_thread = None
         
+        # Planificateur des tâches de fond (thread dédié si absent)
+        self.scheduler = scheduler
+        
+        # Publication vers le magasin de contexte de J.A.R.V.I.S.
+        self.context_store = None
+        
         # Configuration Tesseract
         self.setup_tesseract()
         
@@ -42,28 +50,18 @@ class ScreenMonitor:
         self.logger.info("ScreenMonitor initialisé")
     
     def setup_tesseract(self):
-        """Configuration de Tesseract OCR"""
+        """Configuration de Tesseract OCR (chemin issu de la détection partagée)"""
         try:
-            # Tenter de configurer le chemin Tesseract (Windows)
-            possible_paths = [
-                r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                "tesseract"  # Si dans PATH
-            ]
+            tesseract = capabilities.get("tesseract")
+            if not tesseract["available"]:
+                self.logger.warning("Tesseract non trouvé. OCR désactivé.")
+                self.ocr_enabled = False
+                return
             
-            for path in possible_paths:
-                try:
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    # Test simple
-                    test_image = Image.new('RGB', (100, 50), color='white')
-                    pytesseract.image_to_string(test_image)
-                    self.logger.info(f"Tesseract configuré: {path}")
-                    return
-                except:
-                    continue
-            
-            self.logger.warning("Tesseract non trouvé. OCR désactivé.")
-            self.ocr_enabled = False
+            pytesseract.pytesseract.tesseract_cmd = tesseract["path"]
+            if not tesseract.get("french", True):
+                self.logger.warning("Langue française (fra) absente de Tesseract")
+            self.logger.info(f"Tesseract configuré: {tesseract['path']}")
             
         except Exception as e:
             self.logger.error(f"Erreur configuration Tesseract: {e}")
@@ -114,6 +112,12 @@ class ScreenMonitor:
             
             return cleaned_text
             
+        except pytesseract.TesseractNotFoundError as e:
+            # Tesseract désinstallé depuis la détection: nouvelle détection au prochain démarrage
+            self.logger.error(f"Erreur OCR: {e}")
+            capabilities.invalidate("tesseract")
+            self.ocr_enabled = False
+            return ""
         except Exception as e:
             self.logger.error(f"Erreur OCR: {e}")
             return ""
@@ -144,12 +148,14 @@ class ScreenMonitor:
     
     def analyze_screen(self):
         """Analyser le contenu actuel de l'écran"""
-        screenshot = self.capture_screen()
+        with tracer.span("screen.capture"):
+            screenshot = self.capture_screen()
         if not screenshot:
             return "Impossible de capturer l'écran"
         
         # Extraction du texte
-        extracted_text = self.extract_text_from_image(screenshot)
+        with tracer.span("screen.ocr"):
+            extracted_text = self.extract_text_from_image(screenshot)
         
         # Analyse basique du contenu
         analysis = self.analyze_content(extracted_text, screenshot)
@@ -197,14 +203,28 @@ class ScreenMonitor:
             return
         
         self.is_monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self.monitor_thread.start()
+        if self.context_store:
+            self.context_store.update("screen_active", True)
+        
+        if self.scheduler:
+            # Capture ralentie jusqu'à 4x l'intervalle tant que l'écran est indisponible
+            self.scheduler.add_job("screen_ocr", self.update_screen_data,
+                                   interval=self.monitoring_interval,
+                                   max_interval=self.monitoring_interval * 4)
+        else:
+            self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self.monitor_thread.start()
         
         self.logger.info("Surveillance d'écran démarrée")
     
     def stop_monitoring(self):
         """Arrêter la surveillance"""
         self.is_monitoring = False
+        if self.context_store:
+            self.context_store.update("screen_active", False)
+            self.context_store.remove("screen_data")
+        if self.scheduler:
+            self.scheduler.remove_job("screen_ocr")
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         
@@ -221,10 +241,15 @@ class ScreenMonitor:
                 time.sleep(5)
     
     def update_screen_data(self):
-        """Mettre à jour les données d'écran"""
+        """Mettre à jour les données d'écran (False si la capture a échoué)"""
         screenshot = self.capture_screen()
-        if screenshot:
-            self.current_screen_text = self.extract_text_from_image(screenshot)
+        if not screenshot:
+            return False
+        
+        self.current_screen_text = self.extract_text_from_image(screenshot)
+        if self.context_store and self.is_monitoring:
+            self.context_store.update("screen_data", self.current_screen_text)
+        return None
     
     def get_current_screen_text(self):
         """Obtenir le texte actuel de l'écran"""
@@ -10,12 +10,11 @@ import json
 import requests
 import socket
 import threading
-import time
 from datetime import datetime
 from pathlib import Path
 
 class SimHubMechanic:
-    def __init__(self, config):
+    def __init__(self, config, scheduler=None):
         """Initialisation du mécanicien virtuel"""
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -30,6 +29,16 @@ class SimHubMechanic:
         self.telemetry_data = {}
         self.last_update = None
         
+        # Planificateur des tâches de fond (thread dédié si absent)
+        self.scheduler = scheduler
+        self.monitor_stop = threading.Event()
+        
+        # Notification des changements d'état (noyau événementiel)
+        self.event_callback = None
+        
+        # Publication vers le magasin de contexte de J.A.R.V.I.S.
+        self.context_store = None
+        
         # Données de performance
         self.lap_times = []
         self.sector_times = []
@@ -65,14 +74,38 @@ class SimHubMechanic:
     
     def start_connection_monitoring(self):
         """Démarrer la surveillance de connexion SimHub"""
+        if self.scheduler:
+            # Sonde espacée jusqu'à 30 s tant que SimHub est absent
+            self.scheduler.add_job("simhub_connection", self.check_simhub_connection,
+                                   interval=5, max_interval=30, start_delay=5)
+            # Télémétrie à 0.5 s une fois connecté, ralentie jusqu'à 5 s sinon
+            self.scheduler.add_job("simhub_telemetry", self.poll_telemetry,
+                                   interval=0.5, max_interval=5)
+            return
+        
         def monitor():
-            while True:
+            while not self.monitor_stop.is_set():
                 self.check_simhub_connection()
-                time.sleep(5)
+                self.monitor_stop.wait(5)
         
         monitor_thread = threading.Thread(target=monitor, daemon=True)
         monitor_thread.start()
     
+    def stop_connection_monitoring(self):
+        """Arrêter la surveillance de connexion SimHub"""
+        self.monitor_stop.set()
+        if self.scheduler:
+            self.scheduler.remove_job("simhub_connection")
+            self.scheduler.remove_job("simhub_telemetry")
+    
+    def poll_telemetry(self):
+        """Tâche planifiée: mettre à jour la télémétrie si SimHub est connecté"""
+        if not self.connected:
+            return False
+        
+        self.update_telemetry()
+        return True
+    
     def check_simhub_connection(self):
         """Vérifier la connexion à SimHub"""
         try:
@@ -87,11 +120,21 @@ class SimHubMechanic:
             
             if self.connected and not was_connected:
                 self.logger.info("Connexion SimHub établie")
+                if self.scheduler:
+                    self.scheduler.trigger("simhub_telemetry")
+                if self.event_callback:
+                    self.event_callback("Connexion SimHub établie. Télémétrie disponible.")
             elif not self.connected and was_connected:
                 self.logger.warning("Connexion SimHub perdue")
+                if self.context_store:
+                    self.context_store.remove("telemetry")
+                if self.event_callback:
+                    self.event_callback("Connexion SimHub perdue.")
                 
         except Exception as e:
             self.connected = False
+        
+        return self.connected
     
     def is_connected(self):
         """Vérifier si SimHub est connecté"""
@@ -114,10 +157,14 @@ class SimHubMechanic:
                 data = response.json()
                 self.telemetry_data = data
                 self.last_update = datetime.now()
+                if self.context_store:
+                    self.context_store.update("telemetry", data)
                 return data
                 
         except requests.exceptions.ConnectionError:
             self.connected = False
+            if self.context_store:
+                self.context_store.remove("telemetry")
         except Exception as e:
             self.logger.error(f"Erreur récupération télémétrie: {e}")
         
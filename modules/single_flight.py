@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regroupement des requêtes LLM identiques pour J.A.R.V.I.S. (single-flight)
+Une même question posée pendant qu'une génération est en cours (doublon de la
+reconnaissance vocale, plusieurs clients de l'API locale) se rattache à cette
+génération et reçoit le même flux au lieu d'en lancer une seconde
+"""
+
+import logging
+import threading
+import time
+from modules.llm_backend import ErrorMessage, io_loop
+from modules.model_router import normalize_words
+
+# Champs de contexte qui modifient le prompt (les autres n'empêchent pas le regroupement)
+KEY_FIELDS = ("screen_data", "telemetry", "dcs_active")
+
+class SingleFlightLLM:
+    def __init__(self, backend, linger=2.0, key_fields=KEY_FIELDS, history_version=None):
+        """Initialisation du regroupement
+        
+        Args:
+            backend: Moteur LLM du protocole AsyncLLMBackend (astream, cancel)
+            linger (float): Secondes pendant lesquelles une réponse terminée est encore
+                servie aux doublons (0 = uniquement pendant la génération)
+            key_fields (tuple): Champs de contexte dont la version fait partie de la clé
+            history_version (callable): Version de l'historique de conversation envoyé au
+                modèle (None si le moteur n'en envoie pas); fait partie de la clé
+        """
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.linger = linger
+        self.key_fields = key_fields
+        self.history_version = history_version
+        
+        # Clé -> vol (génération partagée)
+        self.flights = {}
+        self.lock = threading.Lock()
+        
+        # Statistiques
+        self.requests = 0
+        self.generations = 0
+        self.coalesced = 0
+        self.replayed = 0
+        self.max_subscribers = 1
+    
+    def make_key(self, user_input, context=None, history=None):
+        """Clé: question normalisée + version de l'historique + versions des champs de contexte du prompt"""
+        question = " ".join(normalize_words(user_input))
+        if not context:
+            return (question, history)
+        versions = context.get("versions", {})
+        fields = tuple((field, versions.get(field), bool(context.get(field))) for field in self.key_fields)
+        return (question, history) + fields
+    
+    def expire(self, now):
+        """Retirer les vols terminés depuis plus de linger secondes (verrou détenu)"""
+        for key, flight in list(self.flights.items()):
+            if flight["done"] and now - flight["finished_at"] > self.linger:
+                del self.flights[key]
+    
+    def stream_response(self, user_input, context=None):
+        """Réponse morceau par morceau, partagée avec les requêtes identiques en cours
+        
+        Yields:
+            str: Morceaux de texte (les mêmes pour tous les participants d'un vol)
+        """
+        return self.join(user_input, context)[0]
+    
+    def join(self, user_input, context=None, speak=False):
+        """Rejoindre (ou lancer) la génération de cette question
+        
+        Args:
+            user_input (str): Question de l'utilisateur
+            context (dict): Instantané du contexte
+            speak (bool): L'appelant prononce la réponse
+        
+        Returns:
+            tuple: (morceaux de la réponse, True si cet appel a lancé la génération,
+                True si un autre participant prononce déjà cette réponse).
+                Seul le lanceur enregistre l'échange: les doublons reçoivent la même réponse
+        """
+        history = self.history_version() if self.history_version else None
+        key = self.make_key(user_input, context, history)
+        now = time.time()
+        with self.lock:
+            self.requests += 1
+            self.expire(now)
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = {
+                    "history": history,
+                    "chunks": [],
+                    "done": False,
+                    "condition": threading.Condition(),
+                    "started_at": now,
+                    "finished_at": None,
+                    "subscribers": 0,
+                    "spoken": False
+                }
+                self.flights[key] = flight
+                self.generations += 1
+            elif flight["done"]:
+                self.replayed += 1
+            else:
+                self.coalesced += 1
+            flight["subscribers"] += 1
+            # Un seul participant prononce la réponse (doublon vocal: rien n'est répété)
+            spoken = speak and flight["spoken"]
+            flight["spoken"] = flight["spoken"] or speak
+            self.max_subscribers = max(self.max_subscribers, flight["subscribers"])
+        
+        if leader:
+            # Producteur indépendant des lecteurs: tâche de la boucle d'E/S partagée (contexte de
+            # trace du demandeur conservé); moteur résolu ici pour qu'un chargement différé
+            # ne bloque pas la boucle
+            io_loop.submit(self.produce(key, flight, self.backend.astream, user_input, context))
+        else:
+            self.logger.info(f"Requête identique rattachée à la génération en cours: {user_input[:50]}")
+        
+        return self.follow(flight), leader, spoken
+    
+    async def produce(self, key, flight, astream, user_input, context):
+        """Générer la réponse une seule fois et la diffuser aux participants"""
+        failed = False
+        try:
+            async for chunk in astream(user_input, context):
+                failed = failed or isinstance(chunk, ErrorMessage)
+                with flight["condition"]:
+                    flight["chunks"].append(chunk)
+                    flight["condition"].notify_all()
+        except Exception as e:
+            failed = True
+            self.logger.error(f"Erreur génération partagée: {e}")
+            with flight["condition"]:
+                flight["chunks"].append(ErrorMessage("Je rencontre une erreur technique. Veuillez réessayer."))
+        finally:
+            with flight["condition"]:
+                flight["done"] = True
+                flight["finished_at"] = time.time()
+                flight["condition"].notify_all()
+            
+            # Une erreur n'est pas resservie: la question suivante relance une génération
+            if failed or self.linger <= 0:
+                with self.lock:
+                    if self.flights.get(key) is flight:
+                        del self.flights[key]
+            elif self.history_version:
+                # L'échange du lanceur est entré dans l'historique: un doublon arrivé après
+                # la fin voit cette version et reçoit encore la même réponse
+                history = self.history_version()
+                if history == flight["history"] + 1:
+                    with self.lock:
+                        self.flights.setdefault((key[0], history) + key[2:], flight)
+    
+    def follow(self, flight):
+        """Lire le flux d'un vol depuis le début, au rythme du lecteur"""
+        index = 0
+        while True:
+            with flight["condition"]:
+                while index >= len(flight["chunks"]) and not flight["done"]:
+                    flight["condition"].wait()
+                chunks = flight["chunks"][index:]
+                done = flight["done"]
+            
+            index += len(chunks)
+            yield from chunks
+            if done:
+                return
+    
+    def forget(self):
+        """Ne plus rattacher de requête aux vols existants (génération interrompue)
+        
+        Les participants déjà rattachés lisent leur flux jusqu'au bout
+        """
+        with self.lock:
+            self.flights.clear()
+    
+    def get_status(self):
+        """Statistiques de regroupement"""
+        with self.lock:
+            in_flight = sum(1 for flight in self.flights.values() if not flight["done"])
+        return {
+            "linger_s": self.linger,
+            "requests": self.requests,
+            "generations": self.generations,
+            "coalesced": self.coalesced,
+            "replayed": self.replayed,
+            "saved_rate": round((self.coalesced + self.replayed) / self.requests, 3) if self.requests else None,
+            "in_flight": in_flight,
+            "max_subscribers": self.max_subscribers
+        }
\ No newline at end of file
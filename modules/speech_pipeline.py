@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de synthèse vocale en streaming pour J.A.R.V.I.S.
+Chaque phrase complète est prononcée pendant que le modèle continue à générer
+"""
+
+import re
+import logging
+import time
+from modules.tracing import tracer
+
+# Fin de phrase ou de proposition suivie d'un espace
+BOUNDARY_PATTERN = re.compile(r'[.!?…;:]+["»)\]]*\s+|\n+')
+
+# Abréviations courantes qui ne terminent pas une phrase
+ABBREVIATIONS = {"m", "mm", "mme", "mlle", "dr", "etc", "ex", "cf", "env", "min", "max", "n°", "vs", "p"}
+
+class SentenceSegmenter:
+    """Découpe un flux de texte en phrases complètes"""
+    
+    def __init__(self, min_length=12, max_length=200):
+        """
+        Args:
+            min_length (int): Longueur minimale d'un segment (les segments plus courts sont regroupés)
+            max_length (int): Longueur au-delà de laquelle on coupe sur une virgule ou un espace
+        """
+        self.min_length = min_length
+        self.max_length = max_length
+        self.buffer = ""
+    
+    def is_false_boundary(self, position):
+        """Ponctuation qui ne termine pas une phrase (abréviation, sigle, numéro de liste)"""
+        if self.buffer[position] != ".":
+            return False
+        
+        words = self.buffer[:position].split()
+        if not words:
+            return True
+        
+        word = words[-1].lower()
+        return (word in ABBREVIATIONS or word.isdigit() or "." in word
+                or (len(word) == 1 and word.isalpha()))
+    
+    def find_boundary(self):
+        """Position de fin du prochain segment complet, ou None"""
+        for match in BOUNDARY_PATTERN.finditer(self.buffer):
+            if match.end() < self.min_length or self.is_false_boundary(match.start()):
+                continue
+            return match.end()
+        
+        # Proposition trop longue: couper sur une virgule, sinon sur un espace
+        if len(self.buffer) > self.max_length:
+            cut = self.buffer.rfind(", ", self.min_length, self.max_length)
+            if cut == -1:
+                cut = self.buffer.rfind(" ", self.min_length, self.max_length)
+            if cut != -1:
+                return cut + 1
+        
+        return None
+    
+    def feed(self, text):
+        """Ajouter du texte et récupérer les phrases complètes"""
+        self.buffer += text
+        sentences = []
+        
+        cut = self.find_boundary()
+        while cut is not None:
+            sentence = self.buffer[:cut].strip()
+            self.buffer = self.buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+            cut = self.find_boundary()
+        
+        return sentences
+    
+    def flush(self):
+        """Récupérer le texte restant en fin de flux"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest
+
+class StreamingSpeechPipeline:
+    """Relie un flux de texte (LLM) à la synthèse vocale, phrase par phrase"""
+    
+    def __init__(self, speak_func, min_length=12, max_length=200):
+        """
+        Args:
+            speak_func (callable): speak_func(texte, on_start=callback) met un segment
+                en file de lecture et rend la main immédiatement
+        """
+        self.logger = logging.getLogger(__name__)
+        self.speak_func = speak_func
+        self.min_length = min_length
+        self.max_length = max_length
+        
+        # Métriques des dernières réponses
+        self.metrics = []
+        self.max_metrics = 50
+    
+    def speak_stream(self, chunks):
+        """Prononcer un flux de texte au fil de sa génération
+        
+        Returns:
+            str: Texte complet de la réponse
+        """
+        start = time.perf_counter()
+        metrics = {
+            "time_to_first_token_ms": None,
+            "time_to_first_audio_ms": None,
+            "generation_ms": None,
+            "clauses": 0
+        }
+        
+        def elapsed_ms():
+            return round((time.perf_counter() - start) * 1000, 1)
+        
+        def on_start():
+            # Appelé par le thread de lecture au début du premier segment
+            if metrics["time_to_first_audio_ms"] is None:
+                metrics["time_to_first_audio_ms"] = elapsed_ms()
+                tracer.instant("pipeline.first_audio")
+                print(f"⏱️ Premier audio en {metrics['time_to_first_audio_ms']:.0f} ms "
+                      f"(premier token: {metrics['time_to_first_token_ms']:.0f} ms)")
+                self.logger.info(f"Métriques streaming vocal: {metrics}")
+        
+        segmenter = SentenceSegmenter(self.min_length, self.max_length)
+        parts = []
+        
+        for chunk in chunks:
+            if metrics["time_to_first_token_ms"] is None:
+                metrics["time_to_first_token_ms"] = elapsed_ms()
+                tracer.instant("pipeline.first_token")
+            parts.append(chunk)
+            
+            for sentence in segmenter.feed(chunk):
+                self.speak_func(sentence, on_start=on_start)
+                metrics["clauses"] += 1
+        
+        rest = segmenter.flush()
+        if rest:
+            self.speak_func(rest, on_start=on_start)
+            metrics["clauses"] += 1
+        
+        metrics["generation_ms"] = elapsed_ms()
+        self.metrics.append(metrics)
+        if len(self.metrics) > self.max_metrics:
+            self.metrics.pop(0)
+        
+        return "".join(parts)
+    
+    def get_status(self):
+        """Obtenir les métriques du pipeline"""
+        first_audio = sorted(m["time_to_first_audio_ms"] for m in self.metrics if m["time_to_first_audio_ms"] is not None)
+        return {
+            "responses": len(self.metrics),
+            "last": self.metrics[-1] if self.metrics else None,
+            "median_time_to_first_audio_ms": first_audio[len(first_audio) // 2] if first_audio else None
+        }
\ No newline at end of file
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File de sortie vocale pour J.A.R.V.I.S.
+Un thread dédié prononce les messages par priorité; speak() rend la main immédiatement
+"""
+
+import itertools
+import logging
+import queue
+import threading
+from modules.tracing import tracer
+
+# Priorités (plus petit = plus urgent)
+PRIORITY_ALERT = 0
+PRIORITY_SYSTEM = 1
+PRIORITY_CHAT = 2
+
+class SpeechOutputQueue:
+    def __init__(self, voice_manager):
+        """Initialisation de la file de sortie vocale"""
+        self.logger = logging.getLogger(__name__)
+        self.voice_manager = voice_manager
+        
+        # Éléments: (priorité, numéro d'ordre, message)
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        
+        # Message en cours de lecture
+        self.current_item = None
+        self.idle = threading.Event()
+        self.idle.set()
+        
+        self.worker = None
+        self.running = False
+        
+        # Statistiques
+        self.spoken_count = 0
+        self.dropped_count = 0
+    
+    def start(self):
+        """Démarrer le thread de lecture"""
+        if self.running:
+            return
+        
+        self.running = True
+        self.worker = threading.Thread(target=self.playback_loop, daemon=True, name="jarvis-speech")
+        self.worker.start()
+        self.logger.info("File de sortie vocale démarrée")
+    
+    def enqueue(self, text, voice="William", priority=PRIORITY_CHAT, on_start=None, on_done=None):
+        """Ajouter un message à prononcer (retour immédiat)"""
+        if not text or not text.strip():
+            return None
+        
+        item = {
+            "text": text,
+            "voice": voice,
+            "priority": priority,
+            "on_start": on_start,
+            "on_done": on_done,
+            # La trace de la commande reste ouverte jusqu'à la fin de la lecture
+            "trace": tracer.current()
+        }
+        tracer.hold(item["trace"])
+        
+        with self.lock:
+            self.idle.clear()
+            self.queue.put((priority, next(self.sequence), item))
+        
+        return item
+    
+    def playback_loop(self):
+        """Boucle du thread de lecture"""
+        while self.running:
+            priority, _, item = self.queue.get()
+            if item is None:
+                break
+            
+            self.current_item = item
+            try:
+                with tracer.use(item["trace"]), tracer.span("tts", chars=len(item["text"])):
+                    self.voice_manager.speak(item["text"], voice=item["voice"], on_start=item["on_start"])
+                self.spoken_count += 1
+            except Exception as e:
+                self.logger.error(f"Erreur lecture vocale: {e}")
+            finally:
+                self.current_item = None
+                tracer.release(item["trace"])
+            
+            if item["on_done"]:
+                try:
+                    item["on_done"]()
+                except Exception as e:
+                    self.logger.error(f"Erreur rappel fin de lecture: {e}")
+            
+            with self.lock:
+                if self.queue.empty():
+                    self.idle.set()
+    
+    def flush(self, min_priority=PRIORITY_ALERT):
+        """Retirer les messages en attente de priorité >= min_priority
+        
+        Par défaut toute la file est vidée; flush(PRIORITY_CHAT) ne retire
+        que les réponses conversationnelles et conserve les alertes.
+        """
+        kept = []
+        dropped = 0
+        
+        with self.lock:
+            while True:
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if entry[2] is not None and entry[0] >= min_priority:
+                    tracer.release(entry[2]["trace"])
+                    dropped += 1
+                else:
+                    kept.append(entry)
+            
+            for entry in kept:
+                self.queue.put(entry)
+            
+            if self.queue.empty() and self.current_item is None:
+                self.idle.set()
+        
+        self.dropped_count += dropped
+        if dropped:
+            self.logger.info(f"{dropped} message(s) vocal(aux) retiré(s) de la file")
+        return dropped
+    
+    def cancel(self, min_priority=PRIORITY_ALERT):
+        """Vider la file et interrompre le message en cours"""
+        dropped = self.flush(min_priority)
+        
+        current = self.current_item
+        if current is not None and current["priority"] >= min_priority:
+            self.voice_manager.stop()
+        
+        return dropped
+    
+    def is_speaking(self):
+        """Vérifier si un message est en cours de lecture ou en attente"""
+        return not self.idle.is_set()
+    
+    def wait_until_idle(self, timeout=None):
+        """Attendre la fin de la lecture de tous les messages"""
+        return self.idle.wait(timeout)
+    
+    def stop(self):
+        """Arrêter le thread de lecture"""
+        if not self.running:
+            return
+        
+        self.running = False
+        self.queue.put((-1, next(self.sequence), None))
+    
+    def get_status(self):
+        """Obtenir le statut de la file"""
+        current = self.current_item
+        return {
+            "running": self.running,
+            "speaking": current["text"][:50] if current else None,
+            "pending": self.queue.qsize(),
+            "spoken": self.spoken_count,
+            "dropped": self.dropped_count
+        }
\ No newline at end of file
@@ -11,6 +11,8 @@ import threading
 import queue
 import time
 from pathlib import Path
+from modules.tracing import tracer
+from modules.capability_probe import capabilities
 
 class SpeechRecognitionModule:
     def __init__(self, config):
@@ -38,8 +40,8 @@ class SpeechRecognitionModule:
     def setup_microphone(self):
         """Configuration du microphone"""
         try:
-            # Obtenir la liste des microphones
-            mic_list = sr.Microphone.list_microphone_names()
+            # Liste des microphones issue de la détection partagée (en cache)
+            mic_list = capabilities.get("microphones").get("names", [])
             self.logger.info(f"Microphones disponibles: {mic_list}")
             
             # Utiliser le microphone par défaut
@@ -59,22 +61,37 @@ class SpeechRecognitionModule:
         except Exception as e:
             self.logger.error(f"Erreur lors de la configuration du microphone: {e}")
             self.microphone = None
+            # Périphériques changés depuis la détection: nouvelle liste au prochain démarrage
+            capabilities.invalidate("microphones")
     
-    def listen_continuously(self):
+    def listen_continuously(self, on_command=None):
         """Écoute continue en arrière-plan"""
         def callback(recognizer, audio):
+            # La trace de la commande commence à la capture micro (durée de l'extrait audio)
+            captured_at = time.perf_counter()
+            trace = tracer.begin("voice")
+            duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+            tracer.add_span("mic_capture", captured_at - duration, captured_at)
             try:
                 # Reconnaissance vocale avec support des accents
-                text = recognizer.recognize_google(audio, language=self.language)
+                with tracer.span("speech_recognition"):
+                    text = recognizer.recognize_google(audio, language=self.language)
                 # Nettoyer et normaliser les accents
                 text = self.normalize_french_text(text)
-                self.audio_queue.put(text)
+                if on_command:
+                    on_command(text)
+                else:
+                    self.audio_queue.put(text)
                 self.logger.info(f"Audio détecté: {text}")
             except sr.UnknownValueError:
                 # Pas de parole détectée
-                pass
+                tracer.discard(trace)
             except sr.RequestError as e:
+                tracer.discard(trace)
                 self.logger.error(f"Erreur de reconnaissance vocale: {e}")
+            finally:
+                # La trace suit la commande via le noyau événementiel
+                tracer.detach()
         
         # Démarrer l'écoute continue
         self.stop_listening = self.recognizer.listen_in_background(
@@ -132,10 +149,10 @@ class SpeechRecognitionModule:
             pass
         return commands
     
-    def start_continuous_listening(self):
+    def start_continuous_listening(self, on_command=None):
         """Démarrer l'écoute continue"""
         if not self.listening and self.microphone:
-            thread = threading.Thread(target=self.listen_continuously, daemon=True)
+            thread = threading.Thread(target=self.listen_continuously, args=(on_command,), daemon=True)
             thread.start()
     
     def stop_continuous_listening(self):
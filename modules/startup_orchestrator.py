@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orchestrateur de démarrage pour J.A.R.V.I.S.
+Initialise les modules indépendants en parallèle et produit une chronologie
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+class StartupOrchestrator:
+    def __init__(self, max_workers=4, report_dir="logs"):
+        """Initialisation de l'orchestrateur"""
+        self.logger = logging.getLogger(__name__)
+        
+        self.max_workers = max_workers
+        self.report_dir = Path(report_dir)
+        
+        # Tâches déclarées, dans l'ordre d'ajout
+        self.tasks = {}
+        
+        # Résultats et chronologie
+        self.results = {}
+        self.errors = {}
+        self.timeline = []
+        self.started_at = None
+        self.total_duration = None
+    
+    def add_task(self, name, func, depends_on=None, main_thread=False):
+        """Déclarer une tâche d'initialisation
+        
+        Args:
+            name (str): Nom de la tâche
+            func (callable): Fonction d'initialisation (reçoit les résultats des dépendances)
+            depends_on (list): Noms des tâches devant se terminer avant celle-ci
+            main_thread (bool): Exécuter dans le thread appelant (ressources liées au thread)
+        """
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self.tasks:
+                raise ValueError(f"Dépendance inconnue pour {name}: {dependency}")
+        
+        self.tasks[name] = {
+            "func": func,
+            "depends_on": depends_on,
+            "main_thread": main_thread
+        }
+    
+    def run_task(self, name):
+        """Exécuter une tâche en mesurant sa durée"""
+        task = self.tasks[name]
+        start = time.perf_counter()
+        status = "ok"
+        error = None
+        
+        try:
+            if task["depends_on"]:
+                dependencies = {dependency: self.results.get(dependency) for dependency in task["depends_on"]}
+                result = task["func"](dependencies)
+            else:
+                result = task["func"]()
+            self.results[name] = result
+        except Exception as e:
+            status = "error"
+            error = str(e)
+            self.errors[name] = e
+            self.logger.error(f"Échec de l'initialisation {name}: {e}")
+        
+        end = time.perf_counter()
+        self.timeline.append({
+            "name": name,
+            "thread": threading.current_thread().name,
+            "depends_on": task["depends_on"],
+            "start_ms": round((start - self.started_at) * 1000, 1),
+            "end_ms": round((end - self.started_at) * 1000, 1),
+            "duration_ms": round((end - start) * 1000, 1),
+            "status": status,
+            "error": error
+        })
+    
+    def record_skipped(self, name, reason):
+        """Enregistrer une tâche non exécutée"""
+        now_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+        self.timeline.append({
+            "name": name,
+            "thread": None,
+            "depends_on": self.tasks[name]["depends_on"],
+            "start_ms": now_ms,
+            "end_ms": now_ms,
+            "duration_ms": 0.0,
+            "status": "skipped",
+            "error": reason
+        })
+    
+    def run(self):
+        """Exécuter toutes les tâches en respectant les dépendances"""
+        self.started_at = time.perf_counter()
+        pending = dict(self.tasks)
+        done = set()
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jarvis-startup") as executor:
+            while pending or running:
+                # Tâches dont une dépendance a échoué
+                for name in [n for n, t in pending.items() if any(d in self.errors for d in t["depends_on"])]:
+                    failed = [d for d in pending[name]["depends_on"] if d in self.errors]
+                    self.errors[name] = RuntimeError(f"Dépendance en échec: {', '.join(failed)}")
+                    self.record_skipped(name, str(self.errors[name]))
+                    done.add(name)
+                    del pending[name]
+                
+                ready = [n for n, t in pending.items() if all(d in done for d in t["depends_on"])]
+                
+                # Lancer les tâches prêtes dans le pool
+                for name in [n for n in ready if not pending[n]["main_thread"]]:
+                    running[executor.submit(self.run_task, name)] = name
+                    del pending[name]
+                
+                # Exécuter une tâche liée au thread principal pendant que le pool travaille
+                main_ready = [n for n in ready if n in pending]
+                if main_ready:
+                    name = main_ready[0]
+                    del pending[name]
+                    self.run_task(name)
+                    done.add(name)
+                    continue
+                
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Dépendances impossibles à résoudre: {list(pending)}")
+                    break
+                
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+        
+        self.total_duration = time.perf_counter() - self.started_at
+        self.timeline.sort(key=lambda entry: entry["start_ms"])
+        self.logger.info(f"Démarrage terminé en {self.total_duration:.2f}s ({len(self.tasks)} modules)")
+        
+        return self.results
+    
+    def raise_first_error(self):
+        """Relancer la première erreur d'initialisation rencontrée"""
+        for entry in self.timeline:
+            if entry["status"] == "error":
+                raise self.errors[entry["name"]]
+    
+    def format_timeline(self, width=40):
+        """Chronologie lisible avec barres proportionnelles"""
+        total_ms = max((entry["end_ms"] for entry in self.timeline), default=0) or 1
+        lines = [
+            f"Chronologie de démarrage J.A.R.V.I.S. - {datetime.now().isoformat(timespec='seconds')}",
+            f"Durée totale: {total_ms:.0f} ms | Somme des modules: {sum(e['duration_ms'] for e in self.timeline):.0f} ms",
+            ""
+        ]
+        
+        name_width = max((len(entry["name"]) for entry in self.timeline), default=10)
+        for entry in self.timeline:
+            offset = int(entry["start_ms"] / total_ms * width)
+            length = max(1, int(entry["duration_ms"] / total_ms * width))
+            bar = (" " * offset + "#" * length)[:width]
+            status = "" if entry["status"] == "ok" else f" [{entry['status']}]"
+            lines.append(
+                f"{entry['name']:<{name_width}} |{bar:<{width}}| "
+                f"{entry['start_ms']:>7.0f} -> {entry['end_ms']:>7.0f} ms ({entry['duration_ms']:.0f} ms){status}"
+            )
+        
+        return "\n".join(lines)
+    
+    def get_report(self):
+        """Rapport de démarrage au format dictionnaire"""
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "total_ms": round((self.total_duration or 0) * 1000, 1),
+            "max_workers": self.max_workers,
+            "modules": self.timeline
+        }
+    
+    def write_report(self):
+        """Écrire la chronologie en texte et en JSON"""
+        try:
+            self.report_dir.mkdir(parents=True, exist_ok=True)
+            
+            with open(self.report_dir / "startup_timeline.json", 'w', encoding='utf-8') as f:
+                json.dump(self.get_report(), f, indent=2, ensure_ascii=False)
+            
+            with open(self.report_dir / "startup_timeline.txt", 'w', encoding='utf-8') as f:
+                f.write(self.format_timeline() + "\n")
+            
+            self.logger.info(f"Chronologie de démarrage écrite dans {self.report_dir}")
+        
+        except Exception as e:
+            self.logger.error(f"Erreur écriture chronologie de démarrage: {e}")
\ No newline at end of file
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Traçage de latence pour J.A.R.V.I.S.
+Chaque commande reçoit un identifiant de trace; les étapes (micro, reconnaissance,
+routage, contexte, génération, synthèse vocale) sont enregistrées comme des spans
+au format Chrome trace (chrome://tracing, Perfetto)
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# Trace de la commande en cours dans le thread / contexte courant
+current_trace = contextvars.ContextVar("jarvis_trace", default=None)
+
+class Tracer:
+    def __init__(self, trace_dir="logs/traces", max_file_mb=5, backup_count=3):
+        """Initialisation du traceur"""
+        self.logger = logging.getLogger(__name__)
+        self.enabled = True
+        self.trace_dir = Path(trace_dir)
+        self.max_file_bytes = int(max_file_mb * 1024 * 1024)
+        self.backup_count = backup_count
+        
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.named_threads = set()
+        
+        # Durées par étape sur la session (en ms)
+        self.stage_durations = {}
+        self.total_durations = []
+        self.max_samples = 500
+        self.trace_count = 0
+    
+    def configure(self, config):
+        """Appliquer la section "tracing" de la configuration"""
+        self.enabled = config.get("enabled", True)
+        self.trace_dir = Path(config.get("directory", str(self.trace_dir)))
+        self.max_file_bytes = int(config.get("max_file_mb", self.max_file_bytes / (1024 * 1024)) * 1024 * 1024)
+        self.backup_count = config.get("backup_count", self.backup_count)
+    
+    def current(self):
+        """Trace active dans le contexte courant (ou None)"""
+        return current_trace.get()
+    
+    def begin(self, name, **args):
+        """Démarrer une trace et l'activer dans le contexte courant"""
+        trace = {
+            "id": uuid.uuid4().hex[:8],
+            "name": name,
+            "args": args,
+            "start": time.perf_counter(),
+            "end": None,
+            "spans": [],
+            "pending": 0,
+            "closed": False,
+            "closed_at": None,
+            "flushed": False
+        }
+        current_trace.set(trace)
+        return trace
+    
+    def detach(self):
+        """Désactiver la trace du contexte courant sans la terminer"""
+        current_trace.set(None)
+    
+    def discard(self, trace):
+        """Abandonner une trace (ex: aucune parole reconnue)"""
+        trace["flushed"] = True
+        if current_trace.get() is trace:
+            current_trace.set(None)
+    
+    @contextmanager
+    def command_trace(self, command, source="command"):
+        """Tracer une commande de bout en bout (reprend la trace vocale si elle existe)"""
+        if not self.enabled:
+            yield None
+            return
+        
+        trace = current_trace.get()
+        if trace is None or trace["closed"]:
+            trace = self.begin(source)
+        trace["args"]["command"] = command[:60]
+        
+        try:
+            yield trace
+        finally:
+            self.finish(trace)
+    
+    @contextmanager
+    def use(self, trace):
+        """Activer une trace existante dans le thread courant (ex: thread de lecture)"""
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            current_trace.reset(token)
+    
+    @contextmanager
+    def span(self, name, **args):
+        """Mesurer une étape de la trace courante (sans effet hors trace)"""
+        trace = current_trace.get()
+        if trace is None or not self.enabled:
+            yield args
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add_span(name, start, time.perf_counter(), trace=trace, **args)
+    
+    def add_span(self, name, start, end, trace=None, instant=False, **args):
+        """Enregistrer une étape déjà mesurée (horodatages perf_counter)"""
+        trace = trace or current_trace.get()
+        if trace is None or trace["flushed"] or not self.enabled:
+            return
+        
+        thread = threading.current_thread()
+        with self.lock:
+            trace["spans"].append({
+                "name": name,
+                "start": start,
+                "end": end,
+                "tid": thread.native_id,
+                "thread": thread.name,
+                "instant": instant,
+                "args": args
+            })
+    
+    def instant(self, name, **args):
+        """Marquer un instant dans la trace courante (ex: premier token)"""
+        now = time.perf_counter()
+        self.add_span(name, now, now, instant=True, **args)
+    
+    def hold(self, trace):
+        """Retarder la fin d'une trace (ex: réponse encore en file de lecture)"""
+        if trace is None:
+            return
+        with self.lock:
+            trace["pending"] += 1
+    
+    def release(self, trace):
+        """Libérer une étape différée; la trace est écrite quand tout est terminé"""
+        if trace is None:
+            return
+        with self.lock:
+            trace["pending"] -= 1
+            ready = trace["closed"] and trace["pending"] <= 0 and not trace["flushed"]
+            if ready:
+                trace["flushed"] = True
+        if ready:
+            self.flush(trace)
+    
+    def finish(self, trace):
+        """Terminer le traitement d'une commande"""
+        if current_trace.get() is trace:
+            current_trace.set(None)
+        
+        with self.lock:
+            trace["closed"] = True
+            trace["closed_at"] = time.perf_counter()
+            ready = trace["pending"] <= 0 and not trace["flushed"]
+            if ready:
+                trace["flushed"] = True
+        if ready:
+            self.flush(trace)
+    
+    def flush(self, trace):
+        """Écrire la trace et afficher le résumé par étape"""
+        # Les étapes mesurées a posteriori (capture micro) peuvent précéder la trace
+        trace["start"] = min([trace["start"]] + [span["start"] for span in trace["spans"]])
+        trace["end"] = max([trace["closed_at"]] + [span["end"] for span in trace["spans"]])
+        total_ms = (trace["end"] - trace["start"]) * 1000
+        
+        # Durée cumulée par étape, dans l'ordre d'apparition
+        stages = {}
+        for span in trace["spans"]:
+            if span["instant"]:
+                continue
+            stages[span["name"]] = stages.get(span["name"], 0.0) + (span["end"] - span["start"]) * 1000
+        
+        with self.lock:
+            self.trace_count += 1
+            self.record_sample(self.total_durations, total_ms)
+            for name, duration in stages.items():
+                self.record_sample(self.stage_durations.setdefault(name, []), duration)
+            p50, p95 = self.percentiles(self.total_durations)
+        
+        breakdown = " | ".join(f"{name} {duration:.0f}" for name, duration in stages.items())
+        summary = (f"⏱️ [{trace['id']}] {total_ms:.0f} ms | {breakdown} "
+                   f"| session p50 {p50:.0f} ms / p95 {p95:.0f} ms ({self.trace_count} commandes)")
+        print(summary)
+        self.logger.info(summary)
+        
+        self.write_events(self.build_events(trace))
+    
+    def record_sample(self, samples, value):
+        """Ajouter une mesure en conservant les max_samples dernières"""
+        samples.append(value)
+        if len(samples) > self.max_samples:
+            samples.pop(0)
+    
+    def percentiles(self, samples):
+        """p50 et p95 d'une liste de durées"""
+        if not samples:
+            return 0.0, 0.0
+        ordered = sorted(samples)
+        return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    
+    def to_us(self, timestamp):
+        """Horodatage perf_counter -> microsecondes depuis le démarrage"""
+        return round((timestamp - self.origin) * 1_000_000, 1)
+    
+    def build_events(self, trace):
+        """Convertir une trace en événements Chrome trace"""
+        events = []
+        
+        for span in trace["spans"]:
+            if span["tid"] not in self.named_threads:
+                self.named_threads.add(span["tid"])
+                events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": span["tid"],
+                               "args": {"name": span["thread"]}})
+        
+        first_tid = trace["spans"][0]["tid"] if trace["spans"] else threading.current_thread().native_id
+        events.append({
+            "name": f"{trace['name']}: {trace['args'].get('command', '')}",
+            "cat": "command",
+            "ph": "X",
+            "ts": self.to_us(trace["start"]),
+            "dur": self.to_us(trace["end"]) - self.to_us(trace["start"]),
+            "pid": self.pid,
+            "tid": first_tid,
+            "args": {"trace_id": trace["id"], **trace["args"]}
+        })
+        
+        for span in trace["spans"]:
+            event = {
+                "name": span["name"],
+                "cat": "stage",
+                "ph": "i" if span["instant"] else "X",
+                "ts": self.to_us(span["start"]),
+                "pid": self.pid,
+                "tid": span["tid"],
+                "args": {"trace_id": trace["id"], **span["args"]}
+            }
+            if span["instant"]:
+                event["s"] = "t"
+            else:
+                event["dur"] = self.to_us(span["end"]) - self.to_us(span["start"])
+            events.append(event)
+        
+        return events
+    
+    def write_events(self, events):
+        """Ajouter des événements au fichier de trace (rotation par taille)"""
+        try:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            path = self.trace_dir / "jarvis_trace.json"
+            
+            with self.lock:
+                if path.exists() and path.stat().st_size >= self.max_file_bytes:
+                    self.rotate(path)
+                
+                # Format tableau JSON: le "]" final est facultatif pour Chrome/Perfetto
+                new_file = not path.exists() or path.stat().st_size == 0
+                with open(path, "a", encoding="utf-8") as f:
+                    if new_file:
+                        f.write("[\n")
+                    for event in events:
+                        f.write(json.dumps(event, ensure_ascii=False) + ",\n")
+        
+        except Exception as e:
+            self.logger.error(f"Erreur écriture trace: {e}")
+    
+    def rotate(self, path):
+        """Décaler les fichiers de trace (jarvis_trace.json.1, .2...)"""
+        for index in range(self.backup_count - 1, 0, -1):
+            source = path.with_name(f"{path.name}.{index}")
+            if source.exists():
+                source.replace(path.with_name(f"{path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            path.replace(path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink()
+        # Les métadonnées de threads doivent être réécrites dans le nouveau fichier
+        self.named_threads = set()
+    
+    def get_status(self):
+        """Statistiques de latence par étape sur la session"""
+        stages = {}
+        for name, samples in list(self.stage_durations.items()):
+            p50, p95 = self.percentiles(samples)
+            stages[name] = {"p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "count": len(samples)}
+        
+        p50, p95 = self.percentiles(self.total_durations)
+        return {
+            "enabled": self.enabled,
+            "commands": self.trace_count,
+            "p50_ms": round(p50, 1),
+            "p95_ms": round(p95, 1),
+            "stages": stages,
+            "trace_file": str(self.trace_dir / "jarvis_trace.json")
+        }
+
+# Traceur partagé par tous les modules
+tracer = Tracer()
\ No newline at end of file
@@ -8,23 +8,43 @@ Gère la synthèse vocale avec Tortoise TTS et Windows TTS
 import os
 import sys
 import logging
+import queue
+import threading
+import importlib.util
 import pygame
 import pyttsx3
-import torch
 from pathlib import Path
 import json
 import numpy as np
 from io import BytesIO
+from modules.tracing import tracer
+from modules.capability_probe import capabilities
 
-# Import Tortoise TTS
-try:
-    from tortoise.api import TextToSpeech
-    from tortoise.utils.audio import load_voice
-    TORTOISE_AVAILABLE = True
-except ImportError:
-    TORTOISE_AVAILABLE = False
+# Tortoise TTS (et torch) ne sont importés qu'au premier usage de la voix William
+TextToSpeech = None
+load_voice = None
+TORTOISE_AVAILABLE = importlib.util.find_spec("tortoise") is not None
+if not TORTOISE_AVAILABLE:
     logging.warning("Tortoise TTS non disponible. Utilisation de Windows TTS uniquement.")
 
+def load_tortoise_modules():
+    """Importer Tortoise TTS à la demande"""
+    global TextToSpeech, load_voice, TORTOISE_AVAILABLE
+    
+    if TextToSpeech is not None:
+        return True
+    
+    try:
+        from tortoise.api import TextToSpeech as tortoise_tts_class
+        from tortoise.utils.audio import load_voice as tortoise_load_voice
+        TextToSpeech = tortoise_tts_class
+        load_voice = tortoise_load_voice
+        return True
+    except ImportError:
+        TORTOISE_AVAILABLE = False
+        logging.warning("Tortoise TTS non disponible. Utilisation de Windows TTS uniquement.")
+        return False
+
 class VoiceManager:
     def __init__(self, config):
         """Initialisation du gestionnaire vocal"""
@@ -34,18 +54,66 @@ class VoiceManager:
         # Initialisation pygame pour la lecture audio
         pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
         
-        # Initialisation Windows TTS
-        self.windows_tts = pyttsx3.init()
-        self.setup_windows_voice()
+        # Windows TTS: le moteur pyttsx3 (SAPI5/COM) est créé et utilisé par un seul thread
+        self.windows_tts = None
+        self.windows_requests = queue.Queue()
+        self.stop_generation = 0
+        self.windows_generation = 0
+        self.windows_thread = threading.Thread(target=self.windows_tts_loop, daemon=True, name="jarvis-windows-tts")
+        self.windows_thread.start()
         
-        # Initialisation Tortoise TTS
+        # Tortoise TTS chargé au premier usage de la voix William
         self.tortoise_tts = None
         self.william_voice = None
-        if TORTOISE_AVAILABLE:
-            self.setup_tortoise_tts()
+        self.tortoise_state = "unloaded"  # unloaded, loading, ready, failed
+        self.tortoise_lock = threading.Lock()
         
         self.logger.info("VoiceManager initialisé")
     
+    def windows_tts_loop(self):
+        """Thread propriétaire du moteur pyttsx3: toutes les lectures Windows passent par lui"""
+        try:
+            # COM doit être initialisé dans chaque thread qui l'utilise (SAPI5)
+            try:
+                import comtypes
+                comtypes.CoInitialize()
+            except ImportError:
+                pass
+            
+            self.windows_tts = pyttsx3.init()
+            self.windows_tts.connect("started-word", self.on_windows_word)
+            self.setup_windows_voice()
+        except Exception as e:
+            self.logger.error(f"Erreur initialisation Windows TTS: {e}")
+        
+        while True:
+            request = self.windows_requests.get()
+            if request is None:
+                break
+            
+            text, on_start, generation, done = request
+            try:
+                # Message annulé avant son tour
+                if generation < self.stop_generation:
+                    continue
+                if self.windows_tts is None:
+                    raise RuntimeError("moteur non initialisé")
+                
+                self.windows_generation = generation
+                if on_start:
+                    on_start()
+                self.windows_tts.say(text)
+                self.windows_tts.runAndWait()
+            except Exception as e:
+                self.logger.error(f"Erreur Windows TTS: {e}")
+            finally:
+                done.set()
+    
+    def on_windows_word(self, name, location, length):
+        """Rappel pyttsx3 (thread du moteur): arrêter la lecture annulée entre deux mots"""
+        if self.windows_generation < self.stop_generation:
+            self.windows_tts.stop()
+    
     def setup_windows_voice(self):
         """Configuration de la voix Windows"""
         voices = self.windows_tts.getProperty('voices')
@@ -75,11 +143,26 @@ class VoiceManager:
         self.windows_tts.setProperty('rate', 180)  # Vitesse de parole
         self.windows_tts.setProperty('volume', 0.9)  # Volume
     
+    def ensure_tortoise_loading(self):
+        """Lancer le chargement de Tortoise TTS en arrière-plan si nécessaire"""
+        with self.tortoise_lock:
+            if self.tortoise_state != "unloaded" or not TORTOISE_AVAILABLE:
+                return self.tortoise_state == "ready"
+            self.tortoise_state = "loading"
+        
+        threading.Thread(target=self.setup_tortoise_tts, daemon=True).start()
+        return False
+    
     def setup_tortoise_tts(self):
         """Configuration de Tortoise TTS avec la voix William - optimisé CUDA"""
+        global TORTOISE_AVAILABLE
         try:
-            # Configuration CUDA si disponible
-            device = "cuda" if torch.cuda.is_available() else "cpu"
+            if not load_tortoise_modules():
+                self.tortoise_state = "failed"
+                return
+            
+            # Configuration CUDA si disponible (détection partagée, en cache)
+            device = "cuda" if capabilities.get("cuda")["available"] else "cpu"
             self.logger.info(f"Utilisation de {device} pour Tortoise TTS")
             
             # Initialisation avec optimisations
@@ -94,10 +177,12 @@ class VoiceManager:
             else:
                 self.logger.warning(f"Voix William non trouvée à: {william_path}")
                 self.download_william_voice()
+            
+            self.tortoise_state = "ready"
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de l'initialisation de Tortoise TTS: {e}")
-            global TORTOISE_AVAILABLE
+            self.tortoise_state = "failed"
             TORTOISE_AVAILABLE = False
     
     def download_william_voice(self):
@@ -166,7 +251,7 @@ class VoiceManager:
         
         self.logger.info("Configuration voix William fallback créée")
     
-    def speak_with_tortoise(self, text):
+    def speak_with_tortoise(self, text, on_start=None):
         """Synthèse vocale avec Tortoise TTS (voix William) - optimisé"""
         try:
             if not self.tortoise_tts or not self.william_voice:
@@ -177,12 +262,13 @@ class VoiceManager:
                 text = text[:200] + "..."
             
             # Génération audio avec Tortoise - preset ultra_fast pour rapidité
-            gen = self.tortoise_tts.tts_with_preset(
-                text, 
-                voice_samples=self.william_voice, 
-                preset='ultra_fast',  # Plus rapide
-                cvvp_amount=0.0,      # Désactiver CVVP pour gain de vitesse
-            )
+            with tracer.span("tts.tortoise_synthesis", chars=len(text)):
+                gen = self.tortoise_tts.tts_with_preset(
+                    text, 
+                    voice_samples=self.william_voice, 
+                    preset='ultra_fast',  # Plus rapide
+                    cvvp_amount=0.0,      # Désactiver CVVP pour gain de vitesse
+                )
             
             # Optimisation: traitement direct en numpy
             if hasattr(gen, 'cpu'):
@@ -200,6 +286,8 @@ class VoiceManager:
             
             # Lecture avec pygame
             sound = pygame.sndarray.make_sound(audio_data)
+            if on_start:
+                on_start()
             sound.play()
             
             # Attendre la fin de la lecture
@@ -209,18 +297,23 @@ class VoiceManager:
         except Exception as e:
             self.logger.error(f"Erreur Tortoise TTS: {e}")
             # Fallback vers Windows TTS
-            self.speak_with_windows(text)
+            self.speak_with_windows(text, on_start)
     
-    def speak_with_windows(self, text):
-        """Synthèse vocale avec Windows TTS"""
-        try:
-            self.windows_tts.say(text)
-            self.windows_tts.runAndWait()
-        except Exception as e:
-            self.logger.error(f"Erreur Windows TTS: {e}")
+    def speak_with_windows(self, text, on_start=None):
+        """Synthèse vocale avec Windows TTS (exécutée par le thread du moteur)"""
+        if not self.windows_thread.is_alive():
+            self.logger.error("Erreur Windows TTS: thread du moteur arrêté")
+            return
+        
+        done = threading.Event()
+        self.windows_requests.put((text, on_start, self.stop_generation, done))
+        done.wait()
     
-    def speak(self, text, voice="William"):
-        """Interface principale pour la synthèse vocale - WILLIAM PAR DÉFAUT"""
+    def speak(self, text, voice="William", on_start=None):
+        """Interface principale pour la synthèse vocale - WILLIAM PAR DÉFAUT
+        
+        on_start est appelé juste avant le début de la lecture audio.
+        """
         if not text.strip():
             return
         
@@ -231,23 +324,25 @@ class VoiceManager:
         
         try:
             # PRIORITÉ À TORTOISE WILLIAM - changement de logique
+            # (Windows TTS assure l'intérim pendant le chargement de Tortoise)
             use_tortoise = (
                 voice == "William" and 
                 TORTOISE_AVAILABLE and 
-                self.william_voice and
-                not self.config.get("voice", {}).get("force_windows", False)
+                not self.config.get("voice", {}).get("force_windows", False) and
+                self.ensure_tortoise_loading() and
+                self.william_voice
             )
             
             if use_tortoise:
                 # Essayer Tortoise d'abord
                 try:
-                    self.speak_with_tortoise(text)
+                    self.speak_with_tortoise(text, on_start)
                     return  # Succès, pas de fallback
                 except Exception as e:
                     self.logger.warning(f"Tortoise TTS échoué, fallback Windows: {e}")
             
             # Fallback vers Windows TTS
-            self.speak_with_windows(text)
+            self.speak_with_windows(text, on_start)
                     
         except Exception as e:
             self.logger.error(f"Erreur synthèse vocale: {e}")
@@ -258,11 +353,22 @@ class VoiceManager:
                 self.logger.error(f"Impossible de synthétiser la voix: {final_e}")
                 print(f"🔊 [VOICE FAILED] {text}")
     
+    def stop(self):
+        """Interrompre la lecture en cours"""
+        try:
+            pygame.mixer.stop()
+        except Exception as e:
+            self.logger.error(f"Erreur arrêt lecture pygame: {e}")
+        
+        # pyttsx3 n'est arrêté que depuis son propre thread (rappel started-word)
+        self.stop_generation += 1
+    
     def get_available_voices(self):
         """Obtenir la liste des voix disponibles"""
         voices = {"Windows": True}
         
-        if TORTOISE_AVAILABLE and self.william_voice:
+        # William reste disponible tant que le chargement différé n'a pas échoué
+        if TORTOISE_AVAILABLE and (self.william_voice or self.tortoise_state in ("unloaded", "loading")):
             voices["William"] = True
         else:
             voices["William"] = False
@@ -281,8 +387,5 @@ class VoiceManager:
         except:
             pass
         
-        try:
-            if self.windows_tts:
-                self.windows_tts.stop()
-        except:
-            pass
\ No newline at end of file
+        self.stop_generation += 1
+        self.windows_requests.put(None)
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rejeu de commandes via l'API locale de J.A.R.V.I.S.
+Envoie des commandes (arguments ou fichier, une par ligne) avec N clients
+concurrents et mesure débit et latences, sans microphone
+"""
+
+import sys
+import json
+import time
+import argparse
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+def send_command(url, command, speak=False, timeout=180):
+    """Envoyer une commande et retourner (code HTTP, données, latence ms)"""
+    data = json.dumps({"command": command, "speak": speak}).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, result = response.status, json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        status, result = e.code, json.loads(e.read().decode("utf-8") or "{}")
+    except urllib.error.URLError as e:
+        status, result = 0, {"error": str(e.reason)}
+    return status, result, (time.perf_counter() - start) * 1000
+
+def percentile(values, ratio):
+    """Percentile simple d'une liste de durées"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] if ordered else 0.0
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Rejouer des commandes via l'API locale de J.A.R.V.I.S.")
+    parser.add_argument("commands", nargs="*", help="Commandes à envoyer")
+    parser.add_argument("-f", "--file", help="Fichier de commandes (une par ligne)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="Clients concurrents")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Nombre de passes")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/command", help="Adresse de l'API")
+    parser.add_argument("--speak", action="store_true", help="Prononcer les réponses")
+    args = parser.parse_args()
+    
+    commands = list(args.commands)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            commands.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    
+    if not commands:
+        parser.error("aucune commande à envoyer")
+    
+    workload = commands * args.repeat
+    print(f"📤 {len(workload)} commande(s), {args.concurrency} client(s) -> {args.url}")
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda command: (command, *send_command(args.url, command, args.speak)), workload))
+    elapsed = time.perf_counter() - start
+    
+    latencies = []
+    errors = 0
+    for command, status, result, latency_ms in results:
+        if status == 200:
+            latencies.append(latency_ms)
+            print(f"✅ {latency_ms:7.0f} ms | {command[:40]:<40} | {str(result.get('response'))[:60]}")
+        else:
+            errors += 1
+            print(f"❌ {status} | {command[:40]:<40} | {result.get('error')}")
+    
+    print("=" * 60)
+    print(f"Débit: {len(latencies) / elapsed:.2f} commandes/s ({elapsed:.1f} s)")
+    print(f"Latence p50: {percentile(latencies, 0.5):.0f} ms | p95: {percentile(latencies, 0.95):.0f} ms")
+    print(f"Erreurs: {errors}/{len(results)}")
+    return errors == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
\ No newline at end of file
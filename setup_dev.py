@@ -11,6 +11,7 @@ import json
 import subprocess
 import platform
 from pathlib import Path
+from modules.capability_probe import capabilities
 
 def check_python_version():
     """Vérifier la version Python"""
@@ -41,19 +42,16 @@ def check_dependencies():
     return len(missing) == 0, missing
 
 def check_cuda():
-    """Vérifier CUDA"""
-    try:
-        import torch
-        if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            gpu_name = torch.cuda.get_device_name(0)
-            print(f"✅ CUDA disponible - GPU: {gpu_name} ({gpu_count} GPU(s))")
-            return True
-        else:
-            print("⚠️ CUDA non disponible")
-            return False
-    except ImportError:
-        print("❌ PyTorch non installé")
+    """Vérifier CUDA (détection partagée, en cache)"""
+    cuda = capabilities.get("cuda")
+    if cuda["available"]:
+        print(f"✅ CUDA disponible - GPU: {cuda['devices'][0]} ({cuda['device_count']} GPU(s))")
+        return True
+    elif "torch_version" in cuda:
+        print("⚠️ CUDA non disponible")
+        return False
+    else:
+        print(f"❌ {cuda.get('error', 'PyTorch non installé')}")
         return False
 
 def check_ollama():
@@ -81,37 +79,23 @@ def check_ollama():
         return False
 
 def check_tesseract():
-    """Vérifier Tesseract OCR"""
+    """Vérifier Tesseract OCR (détection partagée, en cache)"""
     try:
-        # Tenter d'importer pytesseract
         import pytesseract
-        
-        # Chemins possibles pour Tesseract
-        possible_paths = [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-            "tesseract"
-        ]
-        
-        for path in possible_paths:
-            try:
-                pytesseract.pytesseract.tesseract_cmd = path
-                # Test simple
-                from PIL import Image
-                test_image = Image.new('RGB', (100, 50), color='white')
-                pytesseract.image_to_string(test_image)
-                print(f"✅ Tesseract trouvé: {path}")
-                return True
-            except:
-                continue
-        
-        print("❌ Tesseract non trouvé")
-        print("   Installez depuis: https://github.com/UB-Mannheim/tesseract/wiki")
-        return False
-        
     except ImportError:
         print("❌ pytesseract non installé")
         return False
+    
+    tesseract = capabilities.get("tesseract")
+    if tesseract["available"]:
+        print(f"✅ Tesseract trouvé: {tesseract['path']} ({tesseract['version']})")
+        if not tesseract["french"]:
+            print("⚠️ Langue française (fra) non installée pour Tesseract")
+        return True
+    
+    print("❌ Tesseract non trouvé")
+    print("   Installez depuis: https://github.com/UB-Mannheim/tesseract/wiki")
+    return False
 
 def check_audio():
     """Vérifier les capacités audio"""
@@ -121,7 +105,7 @@ def check_audio():
         
         # Test microphone
         r = sr.Recognizer()
-        mic_list = sr.Microphone.list_microphone_names()
+        mic_list = capabilities.get("microphones")["names"]
         print(f"✅ Reconnaissance vocale - {len(mic_list)} microphone(s)")
         
         # Test TTS
@@ -9,6 +9,7 @@ import sys
 import json
 import traceback
 from pathlib import Path
+from modules.capability_probe import capabilities
 
 def test_basic_modules():
     """Test des modules Python de base"""
@@ -188,13 +189,12 @@ def test_audio_system():
         import pyttsx3
         import pygame
         
-        # Test microphone
-        try:
-            r = sr.Recognizer()
-            m = sr.Microphone()
-            print("✅ Microphone détecté")
-        except Exception as e:
-            print(f"⚠️  Microphone: {e}")
+        # Test microphone (détection partagée, en cache)
+        microphones = capabilities.get("microphones")
+        if microphones["available"]:
+            print(f"✅ Microphone détecté ({len(microphones['names'])} périphérique(s))")
+        else:
+            print(f"⚠️  Microphone: {microphones.get('error', 'aucun périphérique')}")
         
         # Test TTS
         try:
@@ -221,26 +221,21 @@ def test_audio_system():
         return False
 
 def test_cuda_support():
-    """Test du support CUDA"""
+    """Test du support CUDA (détection partagée, en cache)"""
     print("\n=== TEST SUPPORT CUDA ===")
     
-    try:
-        import torch
-        
-        cuda_available = torch.cuda.is_available()
-        if cuda_available:
-            device_count = torch.cuda.device_count()
-            device_name = torch.cuda.get_device_name(0)
-            print(f"✅ CUDA disponible - {device_count} GPU(s)")
-            print(f"   GPU principal: {device_name}")
-        else:
-            print("⚠️  CUDA non disponible - utilisation CPU")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Test CUDA: {e}")
+    cuda = capabilities.get("cuda")
+    if "torch_version" not in cuda:
+        print(f"❌ Test CUDA: {cuda.get('error')}")
         return False
+    
+    if cuda["available"]:
+        print(f"✅ CUDA disponible - {cuda['device_count']} GPU(s)")
+        print(f"   GPU principal: {cuda['devices'][0]}")
+    else:
+        print("⚠️  CUDA non disponible - utilisation CPU")
+    
+    return True
 
 def main():
     """Fonction principale de vérification"""